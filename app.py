@@ -1,6 +1,33 @@
+import importlib
+import os
+
 import streamlit as st
 from utils.db import init_db
-from views import cadastro, conteudo, dashboard, documentos  # import do módulo documentos
+from utils.metricas import medir, perfil
+
+# Precisa ser o primeiro comando do Streamlit na execução
+st.set_page_config(
+    page_title="📊 Dashboard Escolar 🐉🏮",
+    page_icon="🐲",
+    layout="wide"
+)
+
+# Páginas do menu: (módulo, função). Cada módulo (e suas dependências pesadas:
+# plotly, reportlab, LangChain...) só é importado na primeira visita à página
+PAGINAS = {
+    "Cadastro": ("views.cadastro", "show"),
+    "Dashboard": ("views.dashboard", "show"),
+    "Conteúdo": ("views.conteudo", "show"),
+    "Documentos": ("views.documentos", "show_documentos"),
+}
+
+# Usuários que veem o painel de desempenho, separados por vírgula (nenhum se vazio)
+ADMINISTRADORES = {u.strip() for u in os.environ.get("ADMINISTRADORES", "").split(",") if u.strip()}
+
+def mostrar_pagina(nome):
+    modulo, funcao = PAGINAS[nome]
+    with medir(f"pagina.{nome}"):
+        getattr(importlib.import_module(modulo), funcao)()
 
 # Inicializa banco
 init_db()
@@ -51,6 +78,7 @@ def login():
     if st.button("Entrar"):
         if usuario == "admin" and senha == "1234":
             st.session_state.logado = True
+            st.session_state.usuario = usuario
             st.success("登录成功! (Login realizado com sucesso!)")
         else:
             st.error("Usuário ou senha incorretos.")
@@ -62,18 +90,24 @@ if st.session_state.logado:
     st.title("🐲 Banguela")
 
     st.sidebar.title("📌 MENU")
-    opcao = st.sidebar.radio("Navegação", ["Cadastro", "Dashboard", "Conteúdo", "Documentos"])
+    opcao = st.sidebar.radio("Navegação", list(PAGINAS))
 
-    if opcao == "Cadastro":
-        cadastro.show()
-    elif opcao == "Conteúdo":
-        conteudo.show()
-    elif opcao == "Dashboard":
-        dashboard.show()
-    elif opcao == "Documentos":
-        documentos.show_documentos()  # chamada da nova função
+    if st.session_state.get("usuario") in ADMINISTRADORES:
+        from views.metricas import CHAVE_PERFIL, painel_metricas, perfilar_rerun
+
+        if perfilar_rerun():
+            resultado = st.session_state[CHAVE_PERFIL] = {}
+            with perfil(resultado):
+                mostrar_pagina(opcao)
+        else:
+            mostrar_pagina(opcao)
+        painel_metricas()
+    else:
+        mostrar_pagina(opcao)
 
     if st.sidebar.button("Sair"):
         st.session_state.logado = False
+        # Sem isto o próximo login herdaria o usuário (e o painel de administrador) anterior
+        st.session_state.pop("usuario", None)
 else:
     login()
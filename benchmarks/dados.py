@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+import utils.db as db
+
+# Dados sintéticos e banco temporário para os benchmarks. Tudo roda contra
+# uma cópia vazia do esquema criada por init_db, nunca contra data/escola.db.
+
+SEMENTE = 42
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Felipe", "Giovana", "Heitor",
+         "Isabela", "João", "Larissa", "Mateus", "Natália", "Otávio", "Paula", "Rafael"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa",
+              "Ferreira", "Almeida", "Ribeiro", "Carvalho", "Gomes"]
+
+def gerar_estudantes(quantidade, semente=SEMENTE):
+    """Lista de (nome, nota1, nota2) reprodutível, com notas perto de uma turma real"""
+    rng = np.random.default_rng(semente)
+    nomes = rng.choice(NOMES, quantidade)
+    sobrenomes = rng.choice(SOBRENOMES, quantidade)
+    notas = np.clip(rng.normal(6.5, 2.0, (quantidade, 2)), 0, 10).round(1)
+    return [(f"{n} {s} {i}", float(n1), float(n2))
+            for i, (n, s, (n1, n2)) in enumerate(zip(nomes, sobrenomes, notas), start=1)]
+
+def csv_estudantes(registros):
+    """Bytes de um CSV no formato aceito pela importação da página Cadastro"""
+    linhas = ["nome,nota1,nota2"] + [f"{nome},{n1},{n2}" for nome, n1, n2 in registros]
+    return ("\n".join(linhas) + "\n").encode("utf-8")
+
+def limpar_caches():
+    """Esvazia os caches por versão, para medir consultas sempre a frio.
+
+    Necessário também ao trocar de banco: a versão de um banco novo pode
+    coincidir com a de um anterior.
+    """
+    from controllers import estudante_controller, estatisticas_controller
+    from utils import snapshot
+
+    for funcao in (estudante_controller.buscar_estudantes, estudante_controller.contar_estudantes,
+                   estudante_controller.dataframe_estudantes, estatisticas_controller.obter_estatisticas):
+        funcao.cache.limpar()
+    snapshot.limpar_cache()
+
+@contextmanager
+def banco_temporario():
+    """Aponta utils.db para um escola.db novo numa pasta temporária"""
+    pasta = tempfile.mkdtemp(prefix="sofia_benchmark_")
+    original = db.DB_PATH
+    db.fechar_conexoes()
+    db.DB_PATH = os.path.join(pasta, "escola.db")
+    try:
+        db.init_db()
+        limpar_caches()
+        yield db.DB_PATH
+    finally:
+        db.fechar_conexoes()
+        db.DB_PATH = original
+        limpar_caches()
+        shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,208 @@
+"""Benchmarks do cadastro, dashboard e exportações com dados sintéticos.
+
+Cada tamanho roda num escola.db temporário criado por init_db; as consultas
+são medidas a frio (caches esvaziados antes de cada repetição) e sem
+servidor do Streamlit. O resultado vai para JSON e é comparado com a
+referência salva; regressões acima da tolerância fazem o comando sair com
+código 1, servindo de verificação antes do deploy.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.executar --salvar-referencia      # grava a referência
+    python -m benchmarks.executar                          # compara com ela
+    python -m benchmarks.executar --tamanhos 1000 1000000 --repeticoes 3
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.dados import SEMENTE, banco_temporario, csv_estudantes, gerar_estudantes, limpar_caches
+
+TAMANHOS = [1_000, 10_000, 100_000]
+
+REFERENCIA = "benchmarks/referencia.json"
+PASTA_RESULTADOS = "benchmarks/resultados"
+
+# Linhas exportadas por arquivo (DOCX/PDF/PPTX com 1M de linhas não é um uso real)
+LINHAS_EXPORTACAO = 2_000
+
+# Inserções pelo formulário (uma transação cada) medidas por tamanho
+INSERCOES_INDIVIDUAIS = 100
+
+# Piora aceita em relação à referência antes de acusar regressão
+TOLERANCIA = 0.25
+
+# Diferenças abaixo disto (s) são ruído e nunca contam como regressão
+PISO_RUIDO = 0.005
+
+def _cronometrar(funcao, repeticoes=1, preparar=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"mediana_s": round(statistics.median(tempos), 6), "min_s": round(min(tempos), 6),
+            "repeticoes": repeticoes}
+
+def _casos(quantidade, linhas_exportacao):
+    """(nome, função, repete?, preparo) na ordem em que devem rodar"""
+    from controllers.estudante_controller import (
+        adicionar_estudante, buscar_estudantes, contar_estudantes, cursor_de,
+        dataframe_estudantes, importar_estudantes, listar_estudantes
+    )
+    from controllers.estatisticas_controller import (
+        calcular_estatisticas, obter_estatisticas, recalcular_estatisticas
+    )
+    from utils import exportacao, imagens_graficos, snapshot
+    from utils.imagens_graficos import limpar_cache as limpar_imagens
+    from views import graficos
+
+    # Exportações medidas a frio: o cache de gráficos em disco sobreviveria às repetições
+    imagens_graficos.PASTA_CACHE_DISCO = ""
+
+    csv = csv_estudantes(gerar_estudantes(quantidade))
+    individuais = gerar_estudantes(INSERCOES_INDIVIDUAIS, semente=SEMENTE + 1)
+
+    # Inserções mudam os dados, então rodam uma vez só
+    yield "importar_csv", lambda: importar_estudantes(io.BytesIO(csv), "sinteticos.csv"), False, None
+    yield f"adicionar_{INSERCOES_INDIVIDUAIS}", lambda: [adicionar_estudante(*r) for r in individuais], False, None
+
+    meio = listar_estudantes()[quantidade // 2]
+    filtros = {"min_media": 5.0, "max_media": 7.0}
+    yield "listar_estudantes", listar_estudantes, True, None
+    yield "primeira_pagina", lambda: buscar_estudantes(limit=51, order_by="nome"), True, limpar_caches
+    yield "pagina_do_meio", lambda: buscar_estudantes(limit=51, order_by="nome", apos=cursor_de(meio, "nome")), \
+        True, limpar_caches
+    yield "filtrar_faixa", lambda: buscar_estudantes(**filtros, limit=51), True, limpar_caches
+    yield "contar_faixa", lambda: contar_estudantes(**filtros), True, limpar_caches
+    yield "filtrar_nome", lambda: dataframe_estudantes(nome_like="Ana", matricula=False), True, limpar_caches
+    yield "dataframe_completo", lambda: dataframe_estudantes(matricula=False), True, limpar_caches
+    yield "snapshot_gerar", snapshot.gerar, True, None
+    yield "snapshot_filtrar_faixa", lambda: snapshot.dataframe_estudantes(**filtros, matricula=False), \
+        True, limpar_caches
+
+    df = dataframe_estudantes(matricula=False)
+    medias = df["Média"].to_numpy()
+    yield "obter_estatisticas", obter_estatisticas, True, limpar_caches
+    yield "calcular_estatisticas", lambda: calcular_estatisticas(medias), True, None
+    yield "recalcular_estatisticas", recalcular_estatisticas, True, None
+
+    estatisticas = obter_estatisticas()
+    yield "grafico_principal", lambda: graficos.grafico_principal(df, estatisticas), True, None
+    yield "grafico_faixas", lambda: graficos.grafico_faixas(estatisticas["faixas"]), True, None
+    fig_bar = graficos.grafico_principal(df, estatisticas)
+    fig_pie = graficos.grafico_faixas(estatisticas["faixas"])
+    # O que o st.plotly_chart envia ao navegador
+    yield "serializar_graficos", lambda: (fig_bar.to_json(), fig_pie.to_json()), True, None
+
+    tabela = df.head(linhas_exportacao)
+    figuras = [(fig_bar.to_dict(), fig_bar.layout.title.text), (fig_pie.to_dict(), "Distribuição das Médias")]
+    yield "exportar_docx", lambda: exportacao.relatorio_docx(tabela), True, None
+    yield "exportar_pdf", lambda: exportacao.relatorio_pdf(tabela, figuras), True, limpar_imagens
+    yield "exportar_pptx", lambda: exportacao.relatorio_pptx(tabela, figuras), True, limpar_imagens
+
+def medir_tamanho(quantidade, repeticoes, linhas_exportacao=LINHAS_EXPORTACAO, somente=None):
+    resultados = {}
+    with banco_temporario():
+        for nome, funcao, repete, preparar in _casos(quantidade, linhas_exportacao):
+            if somente and nome not in somente and not nome.startswith(("importar", "adicionar")):
+                continue
+            try:
+                resultados[nome] = _cronometrar(funcao, repeticoes if repete else 1, preparar)
+            except Exception as e:
+                # Ex.: kaleido sem navegador para renderizar os gráficos
+                resultados[nome] = {"erro": f"{type(e).__name__}: {e}"}
+            print(f"  {nome:<24} {_texto(resultados[nome])}", flush=True)
+    return resultados
+
+def _texto(medida):
+    if "erro" in medida:
+        return f"erro ({medida['erro'][:80]})"
+    return f"{medida['mediana_s'] * 1000:>10.2f} ms (mín. {medida['min_s'] * 1000:.2f} ms)"
+
+def comparar(atual, referencia, tolerancia=TOLERANCIA, piso=PISO_RUIDO):
+    """Lista de (tamanho, caso, referência s, atual s, razão, regrediu)"""
+    linhas = []
+    for tamanho, casos in atual["tamanhos"].items():
+        for caso, medida in casos.items():
+            antes = referencia.get("tamanhos", {}).get(tamanho, {}).get(caso)
+            if not antes or "erro" in antes or "erro" in medida:
+                continue
+            ref, agora = antes["mediana_s"], medida["mediana_s"]
+            razao = agora / ref if ref else float("inf")
+            regrediu = razao > 1 + tolerancia and agora - ref > piso
+            linhas.append((tamanho, caso, ref, agora, razao, regrediu))
+    return linhas
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _gravar(caminho, dados):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks com dados sintéticos de estudantes.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="quantidades de estudantes")
+    parser.add_argument("--repeticoes", type=int, default=5, help="repetições por caso (usa a mediana)")
+    parser.add_argument("--linhas-exportacao", type=int, default=LINHAS_EXPORTACAO,
+                        help="linhas da tabela nos arquivos exportados")
+    parser.add_argument("--casos", nargs="+", help="roda só estes casos (as inserções sempre rodam)")
+    parser.add_argument("--saida", help="arquivo JSON do resultado (padrão: benchmarks/resultados/<data>.json)")
+    parser.add_argument("--referencia", default=REFERENCIA, help="JSON de referência para comparar")
+    parser.add_argument("--salvar-referencia", action="store_true", help="grava o resultado como nova referência")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="piora aceita (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    resultado = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "repeticoes": args.repeticoes,
+        "linhas_exportacao": args.linhas_exportacao,
+        "tamanhos": {},
+    }
+    for quantidade in args.tamanhos:
+        print(f"{quantidade} estudantes", flush=True)
+        resultado["tamanhos"][str(quantidade)] = medir_tamanho(
+            quantidade, args.repeticoes, args.linhas_exportacao, args.casos
+        )
+
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    _gravar(saida, resultado)
+    print(f"\nResultado gravado em {saida}")
+
+    if args.salvar_referencia:
+        _gravar(args.referencia, resultado)
+        print(f"Referência gravada em {args.referencia}")
+        return 0
+
+    try:
+        with open(args.referencia, encoding="utf-8") as f:
+            referencia = json.load(f)
+    except OSError:
+        print("Sem referência para comparar (use --salvar-referencia).")
+        return 0
+
+    regressoes = 0
+    print(f"\nComparação com {args.referencia} ({referencia.get('commit') or referencia.get('data')}):")
+    for tamanho, caso, ref, agora, razao, regrediu in comparar(resultado, referencia, args.tolerancia):
+        regressoes += regrediu
+        marca = "REGRESSÃO" if regrediu else ""
+        print(f"  {tamanho:>8} {caso:<24} {ref * 1000:>10.2f} → {agora * 1000:>10.2f} ms  {razao:5.2f}x  {marca}")
+    print(f"\n{regressoes} regressões acima de {args.tolerancia:.0%}.")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
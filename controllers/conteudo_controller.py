@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from utils import cache_llm
+from utils.metricas import contar, cronometrado, registrar
+
+# Textos acima deste limite são processados em blocos (map-reduce)
+LIMITE_TOKENS_ENTRADA = 6000
+
+# Tamanho e sobreposição de cada bloco, em tokens
+TAMANHO_BLOCO_TOKENS = 3000
+SOBREPOSICAO_TOKENS = 200
+
+# Blocos enviados ao modelo ao mesmo tempo
+MAX_CONCORRENCIA = 4
+
+# Rodadas de resumo antes de desistir de reduzir o texto
+MAX_RODADAS = 3
+
+ENCODING_TIKTOKEN = "cl100k_base"
+
+SISTEMA = "Você é um professor especialista em educação."
+
+INSTRUCOES_IDIOMA = {
+    "Português": "Crie um conteúdo didático em português com base no seguinte texto: {entrada}.",
+    "中文 (Chinês)": "请用中文撰写一个教学内容，内容如下: {entrada}。",
+    "English": "Create an educational content in English based on the following text: {entrada}.",
+    "Español": "Cree un contenido educativo en español basado en el siguiente texto: {entrada}.",
+}
+
+# Etapa "map": cada bloco vira um resumo com os pontos que importam para a aula
+INSTRUCAO_RESUMO = (
+    "Resuma o trecho a seguir, preservando conceitos, definições, exemplos e dados "
+    "importantes para uma aula. Responda apenas com o resumo.\n\n{entrada}"
+)
+
+# Provedor do modelo: "groq" em produção, "local" para testes e benchmarks
+PROVEDOR_LLM = os.environ.get("LLM_PROVEDOR", "groq")
+
+# Clientes mantidos vivos (com seus pools HTTP) entre reruns e sessões
+MAX_CLIENTES = 16
+
+# Conexões HTTP keep-alive por cliente
+LIMITE_CONEXOES_HTTP = 10
+
+def _fabrica_groq(modelo, api_key):
+    import httpx
+    from langchain_groq import ChatGroq
+
+    limites = httpx.Limits(max_connections=LIMITE_CONEXOES_HTTP,
+                           max_keepalive_connections=LIMITE_CONEXOES_HTTP, keepalive_expiry=60)
+    return ChatGroq(
+        model=modelo, api_key=api_key,
+        http_client=httpx.Client(limits=limites),
+        http_async_client=httpx.AsyncClient(limits=limites),
+    )
+
+def _fabrica_local(modelo, api_key):
+    """Modelo falso, sem rede, para testes e benchmarks"""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    atraso = float(os.environ.get("LLM_LOCAL_ATRASO", "0"))
+    return FakeListChatModel(
+        responses=[f"<think>rascunho</think>Conteúdo didático gerado localmente ({modelo})."],
+        sleep=atraso or None,
+    )
+
+FABRICAS_LLM = {
+    "groq": _fabrica_groq,
+    "local": _fabrica_local,
+}
+
+def registrar_fabrica_llm(provedor, fabrica):
+    """Permite plugar outro provedor: fabrica(modelo, api_key) → chat model do LangChain"""
+    FABRICAS_LLM[provedor] = fabrica
+
+_clientes = OrderedDict()
+_clientes_lock = threading.Lock()
+
+def _fechar_cliente(llm):
+    """Fecha os pools HTTP de um cliente descartado (modelos sem HTTP são ignorados)"""
+    cliente = getattr(llm, "http_client", None)
+    if cliente is not None:
+        cliente.close()
+    cliente_async = getattr(llm, "http_async_client", None)
+    if cliente_async is not None:
+        try:
+            asyncio.run(cliente_async.aclose())
+        except RuntimeError:
+            # Chamado de dentro de um event loop: agenda o fechamento nele
+            asyncio.get_running_loop().create_task(cliente_async.aclose())
+
+def obter_llm(modelo, api_key=None, provedor=None):
+    """Cliente reutilizado por (provedor, modelo, chave), evitando novo handshake TLS a cada clique"""
+    provedor = provedor or PROVEDOR_LLM
+    chave = (provedor, modelo, hashlib.sha256((api_key or "").encode()).hexdigest())
+    descartados = []
+    with _clientes_lock:
+        llm = _clientes.get(chave)
+        if llm is None:
+            llm = _clientes[chave] = FABRICAS_LLM[provedor](modelo, api_key)
+            while len(_clientes) > MAX_CLIENTES:
+                descartados.append(_clientes.popitem(last=False)[1])
+        else:
+            _clientes.move_to_end(chave)
+    for antigo in descartados:
+        _fechar_cliente(antigo)
+    return llm
+
+def precisa_chave_api(provedor=None):
+    return (provedor or PROVEDOR_LLM) != "local"
+
+def limpar_resposta(text: str) -> str:
+    """Remove o bloco <think>...</think> do texto gerado pela IA"""
+    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
+
+ABRE_THINK, FECHA_THINK = "<think>", "</think>"
+
+def _sufixo_parcial(texto, marcador):
+    """Tamanho do maior final de `texto` que pode ser o começo de `marcador`"""
+    for n in range(min(len(texto), len(marcador) - 1), 0, -1):
+        if marcador.startswith(texto[-n:]):
+            return n
+    return 0
+
+def filtrar_think(pedacos):
+    """Versão incremental de limpar_resposta: descarta <think>...</think> durante o streaming.
+
+    Marcadores quebrados entre pedaços são tratados segurando no buffer
+    apenas o trecho que ainda pode formar um marcador.
+    """
+    buffer, dentro, inicio = "", False, True
+    for pedaco in pedacos:
+        buffer += pedaco
+        while True:
+            if dentro:
+                fim = buffer.find(FECHA_THINK)
+                if fim < 0:
+                    buffer = buffer[-(len(FECHA_THINK) - 1):]
+                    break
+                buffer, dentro = buffer[fim + len(FECHA_THINK):], False
+            else:
+                ini = buffer.find(ABRE_THINK)
+                if ini >= 0:
+                    saida, buffer, dentro = buffer[:ini], buffer[ini + len(ABRE_THINK):], True
+                else:
+                    corte = len(buffer) - _sufixo_parcial(buffer, ABRE_THINK)
+                    saida, buffer = buffer[:corte], buffer[corte:]
+                if inicio:
+                    saida = saida.lstrip()
+                    inicio = not saida
+                if saida:
+                    yield saida
+                if ini < 0:
+                    break
+    if not dentro and buffer:
+        buffer = buffer.lstrip() if inicio else buffer
+        if buffer:
+            yield buffer
+
+@lru_cache(maxsize=1)
+def _encoding():
+    import tiktoken
+    return tiktoken.get_encoding(ENCODING_TIKTOKEN)
+
+def contar_tokens(texto: str) -> int:
+    return len(_encoding().encode(texto, disallowed_special=()))
+
+def dividir_texto(texto: str, tamanho=TAMANHO_BLOCO_TOKENS, sobreposicao=SOBREPOSICAO_TOKENS) -> list:
+    """Divide o texto em blocos de até `tamanho` tokens"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    divisor = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=ENCODING_TIKTOKEN, chunk_size=tamanho, chunk_overlap=sobreposicao
+    )
+    return divisor.split_text(texto)
+
+@lru_cache(maxsize=None)
+def _prompt(instrucao):
+    """Prompt compilado uma única vez por instrução (idioma ou resumo)"""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_messages([
+        ("system", SISTEMA),
+        ("user", instrucao)
+    ])
+
+@lru_cache(maxsize=1)
+def _parser():
+    from langchain_core.output_parsers import StrOutputParser
+    return StrOutputParser()
+
+def _cadeia(llm, instrucao):
+    return _prompt(instrucao) | llm | _parser()
+
+def _resumir_blocos(llm, blocos, max_concorrencia):
+    cadeia = _cadeia(llm, INSTRUCAO_RESUMO)
+    resumos = cadeia.batch([{"entrada": b} for b in blocos], config={"max_concurrency": max_concorrencia})
+    return [limpar_resposta(r) for r in resumos]
+
+@cronometrado()
+def preparar_entrada(llm, texto, limite_tokens=LIMITE_TOKENS_ENTRADA,
+                     max_concorrencia=MAX_CONCORRENCIA, ao_progredir=None):
+    """Reduz o texto até caber no limite, resumindo blocos em paralelo (map).
+
+    Textos que já cabem voltam sem alteração. Se a junção dos resumos ainda
+    for grande demais, ela é dividida e resumida de novo (até MAX_RODADAS
+    vezes; depois disso o excedente é cortado).
+    """
+    for rodada in range(1, MAX_RODADAS + 1):
+        if contar_tokens(texto) <= limite_tokens:
+            return texto
+        blocos = dividir_texto(texto)
+        if ao_progredir:
+            ao_progredir(rodada, len(blocos))
+        texto = "\n\n".join(_resumir_blocos(llm, blocos, max_concorrencia))
+
+    tokens = _encoding().encode(texto, disallowed_special=())
+    return _encoding().decode(tokens[:limite_tokens])
+
+@cronometrado()
+def gerar_conteudo(llm, idioma, texto, max_concorrencia=MAX_CONCORRENCIA, ao_progredir=None):
+    """Gera o conteúdo didático; documentos longos passam por map-reduce"""
+    entrada = preparar_entrada(llm, texto, max_concorrencia=max_concorrencia, ao_progredir=ao_progredir)
+    # Etapa "reduce": o conteúdo final é escrito a partir dos resumos combinados
+    resultado = _cadeia(llm, INSTRUCOES_IDIOMA[idioma]).invoke({"entrada": entrada})
+    return limpar_resposta(resultado)
+
+def nome_modelo(llm):
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+def gerar_conteudo_com_cache(llm, idioma, texto, **kwargs):
+    """Como gerar_conteudo, mas reaproveita respostas já geradas.
+
+    Devolve (resultado, veio_do_cache).
+    """
+    chave = cache_llm.chave_resposta(texto, nome_modelo(llm), INSTRUCOES_IDIOMA[idioma])
+    resultado = cache_llm.obter(chave)
+    contar("llm.cache_acertos" if resultado is not None else "llm.cache_falhas")
+    if resultado is not None:
+        return resultado, True
+    resultado = gerar_conteudo(llm, idioma, texto, **kwargs)
+    cache_llm.guardar(chave, resultado, nome_modelo(llm))
+    return resultado, False
+
+def gerar_conteudo_stream(llm, idioma, texto, metricas=None, **kwargs):
+    """Gera o conteúdo em pedaços de texto, já sem os blocos <think>.
+
+    Usa o cache de respostas; em `metricas` ficam "do_cache",
+    "tempo_primeiro_token" e "tempo_total" (s).
+    """
+    metricas = {} if metricas is None else metricas
+    inicio = time.perf_counter()
+    chave = cache_llm.chave_resposta(texto, nome_modelo(llm), INSTRUCOES_IDIOMA[idioma])
+    resultado = cache_llm.obter(chave)
+    metricas["do_cache"] = resultado is not None
+    contar("llm.cache_acertos" if resultado is not None else "llm.cache_falhas")
+    if resultado is not None:
+        metricas["tempo_primeiro_token"] = metricas["tempo_total"] = time.perf_counter() - inicio
+        yield resultado
+        return
+
+    entrada = preparar_entrada(llm, texto, **kwargs)
+    pedacos = _cadeia(llm, INSTRUCOES_IDIOMA[idioma]).stream({"entrada": entrada})
+    partes = []
+    for parte in filtrar_think(pedacos):
+        if not partes:
+            metricas["tempo_primeiro_token"] = time.perf_counter() - inicio
+            registrar("conteudo_controller.primeiro_token", metricas["tempo_primeiro_token"])
+        partes.append(parte)
+        yield parte
+    metricas["tempo_total"] = time.perf_counter() - inicio
+    registrar("conteudo_controller.gerar_conteudo_stream", metricas["tempo_total"])
+
+    resultado = "".join(partes).strip()
+    cache_llm.guardar(chave, resultado, nome_modelo(llm))
@@ -0,0 +1,64 @@
+import re
+from datetime import datetime
+
+from utils.db import conexao
+from utils.extracao import hash_arquivo
+from utils.metricas import cronometrado
+from models.documento_models import Documento
+
+# Marcadores do trecho destacado (negrito em Markdown)
+INICIO_DESTAQUE, FIM_DESTAQUE = "**", "**"
+
+# Palavras em volta de cada ocorrência no trecho
+PALAVRAS_TRECHO = 24
+
+@cronometrado()
+def salvar_documento(nome, texto, dados, hash_doc=None):
+    """Guarda o texto do documento (e o indexa); reenvios do mesmo arquivo não duplicam"""
+    hash_doc = hash_doc or hash_arquivo(dados)
+    with conexao() as conn:
+        # Envios simultâneos do mesmo arquivo: o índice único decide e ninguém recebe erro
+        conn.execute(
+            "INSERT INTO documentos (nome, data_upload, conteudo, hash) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (hash) DO NOTHING",
+            (nome, datetime.now().isoformat(timespec="seconds"), texto, hash_doc)
+        )
+        return conn.execute("SELECT id FROM documentos WHERE hash = ?", (hash_doc,)).fetchone()[0]
+
+def _consulta_fts(texto):
+    """Transforma o texto digitado numa consulta FTS5 segura (termos entre aspas, prefixo no último)"""
+    termos = re.findall(r"\w+", texto, flags=re.UNICODE)
+    if not termos:
+        return None
+    partes = [f'"{t}"' for t in termos]
+    partes[-1] += "*"
+    return " ".join(partes)
+
+@cronometrado()
+def buscar_documentos(texto, limite=20):
+    """Documentos que contêm os termos, do mais relevante ao menos relevante"""
+    consulta = _consulta_fts(texto)
+    if consulta is None:
+        return []
+    with conexao() as conn:
+        rows = conn.execute(f"""
+            SELECT d.id, d.nome, d.data_upload,
+                   snippet(documentos_fts, 1, ?, ?, '…', {PALAVRAS_TRECHO}),
+                   bm25(documentos_fts, 5.0, 1.0) AS relevancia
+            FROM documentos_fts
+            JOIN documentos d ON d.id = documentos_fts.rowid
+            WHERE documentos_fts MATCH ?
+            ORDER BY relevancia
+            LIMIT ?
+        """, (INICIO_DESTAQUE, FIM_DESTAQUE, consulta, limite)).fetchall()
+    return [Documento(*row) for row in rows]
+
+def listar_documentos():
+    with conexao() as conn:
+        rows = conn.execute("SELECT id, nome, data_upload FROM documentos ORDER BY data_upload DESC, id DESC").fetchall()
+    return [Documento(*row) for row in rows]
+
+def reconstruir_indice():
+    """Refaz o índice FTS a partir da tabela documentos"""
+    with conexao() as conn:
+        conn.execute("INSERT INTO documentos_fts (documentos_fts) VALUES ('rebuild')")
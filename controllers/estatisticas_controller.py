@@ -0,0 +1,93 @@
+import numpy as np
+
+from utils.db import conexao, reconstruir_estatisticas, BINS_HISTOGRAMA
+from utils.cache import cache_por_versao
+from utils.metricas import cronometrado
+
+# Rótulos exibidos no Dashboard para cada faixa de média
+ROTULOS_FAIXAS = {
+    "abaixo_5": "Abaixo de 5",
+    "entre_5_7": "Entre 5 e 7",
+    "acima_7": "Acima de 7",
+}
+
+def _faixas(medias):
+    """Contagem por faixa de média numa única passada vetorizada"""
+    # 0 → abaixo de 5, 1 → entre 5 e 7 (inclusive), 2 → acima de 7
+    indices = (medias >= 5).astype(np.intp) + (medias > 7)
+    contagens = np.bincount(indices, minlength=3)
+    return dict(zip(ROTULOS_FAIXAS, (int(c) for c in contagens)))
+
+def _histograma(medias):
+    faixas = np.clip(np.floor(medias), 0, BINS_HISTOGRAMA - 1).astype(np.intp)
+    return np.bincount(faixas, minlength=BINS_HISTOGRAMA)
+
+def registrar_medias(conn, medias):
+    """Soma as médias recém-inseridas às estatísticas, na transação da inserção"""
+    medias = np.asarray(medias, dtype=np.float64)
+    medias = medias[~np.isnan(medias)]
+    if not len(medias):
+        return
+
+    faixas = _faixas(medias)
+    minimo, maximo = float(medias.min()), float(medias.max())
+    conn.execute(f"""
+        UPDATE estatisticas_estudantes SET
+            total = total + ?,
+            soma = soma + ?,
+            minimo = MIN(COALESCE(minimo, ?), ?),
+            maximo = MAX(COALESCE(maximo, ?), ?),
+            {", ".join(f"{faixa} = {faixa} + ?" for faixa in faixas)}
+        WHERE id = 1
+    """, (len(medias), float(medias.sum()), minimo, minimo, maximo, maximo, *faixas.values()))
+
+    histograma = _histograma(medias)
+    conn.executemany("""
+        INSERT INTO histograma_medias (faixa, total) VALUES (?, ?)
+        ON CONFLICT (faixa) DO UPDATE SET total = total + excluded.total
+    """, [(int(faixa), int(total)) for faixa, total in enumerate(histograma) if total])
+
+def recalcular_estatisticas():
+    with conexao() as conn:
+        reconstruir_estatisticas(conn)
+
+def _resultado(total, soma, minimo, maximo, faixas, histograma):
+    return {
+        "total": total,
+        "soma": soma,
+        "minimo": minimo,
+        "maximo": maximo,
+        "media": soma / total if total else None,
+        "faixas": {ROTULOS_FAIXAS[k]: v for k, v in faixas.items()},
+        "histograma": histograma,
+    }
+
+@cronometrado()
+@cache_por_versao("estudantes", max_entradas=1)
+def obter_estatisticas():
+    """Estatísticas de todos os estudantes lidas da tabela agregada, em O(1)"""
+    with conexao() as conn:
+        row = conn.execute(f"""
+            SELECT total, soma, minimo, maximo, {", ".join(ROTULOS_FAIXAS)}
+            FROM estatisticas_estudantes WHERE id = 1
+        """).fetchone()
+        bins = conn.execute("SELECT faixa, total FROM histograma_medias").fetchall()
+    if row is None:
+        row = (0, 0.0, None, None) + (0,) * len(ROTULOS_FAIXAS)
+
+    histograma = [0] * BINS_HISTOGRAMA
+    for faixa, total in bins:
+        histograma[faixa] = total
+    return _resultado(*row[:4], dict(zip(ROTULOS_FAIXAS, row[4:])), histograma)
+
+@cronometrado()
+def calcular_estatisticas(medias):
+    """Mesmas estatísticas de obter_estatisticas, calculadas sobre um conjunto filtrado"""
+    medias = np.asarray(medias, dtype=np.float64)
+    medias = medias[~np.isnan(medias)]
+    if not len(medias):
+        return _resultado(0, 0.0, None, None, dict.fromkeys(ROTULOS_FAIXAS, 0), [0] * BINS_HISTOGRAMA)
+    return _resultado(
+        len(medias), float(medias.sum()), float(medias.min()), float(medias.max()),
+        _faixas(medias), _histograma(medias).tolist()
+    )
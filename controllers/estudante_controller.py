@@ -1,18 +1,287 @@
-from utils.db import get_connection
-from models.estudante_model import Estudante
+import codecs
+import csv
+import io
+import math
+import time
+from contextlib import closing
+from itertools import islice
 
+from utils.db import conexao, incrementar_versao
+from utils.cache import cache_por_versao
+from utils.metricas import cronometrado
+from controllers.estatisticas_controller import registrar_medias
+from models.estudante_model import Estudante, EstudantesColunares
+
+# Linhas inseridas por transação na importação em lote
+TAMANHO_LOTE = 5000
+
+# Cabeçalhos aceitos na planilha → coluna da tabela
+COLUNAS_IMPORTACAO = {
+    "nome": "nome",
+    "nota1": "nota1",
+    "1º nota": "nota1",
+    "nota 1": "nota1",
+    "nota2": "nota2",
+    "2º nota": "nota2",
+    "nota 2": "nota2",
+}
+
+# Codificações tentadas no CSV, em ordem: UTF-8 (com ou sem BOM) e a do
+# Excel em português, que grava em cp1252
+CODIFICACOES_CSV = ("utf-8-sig", "cp1252")
+
+# Bytes lidos por vez ao conferir a codificação do CSV
+BYTES_POR_LEITURA = 1024 * 1024
+
+SQL_INSERIR = "INSERT INTO estudantes (nome, nota1, nota2) VALUES (?, ?, ?)"
+
+def converter_nota(valor):
+    """Converte uma nota (aceita vírgula decimal) para float entre 0 e 10"""
+    if isinstance(valor, str):
+        valor = valor.strip().replace(",", ".")
+    if valor is None or valor == "":
+        raise ValueError("nota vazia")
+    try:
+        nota = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"nota inválida: {valor!r}") from None
+    if not 0.0 <= nota <= 10.0:
+        raise ValueError(f"nota fora do intervalo 0-10: {nota}")
+    return nota
+
+def validar_estudante(nome, nota1, nota2):
+    """Valida e normaliza um registro; levanta ValueError se for inválido"""
+    nome = str(nome).strip() if nome is not None else ""
+    if not nome:
+        raise ValueError("nome vazio")
+    return nome, converter_nota(nota1), converter_nota(nota2)
+
+@cronometrado()
 def adicionar_estudante(nome, nota1, nota2):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""INSERT INTO estudantes (nome, nota1, nota2) VALUES (?, ?, ?)""", 
-                   (nome, nota1, nota2))
-    conn.commit()
-    conn.close()
+    with conexao() as conn:
+        nome, nota1, nota2 = validar_estudante(nome, nota1, nota2)
+        conn.execute(SQL_INSERIR, (nome, nota1, nota2))
+        registrar_medias(conn, [(nota1 + nota2) / 2])
+        incrementar_versao(conn, "estudantes")
+
+# Notas já são REAL no esquema (migração 2), então vão direto para as colunas NumPy
+SQL_COLUNAS = "SELECT id, nome, nota1, nota2 FROM estudantes"
 
+@cronometrado()
 def listar_estudantes():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, nome, nota1, nota2 FROM estudantes")
-    rows = cursor.fetchall()
-    conn.close()
-    return [Estudante(*row) for row in rows]
\ No newline at end of file
+    with conexao() as conn:
+        return EstudantesColunares.de_cursor(conn.execute(SQL_COLUNAS))
+
+def obter_estudante(id):
+    with conexao() as conn:
+        row = conn.execute(SQL_COLUNAS + " WHERE id = ?", (id,)).fetchone()
+    return Estudante(*row) if row else None
+
+# ---------- Consulta paginada ----------
+# Colunas permitidas em order_by (nunca interpolar texto do usuário no SQL)
+ORDENACOES = {"id": "id", "nome": "nome", "media": "media"}
+
+def _filtros_sql(min_media, max_media, nome_like):
+    condicoes, params = [], []
+    if min_media is not None:
+        condicoes.append("media >= ?")
+        params.append(min_media)
+    if max_media is not None:
+        condicoes.append("media <= ?")
+        params.append(max_media)
+    if nome_like:
+        termo = nome_like.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        condicoes.append("nome LIKE ? ESCAPE '\\'")
+        params.append(f"%{termo}%")
+    return condicoes, params
+
+@cronometrado()
+@cache_por_versao("estudantes")
+def buscar_estudantes(min_media=None, max_media=None, nome_like=None,
+                      limit=None, offset=0, order_by="id", apos=None):
+    """Busca estudantes com filtros e paginação feitos no SQL.
+
+    `apos` é o cursor (valor da coluna de ordenação, id) do último registro
+    da página anterior; quando informado, usa paginação por keyset e
+    ignora `offset`.
+    """
+    coluna = ORDENACOES.get(order_by)
+    if coluna is None:
+        raise ValueError(f"Ordenação inválida: {order_by}")
+
+    condicoes, params = _filtros_sql(min_media, max_media, nome_like)
+    if apos is not None:
+        valor, ultimo_id = apos
+        if valor is None:
+            # Médias NULL (notas descartadas na migração) vêm primeiro no ORDER BY
+            # e não passam em "(media, id) > (NULL, ?)"
+            condicoes.append(f"(({coluna} IS NULL AND id > ?) OR {coluna} IS NOT NULL)")
+            params.append(ultimo_id)
+        else:
+            condicoes.append(f"({coluna}, id) > (?, ?)")
+            params.extend(apos)
+
+    sql = SQL_COLUNAS
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    sql += f" ORDER BY {coluna}, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+        if offset and apos is None:
+            sql += " OFFSET ?"
+            params.append(offset)
+
+    with conexao() as conn:
+        return EstudantesColunares.de_cursor(conn.execute(sql, params))
+
+@cronometrado()
+@cache_por_versao("estudantes")
+def contar_estudantes(min_media=None, max_media=None, nome_like=None):
+    condicoes, params = _filtros_sql(min_media, max_media, nome_like)
+    sql = "SELECT COUNT(*) FROM estudantes"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    with conexao() as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+@cronometrado()
+@cache_por_versao("estudantes", max_entradas=8)
+def dataframe_estudantes(min_media=None, max_media=None, nome_like=None, order_by="id", matricula=True):
+    """DataFrame dos estudantes filtrados, mantido em cache até a próxima escrita"""
+    estudantes = buscar_estudantes(min_media, max_media, nome_like, order_by=order_by)
+    return estudantes.para_dataframe(matricula=matricula)
+
+def cursor_de(estudante, order_by="id"):
+    """Cursor de keyset para continuar a busca depois deste estudante"""
+    valor = getattr(estudante, ORDENACOES[order_by])
+    # Média sem notas chega como NaN das colunas NumPy; no SQL ela é NULL
+    if isinstance(valor, float) and math.isnan(valor):
+        valor = None
+    return (valor, estudante.id)
+
+# ---------- Importação em lote ----------
+def _mapear_cabecalho(cabecalho):
+    indices = {}
+    for i, coluna in enumerate(cabecalho):
+        destino = COLUNAS_IMPORTACAO.get(str(coluna or "").strip().lower())
+        if destino and destino not in indices:
+            indices[destino] = i
+    faltando = {"nome", "nota1", "nota2"} - indices.keys()
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(sorted(faltando))}")
+    return indices["nome"], indices["nota1"], indices["nota2"]
+
+def _codificacao_csv(arquivo):
+    """Primeira de CODIFICACOES_CSV que decodifica o arquivo inteiro.
+
+    Conferida antes de inserir qualquer linha: um erro de decodificação no
+    meio do arquivo deixaria os lotes anteriores gravados.
+    """
+    inicio = arquivo.tell()
+    for codificacao in CODIFICACOES_CSV:
+        arquivo.seek(inicio)
+        decodificador = codecs.getincrementaldecoder(codificacao)()
+        try:
+            while parte := arquivo.read(BYTES_POR_LEITURA):
+                decodificador.decode(parte)
+            decodificador.decode(b"", final=True)
+        except UnicodeDecodeError:
+            continue
+        finally:
+            arquivo.seek(inicio)
+        return codificacao
+    raise ValueError(f"codificação do CSV não reconhecida (use {' ou '.join(CODIFICACOES_CSV)})")
+
+def _linhas_csv(arquivo):
+    texto = io.TextIOWrapper(arquivo, encoding=_codificacao_csv(arquivo), newline="")
+    try:
+        amostra = texto.read(4096)
+        texto.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.reader(texto, dialeto)
+    finally:
+        texto.detach()
+
+def _linhas_xlsx(arquivo):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def _ler_planilha(arquivo, nome_arquivo):
+    """Gera (número da linha, registro) a partir de um CSV ou XLSX, sem carregar tudo em memória"""
+    if nome_arquivo.lower().endswith(".xlsx"):
+        linhas = _linhas_xlsx(arquivo)
+    else:
+        linhas = _linhas_csv(arquivo)
+
+    # Fechado aqui mesmo em erro, enquanto o arquivo enviado ainda está aberto
+    with closing(linhas):
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        i_nome, i_nota1, i_nota2 = _mapear_cabecalho(cabecalho)
+        ultimo = max(i_nome, i_nota1, i_nota2)
+
+        for numero, linha in enumerate(linhas, start=2):
+            if not linha or all(v in (None, "") for v in linha):
+                continue
+            linha = tuple(linha) + (None,) * (ultimo + 1 - len(linha))
+            yield numero, (linha[i_nome], linha[i_nota1], linha[i_nota2])
+
+@cronometrado()
+def importar_estudantes(arquivo, nome_arquivo, tamanho_lote=TAMANHO_LOTE, ao_progredir=None):
+    """Importa estudantes de um CSV/XLSX em lotes, uma transação por lote.
+
+    Retorna um dicionário com o total inserido, as linhas rejeitadas
+    (número da linha, motivo), o tempo gasto e a taxa em linhas/s. Se a
+    importação parar no meio, a exceção leva em `inseridos` quantas linhas
+    dos lotes anteriores já foram gravadas.
+    """
+    inicio = time.perf_counter()
+    inseridos = 0
+    rejeitados = []
+    registros = _ler_planilha(arquivo, nome_arquivo)
+
+    try:
+        while True:
+            bloco = list(islice(registros, tamanho_lote))
+            if not bloco:
+                break
+
+            validos = []
+            for numero, registro in bloco:
+                try:
+                    validos.append(validar_estudante(*registro))
+                except (TypeError, ValueError) as e:
+                    rejeitados.append((numero, str(e)))
+
+            if validos:
+                with conexao() as conn:
+                    conn.executemany(SQL_INSERIR, validos)
+                    registrar_medias(conn, [(n1 + n2) / 2 for _, n1, n2 in validos])
+                    incrementar_versao(conn, "estudantes")
+                inseridos += len(validos)
+
+            if ao_progredir:
+                ao_progredir(inseridos, len(rejeitados))
+    except Exception as e:
+        e.inseridos = inseridos
+        raise
+    finally:
+        registros.close()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "inseridos": inseridos,
+        "rejeitados": rejeitados,
+        "segundos": segundos,
+        "linhas_por_segundo": inseridos / segundos if segundos > 0 else 0.0,
+    }
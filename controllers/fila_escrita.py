@@ -0,0 +1,156 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import utils.db as db
+from utils.db import incrementar_versao
+from utils.metricas import contar, registrar
+from controllers.estatisticas_controller import registrar_medias
+from controllers.estudante_controller import SQL_INSERIR, validar_estudante
+
+# Cadastros do formulário gravados por uma única thread, em transações de
+# grupo: sessões simultâneas não disputam o lock de escrita do SQLite e um
+# único commit (e fsync) atende vários cadastros.
+
+# Máximo de cadastros por transação
+TAMANHO_MAX_GRUPO = 500
+
+# Tempo máximo (s) que o primeiro cadastro do grupo espera por outros. Com 0
+# o grupo leva só o que já está na fila; sob carga ele cresce sozinho, com o
+# que chega enquanto o commit anterior roda, sem atrasar cadastros isolados
+ESPERA_MAX_GRUPO = 0.0
+
+# Tempo máximo (s) que a página espera a confirmação da gravação
+TIMEOUT_CONFIRMACAO = 30
+
+_PARAR = object()
+_BARREIRA = object()
+
+class FilaDeEscrita:
+    """Uma thread escritora drena a fila e grava cada grupo numa transação.
+
+    enfileirar() devolve um Future resolvido com o id do estudante só depois
+    do commit. Se a transação do grupo falhar, os registros são gravados de
+    novo um a um e só os que falharem sozinhos recebem a exceção. A conexão
+    da thread usa synchronous=FULL, então um cadastro confirmado sobrevive
+    também a queda de energia.
+    """
+
+    def __init__(self, tamanho_grupo=TAMANHO_MAX_GRUPO, espera_grupo=ESPERA_MAX_GRUPO):
+        self.tamanho_grupo = tamanho_grupo
+        self.espera_grupo = espera_grupo
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._caminho = None
+
+    def _iniciar(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name="fila-escrita", daemon=True)
+                self._thread.start()
+
+    def enfileirar(self, nome, nota1, nota2):
+        """Valida na hora (ValueError) e agenda a gravação; devolve um Future com o id"""
+        registro = validar_estudante(nome, nota1, nota2)
+        futuro = Future()
+        self._fila.put((registro, futuro))
+        self._iniciar()
+        return futuro
+
+    def descarregar(self, timeout=None):
+        """Espera tudo o que já foi enfileirado ser gravado"""
+        futuro = Future()
+        self._fila.put((_BARREIRA, futuro))
+        self._iniciar()
+        futuro.result(timeout)
+
+    def encerrar(self, timeout=None):
+        """Grava o que falta e para a thread (chamado ao sair do processo)"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._fila.put((_PARAR, None))
+            thread.join(timeout)
+
+    def _proximo_grupo(self):
+        """Bloqueia pelo primeiro item e junta os que chegarem até o limite de tamanho/tempo"""
+        grupo = [self._fila.get()]
+        limite = time.monotonic() + self.espera_grupo
+        while len(grupo) < self.tamanho_grupo and grupo[-1][0] not in (_PARAR, _BARREIRA):
+            try:
+                grupo.append(self._fila.get(timeout=max(0.0, limite - time.monotonic())))
+            except queue.Empty:
+                break
+        return grupo
+
+    def _executar(self):
+        while True:
+            grupo = self._proximo_grupo()
+            registros = [(r, f) for r, f in grupo if r not in (_PARAR, _BARREIRA)]
+            if registros:
+                self._gravar(registros)
+            for marcador, futuro in grupo:
+                if marcador is _BARREIRA:
+                    futuro.set_result(None)
+                elif marcador is _PARAR:
+                    self._fechar()
+                    return
+
+    def _conexao(self):
+        # Reabre se o banco configurado mudou (ex.: benchmarks com banco temporário)
+        if self._conn is None or self._caminho != db.DB_PATH:
+            self._fechar()
+            self._caminho = db.DB_PATH
+            self._conn = db.get_connection(self._caminho)
+            self._conn.execute("PRAGMA synchronous=FULL")
+        return self._conn
+
+    def _fechar(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _gravar(self, registros):
+        registros = [(r, f) for r, f in registros if f.set_running_or_notify_cancel()]
+        if not registros:
+            return
+        try:
+            self._gravar_grupo(registros)
+        except Exception as e:
+            if len(registros) == 1:
+                registros[0][1].set_exception(e)
+                return
+            # Refaz um a um: um registro ruim não recusa os cadastros das outras sessões
+            contar("fila_escrita.grupos_refeitos")
+            for registro in registros:
+                try:
+                    self._gravar_grupo([registro])
+                except Exception as e:
+                    registro[1].set_exception(e)
+
+    def _gravar_grupo(self, registros):
+        """Grava os registros numa transação e resolve os Futures; se falhar, nenhum é gravado"""
+        inicio = time.perf_counter()
+        try:
+            conn = self._conexao()
+            with conn:
+                ids = [conn.execute(SQL_INSERIR, r).lastrowid for r, _ in registros]
+                registrar_medias(conn, [(n1 + n2) / 2 for (_, n1, n2), _ in registros])
+                incrementar_versao(conn, "estudantes")
+        except Exception:
+            registrar("fila_escrita.grupo", time.perf_counter() - inicio, erro=True)
+            raise
+        registrar("fila_escrita.grupo", time.perf_counter() - inicio)
+        contar("fila_escrita.cadastros", len(registros))
+        for id, (_, futuro) in zip(ids, registros):
+            futuro.set_result(id)
+
+fila_escrita = FilaDeEscrita()
+atexit.register(fila_escrita.encerrar)
+
+def enfileirar_estudante(nome, nota1, nota2):
+    return fila_escrita.enfileirar(nome, nota1, nota2)
@@ -1,5 +1,7 @@
 class Documento:
-    def __init__(self, id, nome, data_upload):
+    def __init__(self, id, nome, data_upload, trecho=None, relevancia=None):
         self.id = id
         self.nome = nome
-        self.data_upload = data_upload
\ No newline at end of file
+        self.data_upload = data_upload
+        self.trecho = trecho # Trecho destacado na busca textual
+        self.relevancia = relevancia # bm25: quanto menor, mais relevante
@@ -1,8 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# Linhas lidas do cursor por vez ao montar as colunas
+LINHAS_POR_LOTE = 10_000
+
 class Estudante:
+    """Um único estudante; para listas use EstudantesColunares"""
+    __slots__ = ("id", "nome", "nota1", "nota2", "media")
 
     def __init__(self, id, nome, nota1, nota2):
         self.id = id
         self.nome = nome
         self.nota1 = nota1
         self.nota2 = nota2
-        self.media = (nota1 + nota2) / 2 #Calculo média
\ No newline at end of file
+        # Notas são REAL no banco; NULL (nota legada inválida) deixa a média indefinida
+        self.media = None if nota1 is None or nota2 is None else (nota1 + nota2) / 2
+
+class EstudantesColunares:
+    """Resultado de consulta guardado em colunas NumPy, sem um objeto por linha"""
+    __slots__ = ("id", "nome", "nota1", "nota2", "media")
+
+    def __init__(self, id, nome, nota1, nota2):
+        self.id = np.asarray(id, dtype=np.int64)
+        self.nome = np.asarray(nome, dtype=object)
+        self.nota1 = np.asarray(nota1, dtype=np.float64)
+        self.nota2 = np.asarray(nota2, dtype=np.float64)
+        self.media = (self.nota1 + self.nota2) / 2 # Média vetorizada
+
+    @classmethod
+    def de_cursor(cls, cursor, tamanho_lote=LINHAS_POR_LOTE):
+        """Monta as colunas lendo o cursor (id, nome, nota1, nota2) em lotes.
+
+        Só um lote de tuplas existe por vez; o resto já está nos arrays.
+        """
+        partes = ([], [], [], [])
+        tipos = (np.int64, object, np.float64, np.float64)
+        while lote := cursor.fetchmany(tamanho_lote):
+            for parte, coluna, tipo in zip(partes, zip(*lote), tipos):
+                parte.append(np.asarray(coluna, dtype=tipo))
+        if not partes[0]:
+            return cls((), (), (), ())
+        return cls(*(np.concatenate(parte) for parte in partes))
+
+    def __len__(self):
+        return len(self.id)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return EstudantesColunares(self.id[indice], self.nome[indice],
+                                       self.nota1[indice], self.nota2[indice])
+        return Estudante(int(self.id[indice]), self.nome[indice],
+                         float(self.nota1[indice]), float(self.nota2[indice]))
+
+    def para_dataframe(self, matricula=True):
+        """DataFrame com os nomes de coluna exibidos nas telas"""
+        colunas = {}
+        if matricula:
+            colunas["Matrícula"] = self.id
+        colunas.update({
+            "Nome": self.nome,
+            "1º Nota": self.nota1,
+            "2º Nota": self.nota2,
+            "Média": self.media,
+        })
+        return pd.DataFrame(colunas, copy=False)
@@ -0,0 +1,127 @@
+"""Mede o tempo de importação da tela de login e de cada página.
+
+Cada alvo roda num interpretador novo com `python -X importtime`; o
+resultado é acrescentado a um histórico em JSON Lines e comparado com a
+medição anterior.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_importacoes [--repeticoes 5] [--historico arquivo.jsonl]
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HISTORICO = "data/benchmarks/importacoes.jsonl"
+
+APP = "app.py"
+
+def importacoes_do_app(caminho=APP):
+    """Módulos importados no nível de módulo de app.py (o que a tela de login sempre carrega)"""
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read(), caminho)
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(a.name for a in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.level == 0:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+# O que cada tela importa ao abrir; "login" acompanha os imports de app.py
+ALVOS = {
+    "login": importacoes_do_app(),
+    "Cadastro": ["views.cadastro"],
+    "Dashboard": ["views.dashboard"],
+    "Conteúdo": ["views.conteudo"],
+    "Documentos": ["views.documentos"],
+}
+
+# Módulos mais pesados listados por alvo
+TOP_MODULOS = 5
+
+def _medir(modulos):
+    """Um interpretador novo: (tempo total em ms, {módulo de topo: ms acumulado})"""
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                              capture_output=True, text=True)
+    parede = (time.perf_counter() - inicio) * 1000
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+
+    # Linhas: "import time: self [us] | cumulative | imported package";
+    # o recuo do nome indica o nível, e só o nível 0 entra na soma
+    modulos_topo = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "imported package" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        if nome[1:2] == " ":
+            continue
+        modulos_topo[nome.strip()] = int(acumulado) / 1000
+    return parede, modulos_topo
+
+def medir_alvo(modulos, repeticoes):
+    medicoes = [_medir(modulos) for _ in range(repeticoes)]
+    importacao = [sum(topo.values()) for _, topo in medicoes]
+    mediana = statistics.median(importacao)
+    _, topo = medicoes[importacao.index(sorted(importacao)[len(importacao) // 2])]
+    return {
+        "importacao_ms": round(mediana, 1),
+        "processo_ms": round(statistics.median(p for p, _ in medicoes), 1),
+        "mais_pesados": [[nome, round(ms, 1)] for nome, ms in
+                         sorted(topo.items(), key=lambda item: -item[1])[:TOP_MODULOS]],
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _ultima_medicao(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            linhas = [l for l in f if l.strip()]
+    except OSError:
+        return None
+    return json.loads(linhas[-1]) if linhas else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação das páginas (python -X importtime).")
+    parser.add_argument("--repeticoes", type=int, default=5, help="medições por alvo (usa a mediana)")
+    parser.add_argument("--historico", default=HISTORICO, help="arquivo JSON Lines com as medições")
+    parser.add_argument("--nao-salvar", action="store_true", help="só mostra, sem gravar no histórico")
+    args = parser.parse_args(argv)
+
+    anterior = _ultima_medicao(args.historico)
+    resultados = {}
+    for nome, modulos in ALVOS.items():
+        resultados[nome] = r = medir_alvo(modulos, args.repeticoes)
+        texto = f"{nome:<12} {r['importacao_ms']:>9.1f} ms importando  {r['processo_ms']:>9.1f} ms no processo"
+        if anterior and nome in anterior["alvos"]:
+            antes = anterior["alvos"][nome]["importacao_ms"]
+            texto += f"  ({r['importacao_ms'] - antes:+.1f} ms desde {anterior.get('commit') or 'a última medição'})"
+        print(texto)
+        print("             " + ", ".join(f"{m} {ms:.0f}ms" for m, ms in r["mais_pesados"]))
+
+    if not args.nao_salvar:
+        registro = {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _commit(),
+            "python": sys.version.split()[0],
+            "repeticoes": args.repeticoes,
+            "alvos": resultados,
+        }
+        os.makedirs(os.path.dirname(args.historico) or ".", exist_ok=True)
+        with open(args.historico, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    main()
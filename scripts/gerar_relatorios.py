@@ -0,0 +1,145 @@
+"""Gera os relatórios do Dashboard (DOCX/PDF/PPTX) em lote, sem Streamlit.
+
+Cada conjunto de filtros (faixa de média ou prefixo do nome) vira uma pasta
+dentro da saída, com os mesmos arquivos do botão "Exportar todos". Os
+conjuntos rodam em paralelo num pool de processos, que leem o mesmo
+snapshot Arrow mapeado do disco; ao final sai um resumo com os tempos, que
+também é gravado em <saída>/resumo.json.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.gerar_relatorios --faixas 0-5 5-7 7-10
+    python -m scripts.gerar_relatorios --largura-faixa 1 --formatos pdf
+    python -m scripts.gerar_relatorios --prefixos A B C --saida relatorios/fim_de_ano
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils import db, snapshot
+from views import relatorio
+
+PASTA_SAIDA = "relatorios"
+
+def _faixa(texto):
+    try:
+        minimo, maximo = (float(v) for v in texto.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"faixa inválida: {texto} (use mínimo-máximo, ex.: 5-7)")
+    if not 0 <= minimo <= maximo <= 10:
+        raise argparse.ArgumentTypeError(f"faixa fora de 0-10: {texto}")
+    return minimo, maximo
+
+def _pasta_segura(texto):
+    return re.sub(r"[^\w.-]+", "_", texto).strip("_") or "_"
+
+def conjuntos(faixas=(), largura_faixa=None, prefixos=()):
+    """Lista de (nome da pasta, filtros, prefixo); sem nenhum critério, um único com todos"""
+    resultado = []
+    for minimo, maximo in faixas:
+        # Como no slider do Dashboard, as duas pontas entram na faixa
+        resultado.append((f"media_{minimo:g}-{maximo:g}", {"min_media": minimo, "max_media": maximo}, None))
+    if largura_faixa:
+        inicio = 0.0
+        while inicio < 10:
+            fim = min(inicio + largura_faixa, 10.0)
+            # Faixas geradas não se sobrepõem: o fim só entra na última
+            maximo = fim if fim >= 10 else fim - 1e-9
+            resultado.append((f"media_{inicio:g}-{fim:g}", {"min_media": inicio, "max_media": maximo}, None))
+            inicio = fim
+    for prefixo in prefixos:
+        # O SQL/snapshot filtra por trecho do nome; o início é conferido depois
+        resultado.append((f"nome_{_pasta_segura(prefixo)}", {"nome_like": prefixo}, prefixo))
+    return resultado or [("todos", {}, None)]
+
+def gerar_conjunto(nome, filtros, prefixo, formatos, ordem, pasta_saida):
+    """Roda num processo do pool: grava os arquivos de um conjunto e devolve os tempos"""
+    tempos = {}
+    inicio = time.perf_counter()
+    df, _ = relatorio.dados_filtrados(filtros, ordem)
+    if prefixo:
+        df = df[df["Nome"].str.lower().str.startswith(prefixo.lower())].reset_index(drop=True)
+    resumo = {"conjunto": nome, "estudantes": len(df), "arquivos": [], "tempos_s": tempos}
+    if df.empty:
+        tempos["dados"] = round(time.perf_counter() - inicio, 4)
+        return resumo
+
+    fig_bar, fig_pie = relatorio.figuras(df, relatorio.estatisticas_de(df))
+    exportacoes = relatorio.exportacoes(df, fig_bar, fig_pie)
+    tempos["dados"] = round(time.perf_counter() - inicio, 4)
+
+    pasta = os.path.join(pasta_saida, nome)
+    os.makedirs(pasta, exist_ok=True)
+    for formato in formatos:
+        funcao, args, nome_arquivo, _ = exportacoes[formato]
+        inicio = time.perf_counter()
+        caminho = os.path.join(pasta, nome_arquivo)
+        with open(caminho, "wb") as f:
+            f.write(funcao(*args))
+        tempos[formato] = round(time.perf_counter() - inicio, 4)
+        resumo["arquivos"].append(caminho)
+    return resumo
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios do Dashboard em lote.")
+    parser.add_argument("--faixas", type=_faixa, nargs="+", default=[], metavar="MIN-MAX",
+                        help="um relatório por faixa de média, ex.: 0-5 5-7 7-10")
+    parser.add_argument("--largura-faixa", type=float, metavar="LARGURA",
+                        help="faixas consecutivas de 0 a 10 com esta largura")
+    parser.add_argument("--prefixos", nargs="+", default=[], help="um relatório por início do nome")
+    parser.add_argument("--formatos", nargs="+", choices=relatorio.FORMATOS, default=list(relatorio.FORMATOS))
+    parser.add_argument("--ordem", choices=("id", "nome", "media"), default="nome", help="ordenação da tabela")
+    parser.add_argument("--saida", default=PASTA_SAIDA, help=f"pasta dos relatórios (padrão: {PASTA_SAIDA})")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="processos em paralelo")
+    args = parser.parse_args(argv)
+    if args.largura_faixa is not None and args.largura_faixa <= 0:
+        parser.error("--largura-faixa deve ser positiva")
+
+    lista = conjuntos(args.faixas, args.largura_faixa, args.prefixos)
+    inicio = time.perf_counter()
+
+    db.init_db()
+    # Snapshot em dia antes de abrir o pool: todos os processos leem o mesmo arquivo
+    snapshot.gerar()
+    # Conexões SQLite abertas não devem atravessar o fork dos processos
+    db.fechar_conexoes()
+
+    resultados, erros = [], 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.processos, len(lista)))) as executor:
+        futuros = {
+            executor.submit(gerar_conjunto, nome, filtros, prefixo, args.formatos, args.ordem, args.saida): nome
+            for nome, filtros, prefixo in lista
+        }
+        for futuro in as_completed(futuros):
+            nome = futuros[futuro]
+            try:
+                resumo = futuro.result()
+            except Exception as e:
+                # Ex.: kaleido sem navegador para renderizar os gráficos do PDF/PPTX
+                erros += 1
+                resumo = {"conjunto": nome, "erro": f"{type(e).__name__}: {e}"}
+                print(f"  {nome:<24} erro ({resumo['erro'][:80]})", flush=True)
+            else:
+                tempos = " ".join(f"{etapa} {s * 1000:.0f} ms" for etapa, s in resumo["tempos_s"].items())
+                print(f"  {nome:<24} {resumo['estudantes']:>8} estudantes  {tempos}", flush=True)
+            resultados.append(resumo)
+
+    total = time.perf_counter() - inicio
+    resultados.sort(key=lambda r: r["conjunto"])
+    os.makedirs(args.saida, exist_ok=True)
+    caminho_resumo = os.path.join(args.saida, "resumo.json")
+    with open(caminho_resumo, "w", encoding="utf-8") as f:
+        json.dump({"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "formatos": args.formatos,
+                   "processos": args.processos, "total_s": round(total, 3), "conjuntos": resultados},
+                  f, ensure_ascii=False, indent=2)
+
+    arquivos = sum(len(r.get("arquivos", [])) for r in resultados)
+    print(f"\n{len(lista)} conjuntos, {arquivos} arquivos, {erros} com erro, em {total:.1f} s.")
+    print(f"Resumo gravado em {caminho_resumo}")
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Indexa documentos na busca textual da página Documentos.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.indexar_documentos pasta_ou_arquivo [...]
+    python -m scripts.indexar_documentos --reconstruir
+"""
+import argparse
+import os
+import sys
+
+from utils.db import init_db
+from utils.extracao import extrair_texto, tipo_arquivo
+from controllers.documento_controller import salvar_documento, reconstruir_indice
+
+def _arquivos(caminhos):
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, nomes in os.walk(caminho):
+                for nome in sorted(nomes):
+                    yield os.path.join(raiz, nome)
+        else:
+            yield caminho
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexa documentos na busca textual (FTS5).")
+    parser.add_argument("caminhos", nargs="*", help="arquivos .txt/.pdf/.docx ou pastas")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="refaz o índice a partir dos documentos já guardados")
+    args = parser.parse_args(argv)
+    if not args.caminhos and not args.reconstruir:
+        parser.error("informe arquivos/pastas ou --reconstruir")
+
+    init_db()
+    indexados = ignorados = 0
+    for caminho in _arquivos(args.caminhos):
+        if tipo_arquivo(caminho) is None:
+            ignorados += 1
+            continue
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            texto = extrair_texto(dados, caminho)
+        except Exception as e:
+            print(f"Erro ao ler {caminho}: {e}", file=sys.stderr)
+            ignorados += 1
+            continue
+        if not texto.strip():
+            ignorados += 1
+            continue
+        salvar_documento(os.path.basename(caminho), texto, dados)
+        indexados += 1
+
+    if args.reconstruir:
+        reconstruir_indice()
+        print("Índice reconstruído.")
+    if args.caminhos:
+        print(f"{indexados} documentos indexados, {ignorados} ignorados.")
+
+if __name__ == "__main__":
+    main()
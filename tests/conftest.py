@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.dados import banco_temporario
+
+@pytest.fixture
+def banco():
+    """Caminho de um escola.db novo e vazio; utils.db aponta para ele durante o teste"""
+    with banco_temporario() as caminho:
+        yield caminho
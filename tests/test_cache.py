@@ -0,0 +1,93 @@
+import threading
+
+from controllers.estudante_controller import adicionar_estudante, buscar_estudantes, contar_estudantes
+from utils.cache import CacheVersionado, cache_por_versao
+from utils.db import conexao, incrementar_versao, versao_tabela
+
+def _escrever():
+    with conexao() as conn:
+        incrementar_versao(conn, "estudantes")
+
+def test_escrita_incrementa_a_versao(banco):
+    antes = versao_tabela("estudantes")
+    adicionar_estudante("Ana", "7", "8")
+    assert versao_tabela("estudantes") == antes + 1
+
+def test_escrita_esvazia_o_cache(banco):
+    cache = CacheVersionado("estudantes")
+    cargas = []
+
+    def carregar():
+        cargas.append(1)
+        return len(cargas)
+    assert cache.obter("k", carregar) == 1
+    assert cache.obter("k", carregar) == 1
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+    _escrever()
+    assert cache.obter("k", carregar) == 2
+    assert (cache.acertos, cache.falhas) == (1, 2)
+
+def test_consultas_veem_a_escrita(banco):
+    assert contar_estudantes() == 0
+    adicionar_estudante("Ana", "7", "8")
+    assert contar_estudantes() == 1
+    assert [e.nome for e in buscar_estudantes()] == ["Ana"]
+
+def test_outra_tabela_nao_esvazia(banco):
+    cache = CacheVersionado("estudantes")
+    cache.obter("k", lambda: "valor")
+    with conexao() as conn:
+        incrementar_versao(conn, "documentos")
+    assert cache.obter("k", lambda: "novo") == "valor"
+
+def test_lru_respeita_max_entradas(banco):
+    cache = CacheVersionado("estudantes", max_entradas=2)
+    cache.obter("a", lambda: "A")
+    cache.obter("b", lambda: "B")
+    cache.obter("a", lambda: "A2")  # a passa a ser a mais recente
+    cache.obter("c", lambda: "C")
+    assert cache.obter("a", lambda: "A3") == "A"
+    assert cache.obter("b", lambda: "B2") == "B2"
+
+def test_escrita_durante_a_carga_nao_fica_no_cache(banco):
+    cache = CacheVersionado("estudantes")
+
+    def carregar_e_escrever():
+        # Outra sessão grava enquanto esta ainda lê: o valor já nasce velho
+        _escrever()
+        return "velho"
+    assert cache.obter("k", carregar_e_escrever) == "velho"
+    assert cache.obter("k", lambda: "novo") == "novo"
+
+def test_decorador_por_argumentos(banco):
+    chamadas = []
+
+    @cache_por_versao("estudantes")
+    def consulta(a, b=0):
+        chamadas.append((a, b))
+        return a + b
+    assert consulta(1, b=2) == consulta(1, b=2) == 3
+    assert consulta(2) == 2
+    assert chamadas == [(1, 2), (2, 0)]
+    _escrever()
+    consulta(1, b=2)
+    assert chamadas == [(1, 2), (2, 0), (1, 2)]
+
+def test_limpar(banco):
+    cache = CacheVersionado("estudantes")
+    cache.obter("k", lambda: "valor")
+    cache.limpar()
+    assert cache.obter("k", lambda: "novo") == "novo"
+
+def test_sessoes_simultaneas(banco):
+    cache = CacheVersionado("estudantes")
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter("k", lambda: "valor")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resultados == ["valor"] * 8
+    assert cache.acertos + cache.falhas == 8
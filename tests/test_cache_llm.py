@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from utils import cache_llm
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_llm, "CAMINHO_CACHE", str(tmp_path / "cache_llm.db"))
+    monkeypatch.setattr(cache_llm, "INTERVALO_CONTADORES", 3600)
+    cache_llm.limpar()
+    yield cache_llm
+    cache_llm.limpar()
+
+def _consultar(sql, *params):
+    with sqlite3.connect(cache_llm.CAMINHO_CACHE) as conn:
+        return conn.execute(sql, params).fetchall()
+
+def _acessada(chave):
+    return _consultar("SELECT acessada FROM respostas WHERE chave = ?", chave)[0][0]
+
+def test_acerto_recente_nao_regrava_acessada(cache, monkeypatch):
+    cache.guardar("a", "resposta A")
+    marca = _acessada("a")
+    assert cache.obter("a") == "resposta A"
+    assert _acessada("a") == marca
+
+    monkeypatch.setattr(cache_llm, "INTERVALO_ACESSO", 0)
+    assert cache.obter("a") == "resposta A"
+    assert _acessada("a") > marca
+
+def test_contadores_acumulados_na_memoria(cache):
+    cache.guardar("a", "resposta A")
+    for _ in range(3):
+        cache.obter("a")
+    cache.obter("inexistente")
+    # Nada gravado ainda; estatisticas() grava o acumulado antes de ler
+    assert _consultar("SELECT nome, valor FROM contadores") == []
+    assert cache.estatisticas() == {"acertos": 3, "falhas": 1, "entradas": 1}
+    cache.obter("a")
+    assert cache.estatisticas()["acertos"] == 4
+
+def test_contadores_gravados_depois_do_intervalo(cache, monkeypatch):
+    monkeypatch.setattr(cache_llm, "INTERVALO_CONTADORES", 0)
+    cache.obter("inexistente")
+    assert _consultar("SELECT nome, valor FROM contadores") == [("falhas", 1)]
+
+def test_limpar_descarta_o_acumulado(cache):
+    cache.obter("inexistente")
+    cache.limpar()
+    assert cache.estatisticas() == {"acertos": 0, "falhas": 0, "entradas": 0}
+
+def test_despejo_pelo_ultimo_acesso(cache, monkeypatch):
+    monkeypatch.setattr(cache_llm, "MAX_ENTRADAS", 2)
+    monkeypatch.setattr(cache_llm, "INTERVALO_ACESSO", 0)
+    cache.guardar("a", "A")
+    cache.guardar("b", "B")
+    cache.obter("a")
+    cache.guardar("c", "C")
+    assert cache.obter("b") is None
+    assert cache.obter("a") == "A"
+    assert cache.obter("c") == "C"
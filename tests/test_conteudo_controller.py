@@ -0,0 +1,33 @@
+import pytest
+
+from controllers.conteudo_controller import filtrar_think, limpar_resposta
+
+RESPOSTAS = [
+    "<think>planejando a aula</think>\n\nResumo da aula sobre frações.",
+    "Texto sem raciocínio nenhum.",
+    "Antes <think>a < b e </thin não fecha</think>depois.",
+    "<think>primeiro</think>Parte 1 <think>segundo</think>Parte 2",
+    "Usa < e <th no texto, mas nenhum marcador.",
+]
+
+def _pedacos(texto, tamanho):
+    return [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)]
+
+@pytest.mark.parametrize("texto", RESPOSTAS)
+@pytest.mark.parametrize("tamanho", [1, 2, 3, 5, 7, 1000])
+def test_marcadores_quebrados_entre_pedacos(texto, tamanho):
+    saida = "".join(filtrar_think(_pedacos(texto, tamanho)))
+    assert saida.strip() == limpar_resposta(texto)
+    assert "<think>" not in saida and "</think>" not in saida
+
+@pytest.mark.parametrize("corte", range(1, len("<think>x</think>ok")))
+def test_cada_ponto_de_corte(corte):
+    texto = "<think>x</think>ok"
+    assert "".join(filtrar_think([texto[:corte], texto[corte:]])) == "ok"
+
+def test_think_sem_fechamento_nao_vaza():
+    assert "".join(filtrar_think(["Olá ", "<thi", "nk>rascunho sem fim"])) == "Olá "
+
+def test_texto_liberado_sem_esperar_o_fim():
+    pedacos = filtrar_think(iter(["Primeira parte. ", "<think>oculto</think>", "Segunda."]))
+    assert next(pedacos) == "Primeira parte. "
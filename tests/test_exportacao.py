@@ -0,0 +1,48 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from PyPDF2 import PdfReader
+
+from utils import exportacao
+
+@pytest.fixture
+def df():
+    n = 3 * exportacao.TAMANHO_BLOCO + 7
+    return pd.DataFrame({
+        "Matrícula": range(1, n + 1),
+        "Nome": [f"Estudante {i}" for i in range(n)],
+        "Média": [i % 100 / 10 for i in range(n)],
+    })
+
+def _texto(pdf):
+    return "\n".join(p.extract_text() for p in PdfReader(BytesIO(pdf)).pages)
+
+def test_pdf_tem_todas_as_linhas(df):
+    progresso = []
+    pdf = exportacao.relatorio_pdf(df, [], ao_progredir=lambda feitas, total: progresso.append((feitas, total)))
+    texto = _texto(pdf)
+    assert "Estudante 0" in texto
+    assert f"Estudante {len(df) - 1}" in texto
+    total = exportacao._blocos(df) + 1
+    assert progresso == [(i, total) for i in range(1, total + 1)]
+
+def test_pdf_de_tabela_vazia():
+    pdf = exportacao.relatorio_pdf(pd.DataFrame(columns=["Nome", "Média"]), [])
+    assert "Nome" in _texto(pdf)
+
+def test_pdf_monta_as_tabelas_durante_o_build(df, monkeypatch):
+    formatados, na_primeira_pagina = [], []
+    blocos_formatados = exportacao.blocos_formatados
+
+    def contados(*args, **kwargs):
+        for bloco in blocos_formatados(*args, **kwargs):
+            formatados.append(len(bloco))
+            yield bloco
+    monkeypatch.setattr(exportacao, "blocos_formatados", contados)
+    monkeypatch.setattr(exportacao._DocumentoPdf, "afterPage",
+                        lambda doc: na_primeira_pagina or na_primeira_pagina.append(len(formatados)))
+    exportacao.relatorio_pdf(df, [])
+    # A primeira página sai com só o primeiro bloco formatado, não a tabela inteira
+    assert na_primeira_pagina == [1]
+    assert len(formatados) == exportacao._blocos(df)
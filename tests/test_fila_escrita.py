@@ -0,0 +1,51 @@
+import sqlite3
+from concurrent.futures import Future
+
+import pytest
+
+from controllers.fila_escrita import FilaDeEscrita
+from utils.db import conexao, versao_tabela
+
+@pytest.fixture
+def fila(banco):
+    fila = FilaDeEscrita()
+    yield fila
+    fila.encerrar(timeout=5)
+
+def _estudantes():
+    with conexao() as conn:
+        return conn.execute("SELECT id, nome, nota1, nota2 FROM estudantes ORDER BY id").fetchall()
+
+def test_grupo_gravado_numa_transacao(fila):
+    versao = versao_tabela("estudantes")
+    # Tudo entra na fila antes da thread começar: um único grupo
+    futuros = []
+    for registro in [("Ana", 7.0, 8.0), ("Bruno", 5.0, 6.0), ("Carla", 9.0, 10.0)]:
+        futuros.append(Future())
+        fila._fila.put((registro, futuros[-1]))
+    fila.descarregar(timeout=5)
+
+    assert [f.result(0) for f in futuros] == [1, 2, 3]
+    assert versao_tabela("estudantes") == versao + 1
+    assert [nome for _, nome, _, _ in _estudantes()] == ["Ana", "Bruno", "Carla"]
+
+def test_falha_no_grupo_recusa_so_o_registro_ruim(fila):
+    # O registro do meio passa direto pela fila, sem validar_estudante, e viola o CHECK
+    registros = [("Ana", 7.0, 8.0), ("Ruim", 11.0, 5.0), ("Carla", 9.0, 10.0)]
+    futuros = [Future() for _ in registros]
+    for registro, futuro in zip(registros, futuros):
+        fila._fila.put((registro, futuro))
+    fila.descarregar(timeout=5)
+
+    assert futuros[0].result(0) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        futuros[1].result(0)
+    assert futuros[2].result(0) == 2
+    assert _estudantes() == [(1, "Ana", 7.0, 8.0), (2, "Carla", 9.0, 10.0)]
+    with conexao() as conn:
+        assert conn.execute("SELECT total FROM estatisticas_estudantes").fetchone()[0] == 2
+
+def test_enfileirar_valida_na_hora(fila):
+    with pytest.raises(ValueError):
+        fila.enfileirar("", 5, 5)
+    assert fila.enfileirar("Diego", "6,5", 7).result(5) == 1
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import plotly.graph_objects as go
+import pytest
+
+from utils import imagens_graficos
+
+@pytest.fixture
+def renderizacoes(tmp_path, monkeypatch):
+    """Cache em disco numa pasta temporária e um kaleido falso que conta as chamadas"""
+    monkeypatch.setattr(imagens_graficos, "PASTA_CACHE_DISCO", str(tmp_path))
+    chamadas = []
+
+    def to_image(figura, format, scale):
+        chamadas.append(figura.layout.title.text)
+        time.sleep(0.2)
+        return f"png:{figura.layout.title.text}".encode()
+    monkeypatch.setattr(imagens_graficos.pio, "to_image", to_image)
+    imagens_graficos.limpar_cache()
+    yield chamadas
+    imagens_graficos.limpar_cache()
+
+def _figura(titulo):
+    return go.Figure(go.Bar(x=[1, 2], y=[3, 4]), layout={"title": {"text": titulo}}).to_dict()
+
+def test_disco_compartilhado_entre_processos(renderizacoes):
+    assert imagens_graficos.renderizar(_figura("A")) == b"png:A"
+    # Outro processo de exportação: memória vazia, mesmo disco
+    imagens_graficos.limpar_cache()
+    assert imagens_graficos.renderizar(_figura("A")) == b"png:A"
+    assert renderizacoes == ["A"]
+
+def test_renderizacoes_simultaneas_da_mesma_figura(renderizacoes):
+    resultados = []
+
+    def exportar():
+        resultados.append(imagens_graficos.renderizar(_figura("A")))
+    # Como o PDF e o PPTX de "Exportar todos": as duas começam sem nada em cache
+    threads = [threading.Thread(target=exportar) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resultados == [b"png:A", b"png:A"]
+    assert renderizacoes == ["A"]
+    assert [n for n in os.listdir(imagens_graficos.PASTA_CACHE_DISCO) if n.endswith(".trava")] == []
+
+def test_poda_do_disco_remove_o_menos_usado(renderizacoes, monkeypatch):
+    monkeypatch.setattr(imagens_graficos, "MAX_ARQUIVOS_DISCO", 2)
+    imagens_graficos.renderizar(_figura("A"))
+    imagens_graficos.renderizar(_figura("B"))
+    # A é a mais antiga no disco, mas é lida de novo e B não
+    caminho_a, caminho_b = (
+        imagens_graficos._caminho_disco(imagens_graficos.chave_figura(_figura(t)), "png") for t in "AB"
+    )
+    os.utime(caminho_a, (time.time() - 200, time.time() - 200))
+    os.utime(caminho_b, (time.time() - 100, time.time() - 100))
+    imagens_graficos.limpar_cache()
+    imagens_graficos.renderizar(_figura("A"))  # acerto no disco renova o mtime
+
+    imagens_graficos.renderizar(_figura("C"))
+    assert not os.path.exists(caminho_b)
+    imagens_graficos.limpar_cache()
+    imagens_graficos.renderizar(_figura("A"))
+    assert renderizacoes == ["A", "B", "C"]
+
+def test_trava_abandonada_nao_bloqueia(renderizacoes, monkeypatch):
+    chave = imagens_graficos.chave_figura(_figura("A"))
+    trava = f"{imagens_graficos._caminho_disco(chave, 'png')}.trava"
+    open(trava, "w").close()
+    antiga = time.time() - imagens_graficos.ESPERA_TRAVA - 1
+    os.utime(trava, (antiga, antiga))
+    assert imagens_graficos.renderizar(_figura("A")) == b"png:A"
+    assert not os.path.exists(trava)
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+
+from controllers import estudante_controller
+from controllers.estudante_controller import importar_estudantes
+from utils.db import conexao, versao_tabela
+
+def _csv(texto, codificacao="utf-8"):
+    return io.BytesIO(texto.encode(codificacao))
+
+def _estudantes():
+    with conexao() as conn:
+        return conn.execute("SELECT nome, nota1, nota2 FROM estudantes ORDER BY id").fetchall()
+
+def test_cabecalho_em_outra_ordem_e_com_colunas_extras(banco):
+    arquivo = _csv("Turma,2º Nota,NOME,1º nota\nA,8,Ana,7\nB,6,Bruno,5\n")
+    resultado = importar_estudantes(arquivo, "turma.csv")
+    assert resultado["inseridos"] == 2
+    assert _estudantes() == [("Ana", 7.0, 8.0), ("Bruno", 5.0, 6.0)]
+
+def test_colunas_obrigatorias_ausentes(banco):
+    with pytest.raises(ValueError, match="nota2"):
+        importar_estudantes(_csv("nome,nota1\nAna,7\n"), "turma.csv")
+    assert _estudantes() == []
+
+def test_excel_em_portugues_cp1252_com_ponto_e_virgula(banco):
+    # Acento logo depois do primeiro lote: antes, o erro de decodificação vinha com lotes já gravados
+    linhas = [f"Aluno {i};7,5;8" for i in range(3)] + ["João Conceição;6,25;9,5"]
+    arquivo = _csv("nome;nota1;nota2\r\n" + "\r\n".join(linhas) + "\r\n", "cp1252")
+    resultado = importar_estudantes(arquivo, "turma.csv", tamanho_lote=2)
+    assert resultado["inseridos"] == 4
+    assert _estudantes()[-1] == ("João Conceição", 6.25, 9.5)
+
+def test_utf8_com_bom(banco):
+    arquivo = io.BytesIO("nome,nota1,nota2\nÉrica,\"9,5\",10\n".encode("utf-8-sig"))
+    importar_estudantes(arquivo, "turma.csv")
+    assert _estudantes() == [("Érica", 9.5, 10.0)]
+
+def test_codificacao_desconhecida_nao_grava_nada(banco):
+    # 0x81 não existe em UTF-8 nem em cp1252
+    arquivo = io.BytesIO(b"nome,nota1,nota2\n" + b"Ana,7,8\n" * 10 + b"Bruno\x81,5,6\n")
+    with pytest.raises(ValueError, match="codificação"):
+        importar_estudantes(arquivo, "turma.csv", tamanho_lote=2)
+    assert _estudantes() == []
+
+def test_linhas_rejeitadas_com_numero_da_linha(banco):
+    arquivo = _csv("nome,nota1,nota2\nAna,7,8\n,5,5\nBruno,onze,5\n\nCarla,11,5\nDiego,,4\nElisa,10,0\n")
+    resultado = importar_estudantes(arquivo, "turma.csv")
+    assert resultado["inseridos"] == 2
+    assert [numero for numero, _ in resultado["rejeitados"]] == [3, 4, 6, 7]
+    assert "nome vazio" in resultado["rejeitados"][0][1]
+    assert "nota inválida" in resultado["rejeitados"][1][1]
+    assert [nome for nome, _, _ in _estudantes()] == ["Ana", "Elisa"]
+
+def test_lotes_em_transacoes_separadas(banco):
+    versao = versao_tabela("estudantes")
+    progresso = []
+    arquivo = _csv("nome,nota1,nota2\n" + "".join(f"Aluno {i},5,6\n" for i in range(5)))
+    resultado = importar_estudantes(arquivo, "turma.csv", tamanho_lote=2,
+                                    ao_progredir=lambda ok, erros: progresso.append(ok))
+    assert resultado["inseridos"] == 5
+    assert progresso == [2, 4, 5]
+    assert versao_tabela("estudantes") == versao + 3
+    with conexao() as conn:
+        assert conn.execute("SELECT total, soma FROM estatisticas_estudantes").fetchone() == (5, 27.5)
+
+def test_falha_no_meio_informa_quantos_ja_foram_gravados(banco, monkeypatch):
+    original = estudante_controller.registrar_medias
+    chamadas = []
+
+    def falha_no_segundo_lote(conn, medias):
+        chamadas.append(medias)
+        if len(chamadas) == 2:
+            raise RuntimeError("disco cheio")
+        original(conn, medias)
+    monkeypatch.setattr(estudante_controller, "registrar_medias", falha_no_segundo_lote)
+
+    arquivo = _csv("nome,nota1,nota2\n" + "".join(f"Aluno {i},5,6\n" for i in range(5)))
+    with pytest.raises(RuntimeError) as erro:
+        importar_estudantes(arquivo, "turma.csv", tamanho_lote=2)
+    assert erro.value.inseridos == 2
+    assert len(_estudantes()) == 2
+
+def test_xlsx(banco):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    wb.active.append(["Nome", "Nota 1", "Nota 2"])
+    wb.active.append(["Ana", 7.5, "8,5"])
+    wb.active.append([None, None, None])
+    wb.active.append(["Bruno", 15, 5])
+    arquivo = io.BytesIO()
+    wb.save(arquivo)
+    arquivo.seek(0)
+
+    resultado = importar_estudantes(arquivo, "turma.XLSX")
+    assert resultado["inseridos"] == 1
+    assert [numero for numero, _ in resultado["rejeitados"]] == [4]
+    assert _estudantes() == [("Ana", 7.5, 8.5)]
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from utils import indice_semantico
+from utils.indice_semantico import EmbeddingHash, EmbeddingLangChain, IndiceSemantico
+
+FOTOSSINTESE = ("A fotossíntese acontece nos cloroplastos. A clorofila absorve a luz do sol "
+                "e a planta produz glicose a partir de gás carbônico e água. ") * 20
+REVOLUCAO = ("A Revolução Francesa começou em 1789 com a queda da Bastilha. A monarquia "
+             "absolutista caiu e a burguesia chegou ao poder. ") * 20
+
+@pytest.fixture
+def indice(tmp_path):
+    return IndiceSemantico(str(tmp_path), embedding=EmbeddingHash())
+
+def _trechos(indice, documento_hash):
+    with sqlite3.connect(indice._banco) as conn:
+        return conn.execute("SELECT COUNT(*) FROM trechos WHERE documento_hash = ?",
+                            (documento_hash,)).fetchone()[0]
+
+def test_indexar_uma_vez_por_documento(indice):
+    quantidade = indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    assert quantidade > 1
+    assert indice.indexado("bio")
+    assert indice.indexar("bio", "biologia.pdf", FOTOSSINTESE) == 0
+    assert _trechos(indice, "bio") == quantidade
+
+def test_buscar_trecho_relevante(indice):
+    indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    indice.indexar("hist", "historia.pdf", REVOLUCAO)
+    resultados = indice.buscar("clorofila e cloroplastos", k=3)
+    assert len(resultados) == 3
+    assert "cloroplastos" in resultados[0][0]
+    assert [s for _, s in resultados] == sorted((s for _, s in resultados), reverse=True)
+
+def test_buscar_filtrando_o_documento(indice):
+    indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    indice.indexar("hist", "historia.pdf", REVOLUCAO)
+    resultados = indice.buscar("clorofila e cloroplastos", k=50, documento_hash="hist")
+    assert resultados
+    assert all("Bastilha" in texto or "burguesia" in texto for texto, _ in resultados)
+    assert indice.buscar("clorofila", documento_hash="inexistente") == []
+
+def test_indice_persistido_no_disco(indice, tmp_path):
+    indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    reaberto = IndiceSemantico(str(tmp_path), embedding=EmbeddingHash())
+    assert reaberto.indexado("bio")
+    assert "cloroplastos" in reaberto.buscar("cloroplastos", k=1)[0][0]
+
+def test_falha_ao_salvar_desfaz_a_indexacao(indice, monkeypatch):
+    indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    total = indice._carregar().ntotal
+
+    def disco_cheio():
+        raise OSError("sem espaço no disco")
+    monkeypatch.setattr(indice, "_salvar", disco_cheio)
+    with pytest.raises(OSError):
+        indice.indexar("hist", "historia.pdf", REVOLUCAO)
+
+    # Nem trechos órfãos no SQLite nem vetores somados ao índice em memória
+    assert not indice.indexado("hist")
+    assert _trechos(indice, "hist") == 0
+    assert indice._carregar().ntotal == total
+    assert indice.buscar("Bastilha", k=50, documento_hash="hist") == []
+
+    monkeypatch.undo()
+    assert indice.indexar("hist", "historia.pdf", REVOLUCAO) > 0
+    assert "Bastilha" in indice.buscar("queda da Bastilha", k=1, documento_hash="hist")[0][0]
+
+def test_embedding_langchain(tmp_path):
+    embedding = EmbeddingLangChain.de("teste", DeterministicFakeEmbedding(size=32), "modelo/v1")
+    assert embedding.nome == "teste-modelo_v1"
+    indice = IndiceSemantico(str(tmp_path), embedding=embedding)
+    indice.indexar("bio", "biologia.pdf", FOTOSSINTESE)
+    assert indice._arquivo_indice.endswith("teste-modelo_v1.faiss")
+    assert len(indice.buscar("cloroplastos", k=2)) == 2
+
+def test_provedor_indisponivel_usa_o_hash(monkeypatch):
+    def sem_pacote():
+        raise ImportError("No module named 'langchain_huggingface'")
+    monkeypatch.setitem(indice_semantico.FABRICAS_EMBEDDING, "huggingface", sem_pacote)
+    assert isinstance(indice_semantico.criar_embedding("huggingface"), EmbeddingHash)
+    assert isinstance(indice_semantico.criar_embedding("hash"), EmbeddingHash)
+    with pytest.raises(KeyError):
+        indice_semantico.criar_embedding("desconhecido")
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+import utils.db as db
+
+LEGADOS = [
+    ("Ana", 7.5, 8),
+    ("Bruno", "6,5", " 9 "),
+    ("Carla", "abc", 5),
+    ("Diego", 12, -1),
+    (None, None, 4),
+    ("Excluído", 1, 1),
+]
+
+@pytest.fixture
+def banco_legado(tmp_path):
+    """Banco de antes das migrações: notas FLOAT sem validação, com texto gravado nelas"""
+    caminho = str(tmp_path / "legado.db")
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE estudantes (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT, nota1 FLOAT, nota2 FLOAT)")
+    conn.executemany("INSERT INTO estudantes (nome, nota1, nota2) VALUES (?, ?, ?)", LEGADOS)
+    conn.execute("DELETE FROM estudantes WHERE nome = 'Excluído'")
+    conn.commit()
+    conn.close()
+    yield caminho
+    db.fechar_conexoes()
+
+def test_migracao_converte_notas_legadas(banco_legado):
+    assert db.migrar(banco_legado) == db.MIGRACOES[-1][0]
+    with db.conexao(banco_legado) as conn:
+        linhas = conn.execute("SELECT id, nome, nota1, nota2, media FROM estudantes ORDER BY id").fetchall()
+        descartadas = conn.execute(
+            "SELECT estudante_id, coluna, valor_original FROM notas_descartadas ORDER BY estudante_id, coluna"
+        ).fetchall()
+    assert linhas == [
+        (1, "Ana", 7.5, 8.0, 7.75),
+        (2, "Bruno", 6.5, 9.0, 7.75),
+        (3, "Carla", None, 5.0, None),
+        (4, "Diego", None, None, None),
+        (5, "", None, 4.0, None),
+    ]
+    # Nada é inventado: o que não era nota válida fica NULL e o original é guardado
+    assert descartadas == [
+        (3, "nota1", "abc"),
+        (4, "nota1", "12.0"),
+        (4, "nota2", "-1.0"),
+    ]
+
+def test_migracao_preserva_sequencia_estatisticas_e_check(banco_legado):
+    db.migrar(banco_legado)
+    with db.conexao(banco_legado) as conn:
+        # Estatísticas refeitas a partir das médias convertidas (Ana e Bruno)
+        total, = conn.execute("SELECT total FROM estatisticas_estudantes").fetchone()
+        novo = conn.execute("INSERT INTO estudantes (nome, nota1, nota2) VALUES ('Elisa', 5, 6)").lastrowid
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO estudantes (nome, nota1, nota2) VALUES ('Felipe', 11, 6)")
+    # O id do aluno excluído antes da migração não volta
+    assert novo == 7
+    assert total == 2
+
+def test_migracao_roda_uma_vez(banco_legado):
+    db.migrar(banco_legado)
+    db.migrar(banco_legado)
+    with db.conexao(banco_legado) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM estudantes").fetchone()[0] == 5
+        assert conn.execute("SELECT COUNT(*) FROM notas_descartadas").fetchone()[0] == 3
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.dados import gerar_estudantes
+from controllers.estudante_controller import (
+    ORDENACOES, SQL_INSERIR, buscar_estudantes, contar_estudantes, cursor_de, dataframe_estudantes
+)
+from utils.db import conexao, incrementar_versao
+
+# Empates de nome e de média forçam o desempate pelo id no cursor
+EMPATES = [("Ana", 5.0, 5.0), ("Ana", 5.0, 5.0), ("Bruno", 7.0, 3.0), ("Bruno", 3.0, 7.0), ("Ana_1%", 9.0, 9.0)]
+
+@pytest.fixture
+def estudantes(banco):
+    with conexao() as conn:
+        conn.executemany(SQL_INSERIR, gerar_estudantes(300) + EMPATES)
+        # Sem média (notas descartadas na migração): NULL vem primeiro ordenando por média
+        conn.executemany("INSERT INTO estudantes (nome) VALUES (?)", [("Sem Notas",), ("Ana Sem Notas",)])
+        incrementar_versao(conn, "estudantes")
+
+def _paginas(tamanho, order_by, **filtros):
+    """Ids de todas as páginas, seguindo o cursor do último registro de cada uma"""
+    ids, apos = [], None
+    while True:
+        pagina = buscar_estudantes(**filtros, limit=tamanho + 1, order_by=order_by, apos=apos)
+        ids.extend(e.id for e in pagina[:tamanho])
+        if len(pagina) <= tamanho:
+            return ids
+        apos = cursor_de(pagina[tamanho - 1], order_by)
+
+FILTROS = [{}, {"min_media": 4.0, "max_media": 7.0}, {"nome_like": "ana"}, {"nome_like": "_1%"},
+           {"min_media": 5.0, "nome_like": "a"}]
+
+@pytest.mark.parametrize("order_by", sorted(ORDENACOES))
+@pytest.mark.parametrize("filtros", FILTROS)
+@pytest.mark.parametrize("tamanho", [1, 7, 50])
+def test_keyset_igual_a_consulta_completa(estudantes, order_by, filtros, tamanho):
+    completa = [e.id for e in buscar_estudantes(**filtros, order_by=order_by)]
+    assert completa
+    assert _paginas(tamanho, order_by, **filtros) == completa
+    assert contar_estudantes(**filtros) == len(completa)
+
+@pytest.mark.parametrize("order_by", sorted(ORDENACOES))
+def test_keyset_igual_ao_offset(estudantes, order_by):
+    filtros = {"min_media": 2.0, "max_media": 8.0}
+    por_offset = []
+    while pagina := buscar_estudantes(**filtros, limit=20, offset=len(por_offset), order_by=order_by):
+        por_offset.extend(e.id for e in pagina)
+    assert _paginas(20, order_by, **filtros) == por_offset
+
+def test_ordem_da_consulta_completa(estudantes):
+    df = dataframe_estudantes(order_by="media", matricula=False)
+    medias = df["Média"].dropna().tolist()
+    assert df["Média"].isna().sum() == 2
+    assert df["Média"].head(2).isna().all()
+    assert medias == sorted(medias)
+
+def test_ordenacao_invalida(estudantes):
+    with pytest.raises(ValueError):
+        buscar_estudantes(order_by="nome; DROP TABLE estudantes")
@@ -0,0 +1,83 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from benchmarks.dados import gerar_estudantes
+from controllers import estudante_controller
+from controllers.estudante_controller import SQL_INSERIR
+from utils import snapshot
+from utils.db import conexao, incrementar_versao
+
+# Nomes em que LIKE/COLLATE NOCASE (só ASCII) e as funções Unicode divergem
+NOMES_DIFICEIS = [
+    ("Álvaro Éden", 5.0, 5.0), ("alvaro Costa", 6.0, 6.0), ("ÁLVARO Lima", 7.0, 7.0),
+    ("Zé", 1.0, 1.0), ("Ana_100%", 2.0, 2.0), ("AnaX100y", 3.0, 3.0), ("a\\b", 4.0, 4.0),
+]
+
+@pytest.fixture
+def estudantes(banco):
+    with conexao() as conn:
+        conn.executemany(SQL_INSERIR, gerar_estudantes(500) + NOMES_DIFICEIS)
+        conn.execute("INSERT INTO estudantes (nome) VALUES ('Sem Notas')")
+        incrementar_versao(conn, "estudantes")
+
+@pytest.mark.parametrize("nome_like", [None, "ana", "ÁLV", "álv", "ALV", "_", "%", "a\\b", "100%", "é"])
+@pytest.mark.parametrize("order_by", ["id", "nome", "media"])
+@pytest.mark.parametrize("faixa", [(None, None), (3, 7)])
+def test_mesmas_linhas_do_sql(estudantes, nome_like, order_by, faixa):
+    esperado = estudante_controller.dataframe_estudantes(*faixa, nome_like, order_by)
+    obtido, desatualizado = snapshot.dataframe_estudantes(*faixa, nome_like, order_by)
+    assert not desatualizado
+    pd.testing.assert_frame_equal(obtido.reset_index(drop=True), esperado.reset_index(drop=True))
+
+def test_snapshot_desatualizado_apos_escrita(estudantes):
+    snapshot.dataframe_estudantes()
+    with conexao() as conn:
+        conn.execute(SQL_INSERIR, ("Novo", 5.0, 5.0))
+        incrementar_versao(conn, "estudantes")
+    df, desatualizado = snapshot.dataframe_estudantes()
+    assert desatualizado
+    assert "Novo" not in set(df["Nome"])
+
+    # A regeneração agendada termina antes de o banco temporário sumir
+    with snapshot._gerando:
+        pass
+    snapshot.limpar_cache()
+    df, desatualizado = snapshot.dataframe_estudantes()
+    assert not desatualizado
+    assert "Novo" in set(df["Nome"])
+
+def test_snapshot_de_versao_maior_esta_desatualizado(estudantes):
+    snapshot.dataframe_estudantes()
+    # Banco recriado ou restaurado de backup: a contagem de versões volta para trás
+    with conexao() as conn:
+        conn.execute("UPDATE versoes_tabelas SET versao = 0 WHERE tabela = 'estudantes'")
+    _, desatualizado = snapshot.snapshot_atual()
+    assert desatualizado
+    with snapshot._gerando:
+        pass
+    assert snapshot.snapshot_atual() == (snapshot._caminho(snapshot._pasta(), 0), False)
+
+def test_relatorio_usa_o_sql_sem_snapshot(estudantes, monkeypatch):
+    from utils import metricas
+    from views import relatorio
+
+    def corrompido(**_):
+        raise pa.ArrowInvalid("arquivo truncado")
+    monkeypatch.setattr(snapshot, "dataframe_estudantes", corrompido)
+    antes = metricas.contadores().get("relatorio.snapshot_indisponivel", 0)
+    df, desatualizado = relatorio.dados_filtrados({"min_media": 3, "max_media": 7}, "nome")
+    pd.testing.assert_frame_equal(
+        df, estudante_controller.dataframe_estudantes(3, 7, order_by="nome", matricula=False)
+    )
+    assert not desatualizado
+    assert metricas.contadores()["relatorio.snapshot_indisponivel"] == antes + 1
+
+def test_relatorio_nao_esconde_erros_de_programacao(estudantes, monkeypatch):
+    from views import relatorio
+
+    def quebrado(**_):
+        raise TypeError("argumento inesperado")
+    monkeypatch.setattr(snapshot, "dataframe_estudantes", quebrado)
+    with pytest.raises(TypeError):
+        relatorio.dados_filtrados({})
@@ -0,0 +1,45 @@
+import multiprocessing
+import time
+
+import pytest
+
+from utils import tarefas
+from utils.exportacao import MIME_DOCX, documento_docx
+from utils.tarefas import FilaDeExportacao, STATUS_CONCLUIDA, STATUS_ERRO, STATUS_FILA, STATUS_EXECUTANDO
+
+def _esperar(fila, id, timeout=60):
+    limite = time.monotonic() + timeout
+    while fila.obter(id).status in (STATUS_FILA, STATUS_EXECUTANDO):
+        assert time.monotonic() < limite, "tarefa não terminou"
+        time.sleep(0.05)
+    return fila.obter(id)
+
+def test_sem_forkserver_usa_spawn(monkeypatch):
+    # Como no Windows, onde só existe spawn
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    assert tarefas.contexto_processos().get_start_method() == "spawn"
+
+@pytest.mark.parametrize("metodo", ["forkserver", "spawn"])
+def test_pool_gera_arquivo_com_cada_metodo(monkeypatch, metodo):
+    if metodo not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{metodo} indisponível nesta plataforma")
+    monkeypatch.setattr(tarefas, "METODOS_PROCESSOS", (metodo,))
+    fila = FilaDeExportacao(max_processos=1)
+    try:
+        id = fila.submeter(documento_docx, "Aula", "Frações", nome_arquivo="aula.docx", mime=MIME_DOCX)
+        tarefa = _esperar(fila, id)
+        assert fila._executor._mp_context.get_start_method() == metodo
+        assert tarefa.status == STATUS_CONCLUIDA, tarefa.erro
+        assert tarefa.resultado[:2] == b"PK"
+    finally:
+        fila.encerrar()
+
+def test_erro_da_funcao_vira_status_erro():
+    fila = FilaDeExportacao(max_processos=1)
+    try:
+        id = fila.submeter(documento_docx, "Aula", nome_arquivo="aula.docx", mime=MIME_DOCX)
+        tarefa = _esperar(fila, id)
+        assert tarefa.status == STATUS_ERRO
+        assert isinstance(tarefa.erro, TypeError)
+    finally:
+        fila.encerrar()
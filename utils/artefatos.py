@@ -0,0 +1,227 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Armazém dos arquivos gerados (DOCX, PDF, PPTX) que aguardam download.
+# Conteúdos iguais são guardados uma vez só (pelo hash), cada sessão tem um
+# teto de bytes, o processo tem outro, e os maiores vão para disco em vez
+# de ficar na memória do worker.
+
+# Teto por sessão; ao passar, os arquivos mais antigos da sessão saem
+MAX_BYTES_SESSAO = 100 * 1024 * 1024
+
+# Teto do processo (memória + disco); ao passar, saem os menos usados
+MAX_BYTES_TOTAL = 1024 * 1024 * 1024
+
+# Teto da parte em memória; o excedente é despejado em disco
+MAX_BYTES_MEMORIA = 128 * 1024 * 1024
+
+# Arquivos a partir deste tamanho vão direto para disco
+LIMITE_DISCO = 2 * 1024 * 1024
+
+# Sessões sem acesso por este tempo (s) têm os arquivos liberados
+SESSAO_INATIVA = 30 * 60
+
+# Intervalo mínimo (s) entre duas varreduras de sessões encerradas
+INTERVALO_VARREDURA = 60
+
+class Artefato:
+    __slots__ = ("hash", "tamanho", "dados", "caminho", "donos")
+
+    def __init__(self, hash, tamanho):
+        self.hash = hash
+        self.tamanho = tamanho
+        self.dados = None
+        self.caminho = None
+        self.donos = set()
+
+class ArmazemDeArtefatos:
+    """Guarda bytes por sessão com LRU, deduplicação e despejo em disco.
+
+    Os arquivos de uma sessão são liberados quando ela fica SESSAO_INATIVA
+    sem acesso ou quando sessao_ativa(sessão), se configurada, diz que ela
+    acabou. A verificação roda junto de guardar/ler/tocar, no máximo uma vez
+    por INTERVALO_VARREDURA.
+    """
+
+    def __init__(self, max_bytes_sessao=MAX_BYTES_SESSAO, max_bytes_total=MAX_BYTES_TOTAL,
+                 max_bytes_memoria=MAX_BYTES_MEMORIA, limite_disco=LIMITE_DISCO,
+                 sessao_inativa=SESSAO_INATIVA, sessao_ativa=None):
+        self.max_bytes_sessao = max_bytes_sessao
+        self.max_bytes_total = max_bytes_total
+        self.max_bytes_memoria = max_bytes_memoria
+        self.limite_disco = limite_disco
+        self.sessao_inativa = sessao_inativa
+        self.sessao_ativa = sessao_ativa
+        self._acessos = {}            # sessão → último acesso (time.monotonic)
+        self._proxima_varredura = 0.0
+        self._itens = OrderedDict()   # hash → Artefato, do menos para o mais usado
+        self._sessoes = {}            # sessão → OrderedDict(hash → referências)
+        self._bytes_memoria = 0
+        self._bytes_disco = 0
+        self._pasta = None
+        self._lock = threading.Lock()
+
+    def _caminho(self, hash):
+        if self._pasta is None:
+            self._pasta = tempfile.mkdtemp(prefix="sofia_artefatos_")
+        return os.path.join(self._pasta, hash)
+
+    def _para_disco(self, item):
+        item.caminho = self._caminho(item.hash)
+        with open(item.caminho, "wb") as f:
+            f.write(item.dados)
+        item.dados = None
+        self._bytes_memoria -= item.tamanho
+        self._bytes_disco += item.tamanho
+
+    def guardar(self, sessao, dados):
+        """Guarda os bytes para a sessão e devolve a chave (hash do conteúdo)"""
+        hash = hashlib.sha256(dados).hexdigest()
+        with self._lock:
+            self._registrar_acesso(sessao)
+            item = self._itens.get(hash)
+            if item is None:
+                item = self._itens[hash] = Artefato(hash, len(dados))
+                item.dados = bytes(dados)
+                self._bytes_memoria += item.tamanho
+                if item.tamanho >= self.limite_disco:
+                    self._para_disco(item)
+            else:
+                self._itens.move_to_end(hash)
+            item.donos.add(sessao)
+            da_sessao = self._sessoes.setdefault(sessao, OrderedDict())
+            da_sessao[hash] = da_sessao.get(hash, 0) + 1
+            da_sessao.move_to_end(hash)
+            self._limitar(sessao)
+        return hash
+
+    def ler(self, hash):
+        """Bytes do artefato, ou None se ele já foi descartado"""
+        with self._lock:
+            self._varrer()
+            item = self._itens.get(hash)
+            if item is None:
+                return None
+            self._itens.move_to_end(hash)
+            if item.dados is not None:
+                return item.dados
+            caminho = item.caminho
+        try:
+            with open(caminho, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def contem(self, hash):
+        with self._lock:
+            return hash in self._itens
+
+    def liberar(self, sessao, hash):
+        """Solta uma referência da sessão; sem nenhuma sessão usando, o artefato é apagado"""
+        with self._lock:
+            self._soltar(sessao, hash)
+
+    def tocar(self, sessao):
+        """Marca a sessão como ativa (chamado a cada rerun das páginas com arquivos)"""
+        with self._lock:
+            self._registrar_acesso(sessao)
+
+    def encerrar_sessao(self, sessao):
+        with self._lock:
+            self._encerrar(sessao)
+
+    def _encerrar(self, sessao):
+        self._acessos.pop(sessao, None)
+        for hash in list(self._sessoes.get(sessao, ())):
+            self._soltar(sessao, hash, todas=True)
+
+    def _registrar_acesso(self, sessao):
+        self._acessos[sessao] = time.monotonic()
+        self._varrer()
+
+    def _varrer(self):
+        """Libera as sessões encerradas ou inativas"""
+        agora = time.monotonic()
+        if agora < self._proxima_varredura:
+            return
+        self._proxima_varredura = agora + INTERVALO_VARREDURA
+        for sessao in list(self._sessoes.keys() | self._acessos.keys()):
+            inativa = agora - self._acessos.get(sessao, agora) > self.sessao_inativa
+            if inativa or (self.sessao_ativa is not None and not self.sessao_ativa(sessao)):
+                self._encerrar(sessao)
+
+    def _soltar(self, sessao, hash, todas=False):
+        da_sessao = self._sessoes.get(sessao)
+        if da_sessao is None or hash not in da_sessao:
+            return
+        da_sessao[hash] -= 1
+        if da_sessao[hash] > 0 and not todas:
+            return
+        del da_sessao[hash]
+        if not da_sessao:
+            del self._sessoes[sessao]
+        item = self._itens.get(hash)
+        if item is not None:
+            item.donos.discard(sessao)
+            if not item.donos:
+                self._apagar(item)
+
+    def _apagar(self, item):
+        del self._itens[item.hash]
+        for sessao in list(item.donos):
+            self._sessoes[sessao].pop(item.hash, None)
+            if not self._sessoes[sessao]:
+                del self._sessoes[sessao]
+        if item.dados is not None:
+            self._bytes_memoria -= item.tamanho
+        else:
+            self._bytes_disco -= item.tamanho
+            try:
+                os.remove(item.caminho)
+            except OSError:
+                pass
+
+    def _limitar(self, sessao):
+        # O arquivo recém-guardado nunca é descartado, mesmo sozinho acima do teto
+        da_sessao = self._sessoes[sessao]
+        while len(da_sessao) > 1 and sum(self._itens[h].tamanho for h in da_sessao) > self.max_bytes_sessao:
+            self._soltar(sessao, next(iter(da_sessao)), todas=True)
+
+        while len(self._itens) > 1 and self._bytes_memoria + self._bytes_disco > self.max_bytes_total:
+            self._apagar(next(iter(self._itens.values())))
+
+        if self._bytes_memoria > self.max_bytes_memoria:
+            for item in list(self._itens.values()):
+                if self._bytes_memoria <= self.max_bytes_memoria:
+                    break
+                if item.dados is not None:
+                    self._para_disco(item)
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "artefatos": len(self._itens),
+                "sessoes": len(self._sessoes),
+                "bytes_memoria": self._bytes_memoria,
+                "bytes_disco": self._bytes_disco,
+            }
+
+    def limpar(self):
+        """Descarta tudo e remove a pasta temporária"""
+        with self._lock:
+            self._itens.clear()
+            self._sessoes.clear()
+            self._acessos.clear()
+            self._bytes_memoria = self._bytes_disco = 0
+            if self._pasta is not None:
+                shutil.rmtree(self._pasta, ignore_errors=True)
+                self._pasta = None
+
+armazem = ArmazemDeArtefatos()
+atexit.register(armazem.limpar)
@@ -0,0 +1,62 @@
+import functools
+import threading
+from collections import OrderedDict
+
+from utils.db import versao_tabela
+
+class CacheVersionado:
+    """LRU em memória, compartilhado entre reruns e sessões, que é
+    esvaziado sempre que a versão da tabela no banco muda.
+    """
+
+    def __init__(self, tabela, max_entradas=32):
+        self.tabela = tabela
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._versao = None
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, carregar):
+        versao = versao_tabela(self.tabela)
+        with self._lock:
+            if versao != self._versao:
+                self._entradas.clear()
+                self._versao = versao
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave]
+            self.falhas += 1
+
+        valor = carregar()
+        with self._lock:
+            # Só guarda se ninguém escreveu na tabela enquanto carregava
+            if versao == self._versao:
+                self._entradas[chave] = valor
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._versao = None
+
+def cache_por_versao(tabela, max_entradas=32):
+    """Decorador: memoriza o resultado por argumentos até a tabela mudar de versão.
+
+    O valor devolvido é compartilhado; quem chama não deve modificá-lo.
+    """
+    def decorador(func):
+        cache = CacheVersionado(tabela, max_entradas)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = (args, tuple(sorted(kwargs.items())))
+            return cache.obter(chave, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorador
@@ -0,0 +1,150 @@
+import atexit
+import hashlib
+import sqlite3
+import threading
+import time
+
+from utils.db import conexao
+
+# Cache das respostas da IA, num SQLite separado para não disputar o
+# banco principal
+CAMINHO_CACHE = "data/cache_llm.db"
+
+# Respostas expiram depois deste tempo (s)
+VALIDADE = 30 * 24 * 60 * 60
+
+# Quantidade máxima de respostas guardadas; as menos acessadas saem primeiro
+MAX_ENTRADAS = 2000
+
+# Um acerto só regrava `acessada` se a última marca tiver mais que isto (s):
+# a ordem de despejo continua certa na escala de minutos e a maioria dos
+# acertos vira só leitura
+INTERVALO_ACESSO = 60
+
+# Acertos e falhas ficam somados na memória e vão ao banco no máximo a cada
+# INTERVALO_CONTADORES s (e ao sair do processo)
+INTERVALO_CONTADORES = 60
+
+_criado = set()
+_lock = threading.Lock()
+
+# (caminho do banco, contador) → quantidade ainda não gravada
+_pendentes = {}
+_pendentes_lock = threading.Lock()
+_ultima_gravacao = time.monotonic()
+
+def _banco():
+    """Conexão do pool do cache, criando as tabelas na primeira vez"""
+    if CAMINHO_CACHE not in _criado:
+        with _lock, conexao(CAMINHO_CACHE) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    resposta TEXT NOT NULL,
+                    modelo TEXT,
+                    criada REAL NOT NULL,
+                    acessada REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acessada ON respostas (acessada)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contadores (
+                    nome TEXT PRIMARY KEY,
+                    valor INTEGER NOT NULL
+                )
+            """)
+            _criado.add(CAMINHO_CACHE)
+    return conexao(CAMINHO_CACHE)
+
+def _contar(nome):
+    chave = (CAMINHO_CACHE, nome)
+    with _pendentes_lock:
+        _pendentes[chave] = _pendentes.get(chave, 0) + 1
+        if time.monotonic() - _ultima_gravacao < INTERVALO_CONTADORES:
+            return
+    gravar_contadores()
+
+def gravar_contadores():
+    """Soma ao banco os acertos/falhas acumulados na memória"""
+    global _ultima_gravacao
+    with _pendentes_lock:
+        pendentes = dict(_pendentes)
+        _pendentes.clear()
+        _ultima_gravacao = time.monotonic()
+    por_banco = {}
+    for (caminho, nome), valor in pendentes.items():
+        por_banco.setdefault(caminho, []).append((nome, valor))
+    for caminho, valores in por_banco.items():
+        try:
+            with conexao(caminho) as conn:
+                conn.executemany("""
+                    INSERT INTO contadores (nome, valor) VALUES (?, ?)
+                    ON CONFLICT (nome) DO UPDATE SET valor = valor + excluded.valor
+                """, valores)
+        except Exception:
+            # Devolve à memória para a próxima gravação
+            with _pendentes_lock:
+                for nome, valor in valores:
+                    _pendentes[(caminho, nome)] = _pendentes.get((caminho, nome), 0) + valor
+            raise
+
+def _gravar_ao_sair():
+    try:
+        gravar_contadores()
+    except sqlite3.Error:
+        pass  # banco que já não existe (ex.: temporário) não impede o encerramento
+
+atexit.register(_gravar_ao_sair)
+
+def chave_resposta(texto, modelo, instrucao):
+    """Endereço da resposta: hash do texto, do modelo e da instrução de idioma"""
+    h = hashlib.sha256()
+    for parte in (modelo, instrucao, texto):
+        h.update(parte.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def obter(chave):
+    """Resposta guardada para a chave, ou None (registra acerto/falha)"""
+    agora = time.time()
+    with _banco() as conn:
+        row = conn.execute(
+            "SELECT resposta, acessada FROM respostas WHERE chave = ? AND criada >= ?",
+            (chave, agora - VALIDADE)
+        ).fetchone()
+        if row is not None and agora - row[1] >= INTERVALO_ACESSO:
+            conn.execute("UPDATE respostas SET acessada = ? WHERE chave = ?", (agora, chave))
+    _contar("falhas" if row is None else "acertos")
+    return None if row is None else row[0]
+
+def guardar(chave, resposta, modelo=None):
+    agora = time.time()
+    with _banco() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO respostas (chave, resposta, modelo, criada, acessada)
+            VALUES (?, ?, ?, ?, ?)
+        """, (chave, resposta, modelo, agora, agora))
+        _despejar(conn, agora)
+
+def _despejar(conn, agora):
+    conn.execute("DELETE FROM respostas WHERE criada < ?", (agora - VALIDADE,))
+    conn.execute("""
+        DELETE FROM respostas WHERE chave IN (
+            SELECT chave FROM respostas ORDER BY acessada DESC LIMIT -1 OFFSET ?
+        )
+    """, (MAX_ENTRADAS,))
+
+def estatisticas():
+    gravar_contadores()
+    with _banco() as conn:
+        contadores = dict(conn.execute("SELECT nome, valor FROM contadores").fetchall())
+        entradas = conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+    return {"acertos": contadores.get("acertos", 0), "falhas": contadores.get("falhas", 0), "entradas": entradas}
+
+def limpar():
+    with _pendentes_lock:
+        for chave in [c for c in _pendentes if c[0] == CAMINHO_CACHE]:
+            del _pendentes[chave]
+    with _banco() as conn:
+        conn.execute("DELETE FROM respostas")
+        conn.execute("DELETE FROM contadores")
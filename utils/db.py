@@ -1,22 +1,225 @@
+import math
 import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
 
-def get_connection():
-    return sqlite3.connect("data/escola.db", check_same_thread=False)
+DB_PATH = "data/escola.db"
 
-def init_db():
-    conn = get_connection()
+# Quantidade máxima de conexões abertas por banco
+TAMANHO_POOL = 5
+
+# Tempo máximo (s) esperando uma conexão livre no pool
+TIMEOUT_POOL = 30
+
+# Pragmas aplicados a cada conexão nova
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",     # ~16 MB de cache de páginas
+    "PRAGMA mmap_size=268435456",   # 256 MB mapeados em memória
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+def _nova_conexao(caminho):
+    """Abre uma conexão configurada com os pragmas de desempenho"""
+    conn = sqlite3.connect(
+        caminho,
+        check_same_thread=False,
+        timeout=TIMEOUT_POOL,
+        cached_statements=256,  # reaproveita os statements preparados
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class PoolDeConexoes:
+    """Pool pequeno de conexões de longa duração, ciente de threads.
+
+    Cada conexão é usada por uma thread de cada vez; chamadas aninhadas de
+    `conexao()` na mesma thread reaproveitam a conexão já emprestada e só o
+    bloco mais externo faz commit ou rollback.
+    """
+
+    def __init__(self, caminho, tamanho=TAMANHO_POOL):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self._livres = LifoQueue(maxsize=tamanho)
+        self._criadas = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _obter(self):
+        try:
+            return self._livres.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            if self._criadas < self.tamanho:
+                self._criadas += 1
+                try:
+                    return _nova_conexao(self.caminho)
+                except Exception:
+                    self._criadas -= 1
+                    raise
+        try:
+            return self._livres.get(timeout=TIMEOUT_POOL)
+        except Empty:
+            raise sqlite3.OperationalError("Nenhuma conexão livre no pool") from None
+
+    def _devolver(self, conn):
+        self._livres.put_nowait(conn)
+
+    @contextmanager
+    def conexao(self):
+        atual = getattr(self._local, "conn", None)
+        if atual is not None:
+            yield atual
+            return
+
+        conn = self._obter()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._devolver(conn)
+
+    def fechar(self):
+        """Fecha todas as conexões livres do pool"""
+        with self._lock:
+            while True:
+                try:
+                    conn = self._livres.get_nowait()
+                except Empty:
+                    break
+                conn.close()
+                self._criadas -= 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def obter_pool(caminho=None):
+    caminho = caminho or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(caminho)
+        if pool is None:
+            pool = _pools[caminho] = PoolDeConexoes(caminho)
+        return pool
+
+def conexao(caminho=None):
+    """Empresta uma conexão do pool; commit ao sair do bloco, rollback em caso de erro"""
+    return obter_pool(caminho).conexao()
+
+def fechar_conexoes():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.fechar()
+        _pools.clear()
+
+def get_connection(caminho=None):
+    """Conexão avulsa (fora do pool), já configurada"""
+    return _nova_conexao(caminho or DB_PATH)
+
+def versao_tabela(tabela):
+    """Versão atual da tabela; muda a cada escrita registrada com incrementar_versao"""
+    with conexao() as conn:
+        row = conn.execute("SELECT versao FROM versoes_tabelas WHERE tabela = ?", (tabela,)).fetchone()
+    return row[0] if row else 0
+
+def incrementar_versao(conn, tabela):
+    """Marca a tabela como alterada; chamar dentro da mesma transação da escrita"""
+    conn.execute("""
+        INSERT INTO versoes_tabelas (tabela, versao) VALUES (?, 1)
+        ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1
+    """, (tabela,))
+
+# Faixas de média mantidas na tabela de estatísticas (coluna → condição)
+FAIXAS_MEDIA = {
+    "abaixo_5": "media < 5",
+    "entre_5_7": "media >= 5 AND media <= 7",
+    "acima_7": "media > 7",
+}
+
+# Quantidade de faixas de 1 ponto no histograma de médias (0-1, 1-2, ..., 9-10)
+BINS_HISTOGRAMA = 10
+
+def reconstruir_estatisticas(conn):
+    """Recalcula do zero as estatísticas agregadas a partir da tabela estudantes"""
+    contagens = ", ".join(f"COALESCE(SUM({cond}), 0)" for cond in FAIXAS_MEDIA.values())
+    conn.execute("DELETE FROM estatisticas_estudantes")
+    conn.execute(f"""
+        INSERT INTO estatisticas_estudantes
+            (id, total, soma, minimo, maximo, {", ".join(FAIXAS_MEDIA)})
+        SELECT 1, COUNT(media), COALESCE(SUM(media), 0), MIN(media), MAX(media), {contagens}
+        FROM estudantes
+    """)
+    conn.execute("DELETE FROM histograma_medias")
+    conn.execute(f"""
+        INSERT INTO histograma_medias (faixa, total)
+        SELECT MIN(MAX(CAST(media AS INTEGER), 0), {BINS_HISTOGRAMA - 1}) AS faixa, COUNT(*)
+        FROM estudantes WHERE media IS NOT NULL GROUP BY faixa
+    """)
+
+def _colunas(conn, tabela):
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({tabela})")}
+
+def _migracao_1(conn):
+    """Esquema legado, antes das migrações (idempotente: bancos antigos estão em estágios diferentes)"""
     cursor = conn.cursor()
-    
+
     # Estudantes
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS estudantes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nome TEXT,
-	    nota1 FLOAT,
+            nota1 FLOAT,
             nota2 FLOAT
-        )                   
+        )
+    """)
+
+    # Média calculada pelo próprio banco, indexada para filtros por faixa
+    if "media" not in _colunas(conn, "estudantes"):
+        cursor.execute("""
+            ALTER TABLE estudantes
+            ADD COLUMN media REAL GENERATED ALWAYS AS ((nota1 + nota2) / 2.0) VIRTUAL
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_estudantes_media ON estudantes (media, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_estudantes_nome ON estudantes (nome, id)")
+
+    # Versão de cada tabela, usada para invalidar caches
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS versoes_tabelas (
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL
+        )
     """)
 
+    # Estatísticas agregadas, mantidas a cada inserção
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS estatisticas_estudantes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL,
+            soma REAL NOT NULL,
+            minimo REAL,
+            maximo REAL,
+            {", ".join(f"{faixa} INTEGER NOT NULL" for faixa in FAIXAS_MEDIA)}
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS histograma_medias (
+            faixa INTEGER PRIMARY KEY,
+            total INTEGER NOT NULL
+        )
+    """)
+    if cursor.execute("SELECT 1 FROM estatisticas_estudantes").fetchone() is None:
+        reconstruir_estatisticas(conn)
+
     # Documentos
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS documentos (
@@ -24,6 +227,143 @@ def init_db():
             nome TEXT,
             data_upload TEXT
         )
-    """)    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    """)
+
+    # Texto dos documentos e índice de busca textual (FTS5)
+    colunas_documentos = _colunas(conn, "documentos")
+    if "conteudo" not in colunas_documentos:
+        cursor.execute("ALTER TABLE documentos ADD COLUMN conteudo TEXT")
+    if "hash" not in colunas_documentos:
+        cursor.execute("ALTER TABLE documentos ADD COLUMN hash TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_documentos_hash ON documentos (hash)")
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5 (
+            nome, conteudo,
+            content='documentos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    # Gatilhos que mantêm o índice igual à tabela documentos
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS documentos_fts_ai AFTER INSERT ON documentos BEGIN
+            INSERT INTO documentos_fts (rowid, nome, conteudo) VALUES (new.id, new.nome, new.conteudo);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS documentos_fts_ad AFTER DELETE ON documentos BEGIN
+            INSERT INTO documentos_fts (documentos_fts, rowid, nome, conteudo)
+            VALUES ('delete', old.id, old.nome, old.conteudo);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS documentos_fts_au AFTER UPDATE ON documentos BEGIN
+            INSERT INTO documentos_fts (documentos_fts, rowid, nome, conteudo)
+            VALUES ('delete', old.id, old.nome, old.conteudo);
+            INSERT INTO documentos_fts (rowid, nome, conteudo) VALUES (new.id, new.nome, new.conteudo);
+        END
+    """)
+
+def _nota_legada(valor):
+    """Nota de um banco antigo como REAL; texto não numérico ou fora de 0-10 vira NULL"""
+    if valor is None:
+        return None
+    try:
+        nota = float(str(valor).strip().replace(",", "."))
+    except ValueError:
+        return None
+    if math.isnan(nota) or not 0 <= nota <= 10:
+        return None
+    return nota
+
+def _migracao_2(conn):
+    """estudantes com notas REAL validadas por CHECK e nome sem diferenciar maiúsculas"""
+    conn.execute("""
+        CREATE TABLE estudantes_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL COLLATE NOCASE,
+            nota1 REAL CHECK (nota1 BETWEEN 0 AND 10),
+            nota2 REAL CHECK (nota2 BETWEEN 0 AND 10),
+            media REAL GENERATED ALWAYS AS ((nota1 + nota2) / 2.0) VIRTUAL
+        )
+    """)
+    # Notas gravadas como texto são convertidas aqui, uma única vez. As que não
+    # são uma nota válida ficam NULL, e o valor original é guardado em
+    # notas_descartadas para ser corrigido à mão: a migração não inventa notas
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notas_descartadas (
+            estudante_id INTEGER NOT NULL,
+            coluna TEXT NOT NULL,
+            valor_original TEXT,
+            PRIMARY KEY (estudante_id, coluna)
+        )
+    """)
+    linhas, descartadas = [], []
+    for id, nome, nota1, nota2 in conn.execute("SELECT id, nome, nota1, nota2 FROM estudantes").fetchall():
+        convertidas = (_nota_legada(nota1), _nota_legada(nota2))
+        for coluna, original, nota in zip(("nota1", "nota2"), (nota1, nota2), convertidas):
+            if original is not None and nota is None:
+                descartadas.append((id, coluna, str(original)))
+        linhas.append((id, nome or "", *convertidas))
+    conn.executemany("INSERT INTO estudantes_nova (id, nome, nota1, nota2) VALUES (?, ?, ?, ?)", linhas)
+    conn.executemany("INSERT OR REPLACE INTO notas_descartadas VALUES (?, ?, ?)", descartadas)
+    # Preserva o contador do AUTOINCREMENT (ids de alunos excluídos não voltam)
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'estudantes'").fetchone()
+    if seq is not None:
+        if not conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'estudantes_nova'",
+                            seq).rowcount:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('estudantes_nova', ?)", seq)
+
+    conn.execute("DROP TABLE estudantes")
+    conn.execute("ALTER TABLE estudantes_nova RENAME TO estudantes")
+    conn.execute("CREATE INDEX idx_estudantes_media ON estudantes (media, id)")
+    conn.execute("CREATE INDEX idx_estudantes_nome ON estudantes (nome COLLATE NOCASE, id)")
+
+    reconstruir_estatisticas(conn)
+    incrementar_versao(conn, "estudantes")
+
+def _migracao_3(conn):
+    """Índice para listar documentos por data de envio"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documentos_data_upload ON documentos (data_upload)")
+
+# Migrações em ordem; a versão aplicada fica em PRAGMA user_version.
+# Nunca altere uma migração publicada: acrescente uma nova ao final
+MIGRACOES = (
+    (1, _migracao_1),
+    (2, _migracao_2),
+    (3, _migracao_3),
+)
+
+def versao_esquema(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrar(caminho=None):
+    """Aplica as migrações pendentes, cada uma na sua transação; devolve a versão final"""
+    with conexao(caminho) as conn:
+        for versao, migracao in MIGRACOES:
+            if versao_esquema(conn) >= versao:
+                continue
+            # IMMEDIATE pega o lock de escrita antes de reler a versão:
+            # outro processo iniciando ao mesmo tempo não aplica a migração duas vezes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if versao_esquema(conn) < versao:
+                    migracao(conn)
+                    conn.execute(f"PRAGMA user_version = {versao}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return versao_esquema(conn)
+
+_migrados = set()
+_migrados_lock = threading.Lock()
+
+def init_db():
+    """Deixa o banco no esquema atual; roda as migrações uma vez por banco e processo"""
+    caminho = DB_PATH
+    if caminho in _migrados:
+        return
+    with _migrados_lock:
+        if caminho not in _migrados:
+            migrar(caminho)
+            _migrados.add(caminho)
@@ -0,0 +1,254 @@
+from copy import deepcopy
+from io import BytesIO
+
+import numpy as np
+from docx import Document
+from docx.oxml.ns import qn
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, LongTable, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from pptx import Presentation
+from pptx.util import Inches
+
+from utils.imagens_graficos import renderizar
+
+# Funções de exportação sem Streamlit: recebem dados já prontos e devolvem
+# os bytes do arquivo, para poderem rodar em outro processo.
+# Gráficos chegam como lista de (fig.to_dict(), título).
+
+MIME_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MIME_PDF = "application/pdf"
+MIME_PPTX = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+TITULO_RELATORIO = "Relatório Escolar - Dashboard 🐉🏮"
+
+# Linhas formatadas por vez ao escrever tabelas grandes
+TAMANHO_BLOCO = 1000
+
+# Linhas de dados por slide na tabela do PowerPoint
+LINHAS_POR_SLIDE = 15
+
+ESTILO_TABELA_PDF = TableStyle([
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#B22222")),
+    ('TEXTCOLOR',(0,0),(-1,0),colors.white),
+    ('ALIGN',(0,0),(-1,-1),'CENTER'),
+    ('GRID', (0,0), (-1,-1), 1, colors.black),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold')
+])
+
+def _para_bytes(salvar):
+    buffer = BytesIO()
+    salvar(buffer)
+    return buffer.getvalue()
+
+def _imagem(fig):
+    """PNG da figura (via cache) pronto para reportlab/python-pptx, sem arquivo temporário"""
+    return BytesIO(renderizar(fig))
+
+def _etapas(ao_progredir, total):
+    """Função que avisa ao_progredir(feitas, total) a cada etapa concluída"""
+    feitas = 0
+
+    def avancar():
+        nonlocal feitas
+        feitas += 1
+        if ao_progredir:
+            ao_progredir(feitas, total)
+    return avancar
+
+def _blocos(df):
+    return -(-len(df) // TAMANHO_BLOCO)
+
+# ---------- Tabelas em blocos ----------
+def _formatar_coluna(valores):
+    """Converte uma coluna inteira para texto de uma vez (notas com 2 casas)"""
+    if np.issubdtype(valores.dtype, np.floating):
+        return np.char.mod("%.2f", valores)
+    return valores.astype(str)
+
+def blocos_formatados(df, tamanho=TAMANHO_BLOCO):
+    """Gera as linhas do DataFrame como tuplas de texto, um bloco de cada vez"""
+    for inicio in range(0, len(df), tamanho):
+        parte = df.iloc[inicio:inicio + tamanho]
+        colunas = [_formatar_coluna(parte[c].to_numpy()).tolist() for c in parte.columns]
+        yield list(zip(*colunas))
+
+def _tabela_docx(doc, df, avancar=lambda: None):
+    t = doc.add_table(rows=2, cols=len(df.columns))
+    for cell, col in zip(t.rows[0].cells, df.columns):
+        cell.text = str(col)
+
+    # Linha modelo: copiar o XML é bem mais rápido que add_row() + cell.text por célula
+    for cell in t.rows[1].cells:
+        cell.text = "-"
+    modelo = t.rows[1]._tr
+    tbl = t._tbl
+    tbl.remove(modelo)
+
+    for bloco in blocos_formatados(df):
+        for linha in bloco:
+            tr = deepcopy(modelo)
+            for elemento, valor in zip(tr.iter(qn("w:t")), linha):
+                elemento.text = valor
+            tbl.append(tr)
+        avancar()
+
+def _tabelas_pdf(df, avancar=lambda: None):
+    """Gera uma LongTable por bloco, com cabeçalho repetido a cada página"""
+    cabecalho = [str(c) for c in df.columns]
+    vazia = True
+    for bloco in blocos_formatados(df):
+        vazia = False
+        t = LongTable([cabecalho] + bloco, repeatRows=1)
+        t.setStyle(ESTILO_TABELA_PDF)
+        yield t
+        avancar()
+    if vazia:
+        t = LongTable([cabecalho], repeatRows=1)
+        t.setStyle(ESTILO_TABELA_PDF)
+        yield t
+
+class _SobDemanda:
+    """Marca na lista de flowables: _DocumentoPdf a troca pelo próximo item do gerador"""
+
+    def __init__(self, gerador):
+        self.gerador = gerador
+
+class _DocumentoPdf(SimpleDocTemplate):
+    """SimpleDocTemplate que monta as tabelas durante o build, uma de cada vez.
+
+    Cada bloco só vira LongTable quando chega a vez dele na página e é
+    descartado depois de desenhado, então a memória não cresce com o
+    número de linhas exportadas.
+    """
+
+    def filterFlowables(self, flowables):
+        while flowables and isinstance(flowables[0], _SobDemanda):
+            proximo = next(flowables[0].gerador, None)
+            if proximo is None:
+                # None é ignorado pelo build, e a lista nunca fica vazia aqui
+                flowables[0] = None
+                break
+            flowables.insert(0, proximo)
+
+def _slides_tabela(prs, df, titulo="Tabela de Estudantes", avancar=lambda: None):
+    """Divide a tabela em vários slides de LINHAS_POR_SLIDE linhas"""
+    slide_layout = prs.slide_layouts[5]  # layout em branco
+    total_slides = max(1, -(-len(df) // LINHAS_POR_SLIDE))
+    linhas = (linha for bloco in blocos_formatados(df) for linha in bloco)
+
+    for n in range(1, total_slides + 1):
+        pagina = [linha for _, linha in zip(range(LINHAS_POR_SLIDE), linhas)]
+        slide = prs.slides.add_slide(slide_layout)
+        slide.shapes.title.text = titulo if total_slides == 1 else f"{titulo} ({n}/{total_slides})"
+        top, left, width, height = Inches(1.5), Inches(0.5), Inches(9), Inches(0.3) * (len(pagina) + 1)
+        table = slide.shapes.add_table(rows=len(pagina)+1, cols=len(df.columns),
+                                       left=left, top=top, width=width, height=height).table
+
+        # Cabeçalho
+        for j, col_name in enumerate(df.columns):
+            table.cell(0, j).text = str(col_name)
+
+        # Dados
+        for i, linha in enumerate(pagina, start=1):
+            for j, valor in enumerate(linha):
+                table.cell(i, j).text = valor
+        avancar()
+
+# ---------- Dashboard ----------
+# ao_progredir(feitas, total) é chamado a cada bloco da tabela, gráfico e
+# montagem final, para a fila de exportação mostrar o andamento
+def relatorio_docx(df, ao_progredir=None):
+    avancar = _etapas(ao_progredir, _blocos(df) + 1)
+    doc = Document()
+    doc.add_heading(TITULO_RELATORIO, 0)
+    doc.add_paragraph("Relatório gerado a partir do sistema interativo.")
+    _tabela_docx(doc, df, avancar)
+    dados = _para_bytes(doc.save)
+    avancar()
+    return dados
+
+def relatorio_pdf(df, graficos, ao_progredir=None):
+    avancar = _etapas(ao_progredir, _blocos(df) + len(graficos) + 1)
+    buffer = BytesIO()
+    doc_pdf = _DocumentoPdf(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    elements.append(Paragraph(TITULO_RELATORIO, styles['Title']))
+    elements.append(Paragraph("Relatório gerado a partir do sistema interativo.", styles['Normal']))
+    elements.append(Spacer(1,12))
+
+    elements.append(_SobDemanda(_tabelas_pdf(df, avancar)))
+    elements.append(Spacer(1,12))
+
+    for fig, title in graficos:
+        elements.append(Paragraph(title, styles['Heading2']))
+        elements.append(Image(_imagem(fig), width=400, height=300))
+        elements.append(Spacer(1,12))
+        avancar()
+
+    doc_pdf.build(elements)
+    avancar()
+    return buffer.getvalue()
+
+def relatorio_pptx(df, graficos, ao_progredir=None):
+    avancar = _etapas(ao_progredir, max(1, -(-len(df) // LINHAS_POR_SLIDE)) + len(graficos) + 1)
+    prs = Presentation()
+
+    # Slides da tabela
+    _slides_tabela(prs, df, avancar=avancar)
+
+    # Slides de gráficos
+    _slides_graficos(prs, graficos, avancar)
+    dados = _para_bytes(prs.save)
+    avancar()
+    return dados
+
+def _slides_graficos(prs, graficos, avancar=lambda: None):
+    slide_layout = prs.slide_layouts[5]
+    for fig, title in graficos:
+        slide = prs.slides.add_slide(slide_layout)
+        slide.shapes.title.text = title
+        slide.shapes.add_picture(_imagem(fig), Inches(1), Inches(1.5), width=Inches(8), height=Inches(4.5))
+        avancar()
+
+# ---------- Documentos ----------
+def documento_docx(nome, texto):
+    doc = Document()
+    doc.add_heading(nome, 0)
+    doc.add_paragraph(texto)
+    return _para_bytes(doc.save)
+
+def documento_pdf(nome, texto, graficos):
+    buffer = BytesIO()
+    doc_pdf = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+    elements.append(Paragraph(nome, styles['Title']))
+    elements.append(Spacer(1,12))
+    elements.append(Paragraph(texto, styles['Normal']))
+    elements.append(Spacer(1,12))
+
+    # Adiciona gráficos
+    for fig, title in graficos:
+        elements.append(Paragraph(title, styles['Heading2']))
+        elements.append(Image(_imagem(fig), width=400, height=300))
+        elements.append(Spacer(1,12))
+
+    doc_pdf.build(elements)
+    return buffer.getvalue()
+
+def documento_pptx(nome, texto, graficos):
+    prs = Presentation()
+    slide_layout = prs.slide_layouts[5]
+
+    # Slide texto
+    slide = prs.slides.add_slide(slide_layout)
+    slide.shapes.title.text = nome
+    slide.shapes.add_textbox(Inches(1), Inches(1.5), Inches(8), Inches(4)).text = texto
+
+    # Slides de gráficos
+    _slides_graficos(prs, graficos)
+    return _para_bytes(prs.save)
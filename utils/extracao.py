@@ -0,0 +1,164 @@
+import atexit
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from utils.metricas import cronometrado
+from utils.tarefas import contexto_processos
+
+# Extração de texto de TXT, PDF e DOCX compartilhada pelas páginas.
+# PDFs grandes são lidos em paralelo num pool de processos, as páginas saem
+# como gerador (a prévia aparece logo na primeira) e o resultado fica em
+# cache pelo hash do arquivo.
+
+# PDFs com menos páginas que isto são lidos no próprio processo
+MIN_PAGINAS_PARALELO = 16
+
+# Páginas extraídas por tarefa enviada ao pool
+PAGINAS_POR_TAREFA = 8
+
+MAX_PROCESSOS = min(4, os.cpu_count() or 1)
+
+# Limite do cache de textos extraídos (soma dos tamanhos)
+MAX_CARACTERES_CACHE = 50_000_000
+
+MIME_PDF = "application/pdf"
+MIMES_DOCX = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword",
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_cache = OrderedDict()
+_caracteres_cache = 0
+_cache_lock = threading.Lock()
+
+def hash_arquivo(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+def tipo_arquivo(nome, mime=None):
+    """"txt", "pdf" ou "docx" pela extensão ou pelo MIME; None se não suportado"""
+    nome = (nome or "").lower()
+    if nome.endswith(".txt") or mime == "text/plain":
+        return "txt"
+    if nome.endswith(".pdf") or mime == MIME_PDF:
+        return "pdf"
+    if nome.endswith(".docx") or mime in MIMES_DOCX:
+        return "docx"
+    return None
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_PROCESSOS, mp_context=contexto_processos()
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+# (caminho, PdfReader) do último PDF aberto neste processo do pool
+_leitor = (None, None)
+
+def _extrair_intervalo(caminho, inicio, fim):
+    """Roda no pool: texto das páginas [inicio, fim) do PDF gravado em caminho.
+
+    Cada processo lê e analisa o arquivo uma vez e reaproveita o leitor nos
+    intervalos seguintes do mesmo PDF.
+    """
+    global _leitor
+    from PyPDF2 import PdfReader
+
+    if _leitor[0] != caminho:
+        with open(caminho, "rb") as f:
+            _leitor = (caminho, PdfReader(BytesIO(f.read())))
+    reader = _leitor[1]
+    return [reader.pages[i].extract_text() or "" for i in range(inicio, fim)]
+
+def paginas_pdf(dados):
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(BytesIO(dados))
+    total = len(reader.pages)
+    if total < MIN_PAGINAS_PARALELO:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    # Os processos recebem só o caminho de uma cópia temporária, não os bytes
+    # do PDF a cada intervalo
+    # (nome único: os processos identificam o PDF já aberto pelo caminho)
+    caminho = os.path.join(tempfile.gettempdir(), f"extracao-{uuid.uuid4().hex}.pdf")
+    with open(caminho, "wb") as f:
+        f.write(dados)
+    try:
+        inicios = range(0, total, PAGINAS_POR_TAREFA)
+        fins = [min(i + PAGINAS_POR_TAREFA, total) for i in inicios]
+        # map devolve na ordem das páginas, à medida que cada intervalo fica pronto
+        for textos in _pool().map(_extrair_intervalo, [caminho] * len(fins), inicios, fins):
+            yield from textos
+    finally:
+        os.remove(caminho)
+
+def paginas_docx(dados):
+    import docx
+
+    doc = docx.Document(BytesIO(dados))
+    yield "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+def paginas_txt(dados):
+    yield dados.decode("utf-8")
+
+LEITORES = {"txt": paginas_txt, "pdf": paginas_pdf, "docx": paginas_docx}
+
+def _guardar(chave, paginas):
+    global _caracteres_cache
+    tamanho = sum(len(p) for p in paginas)
+    with _cache_lock:
+        if chave in _cache or tamanho > MAX_CARACTERES_CACHE:
+            return
+        _cache[chave] = paginas
+        _caracteres_cache += tamanho
+        while _caracteres_cache > MAX_CARACTERES_CACHE:
+            _, antigas = _cache.popitem(last=False)
+            _caracteres_cache -= sum(len(p) for p in antigas)
+
+def _obter(chave):
+    with _cache_lock:
+        paginas = _cache.get(chave)
+        if paginas is not None:
+            _cache.move_to_end(chave)
+        return paginas
+
+def paginas(dados, nome, mime=None):
+    """Gera o texto de cada página; arquivos já lidos saem direto do cache.
+
+    Levanta ValueError para formatos não suportados.
+    """
+    tipo = tipo_arquivo(nome, mime)
+    if tipo is None:
+        raise ValueError("Formato de arquivo não suportado.")
+
+    chave = (tipo, hash_arquivo(dados))
+    em_cache = _obter(chave)
+    if em_cache is not None:
+        yield from em_cache
+        return
+
+    lidas = []
+    for pagina in LEITORES[tipo](dados):
+        lidas.append(pagina)
+        yield pagina
+    _guardar(chave, lidas)
+
+@cronometrado()
+def extrair_texto(dados, nome, mime=None):
+    """Texto completo do arquivo, com as páginas separadas por quebra de linha"""
+    return "\n".join(paginas(dados, nome, mime))
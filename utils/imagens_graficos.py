@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+# Renderização de gráficos plotly para PNG com cache pelo conteúdo da figura.
+# O kaleido é o passo mais lento das exportações. Cada processo de exportação
+# tem o próprio cache em memória; o cache em disco é compartilhado entre eles,
+# e uma trava por figura faz "Exportar todos" renderizar cada gráfico uma vez
+# só, mesmo com o PDF e o PPTX sendo gerados ao mesmo tempo.
+
+ESCALA_PADRAO = 2
+
+# Limites do cache em memória
+MAX_ENTRADAS_MEMORIA = 64
+MAX_BYTES_MEMORIA = 64 * 1024 * 1024
+
+# Cache em disco compartilhado entre processos (CACHE_GRAFICOS_DIR vazio desliga)
+PASTA_CACHE_DISCO = os.environ.get("CACHE_GRAFICOS_DIR", "data/cache_graficos")
+MAX_ARQUIVOS_DISCO = 500
+
+# Idade (s) a partir da qual a trava de uma figura é considerada abandonada
+ESPERA_TRAVA = 60
+
+_memoria = OrderedDict()
+_bytes_memoria = 0
+_lock = threading.Lock()
+
+def chave_figura(fig, formato="png", escala=ESCALA_PADRAO):
+    """Hash estável da especificação da figura e das opções de renderização"""
+    spec = fig.to_dict() if isinstance(fig, go.Figure) else fig
+    conteudo = to_json_plotly(spec)
+    return hashlib.sha256(f"{formato}:{escala}:{conteudo}".encode("utf-8")).hexdigest()
+
+def _guardar_memoria(chave, dados):
+    global _bytes_memoria
+    with _lock:
+        if chave in _memoria:
+            return
+        _memoria[chave] = dados
+        _bytes_memoria += len(dados)
+        while _memoria and (len(_memoria) > MAX_ENTRADAS_MEMORIA or _bytes_memoria > MAX_BYTES_MEMORIA):
+            _, antigo = _memoria.popitem(last=False)
+            _bytes_memoria -= len(antigo)
+
+def _ler_memoria(chave):
+    with _lock:
+        dados = _memoria.get(chave)
+        if dados is not None:
+            _memoria.move_to_end(chave)
+        return dados
+
+def _caminho_disco(chave, formato):
+    return os.path.join(PASTA_CACHE_DISCO, f"{chave}.{formato}")
+
+def _ler_disco(chave, formato):
+    if not PASTA_CACHE_DISCO:
+        return None
+    caminho = _caminho_disco(chave, formato)
+    try:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        # Acerto renova o mtime: a poda remove os menos usados, não os mais antigos
+        os.utime(caminho)
+    except OSError:
+        return None
+    return dados
+
+def _guardar_disco(chave, formato, dados):
+    if not PASTA_CACHE_DISCO:
+        return
+    os.makedirs(PASTA_CACHE_DISCO, exist_ok=True)
+    destino = _caminho_disco(chave, formato)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, destino)  # escrita atômica entre processos
+    _podar_disco()
+
+def _podar_disco():
+    arquivos = [e for e in os.scandir(PASTA_CACHE_DISCO)
+                if e.is_file() and not e.name.endswith((".tmp", ".trava"))]
+    if len(arquivos) <= MAX_ARQUIVOS_DISCO:
+        return
+    arquivos.sort(key=lambda e: e.stat().st_mtime)
+    for entrada in arquivos[:len(arquivos) - MAX_ARQUIVOS_DISCO]:
+        _remover(entrada.path)
+
+def _renderizar_uma_vez(chave, formato, fig, escala):
+    """Renderiza e grava no disco; se outro processo já está renderizando a figura, espera por ela"""
+    os.makedirs(PASTA_CACHE_DISCO, exist_ok=True)
+    trava = f"{_caminho_disco(chave, formato)}.trava"
+    while True:
+        try:
+            os.close(os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            pass
+        dados = _ler_disco(chave, formato)
+        if dados is not None:
+            return dados
+        try:
+            if time.time() - os.path.getmtime(trava) > ESPERA_TRAVA:
+                _remover(trava)  # abandonada por um processo que caiu no meio
+                continue
+        except OSError:
+            continue  # a trava acabou de ser solta
+        time.sleep(0.05)
+    try:
+        # Pode ter ficado pronta entre a primeira leitura e a trava
+        dados = _ler_disco(chave, formato)
+        if dados is None:
+            dados = _renderizar(fig, formato, escala)
+            _guardar_disco(chave, formato, dados)
+        return dados
+    finally:
+        _remover(trava)
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+def _renderizar(fig, formato, escala):
+    figura = fig if isinstance(fig, go.Figure) else go.Figure(fig)
+    return pio.to_image(figura, format=formato, scale=escala)
+
+def renderizar(fig, formato="png", escala=ESCALA_PADRAO):
+    """Bytes da imagem da figura (go.Figure ou dict), renderizada no máximo uma vez"""
+    chave = chave_figura(fig, formato, escala)
+    dados = _ler_memoria(chave)
+    if dados is not None:
+        return dados
+
+    dados = _ler_disco(chave, formato)
+    if dados is None:
+        if PASTA_CACHE_DISCO:
+            dados = _renderizar_uma_vez(chave, formato, fig, escala)
+        else:
+            dados = _renderizar(fig, formato, escala)
+    _guardar_memoria(chave, dados)
+    return dados
+
+def limpar_cache():
+    global _bytes_memoria
+    with _lock:
+        _memoria.clear()
+        _bytes_memoria = 0
@@ -0,0 +1,262 @@
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+
+from utils.db import conexao
+from utils.metricas import contar, cronometrado
+
+# Índice vetorial (FAISS) dos documentos enviados, por trechos, para que a
+# geração de conteúdo receba só as passagens relevantes ao tema.
+
+PASTA_INDICE = "data/indice_semantico"
+
+# Tamanho e sobreposição dos trechos indexados, em caracteres
+TAMANHO_TRECHO = 1500
+SOBREPOSICAO_TRECHO = 150
+
+# Backend de embeddings: "huggingface" (modelo local multilíngue) ou "openai";
+# "hash" funciona offline e sem modelo baixado, e é o reserva dos outros dois
+PROVEDOR_EMBEDDING = os.environ.get("EMBEDDING_PROVEDOR", "huggingface")
+
+# Modelo do provedor (vazio usa MODELOS_EMBEDDING)
+MODELO_EMBEDDING = os.environ.get("EMBEDDING_MODELO", "")
+
+MODELOS_EMBEDDING = {
+    "huggingface": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+    "openai": "text-embedding-3-small",
+}
+
+class EmbeddingHash:
+    """Embeddings locais por hashing de palavras e bigramas (sem rede, determinístico).
+
+    Não entende sinônimos como um modelo treinado, mas recupera bem trechos
+    que usam os mesmos termos do tema.
+    """
+
+    def __init__(self, dimensao=1024):
+        self.dimensao = dimensao
+        self.nome = f"hash-v1-{dimensao}"
+
+    def _indices(self, texto):
+        palavras = re.findall(r"\w+", texto.lower(), flags=re.UNICODE)
+        termos = palavras + [f"{a} {b}" for a, b in zip(palavras, palavras[1:])]
+        for termo in termos:
+            h = int.from_bytes(hashlib.blake2b(termo.encode("utf-8"), digest_size=8).digest(), "little")
+            yield h % self.dimensao, 1.0 if (h >> 63) & 1 else -1.0
+
+    def embed(self, textos):
+        vetores = np.zeros((len(textos), self.dimensao), dtype=np.float32)
+        for i, texto in enumerate(textos):
+            for indice, sinal in self._indices(texto):
+                vetores[i, indice] += sinal
+        return vetores
+
+class EmbeddingLangChain:
+    """Adapta qualquer `Embeddings` do LangChain ao índice"""
+
+    def __init__(self, embeddings, nome):
+        self.embeddings = embeddings
+        self.nome = nome
+
+    def embed(self, textos):
+        return np.asarray(self.embeddings.embed_documents(list(textos)), dtype=np.float32)
+
+    @classmethod
+    def de(cls, provedor, embeddings, modelo):
+        # O nome vira nome de arquivo do índice, e modelos do Hugging Face têm "/"
+        return cls(embeddings, f"{provedor}-" + re.sub(r"[^\w.-]", "_", modelo))
+
+def _fabrica_huggingface():
+    """Modelo sentence-transformers rodando na própria máquina (baixado na primeira vez)"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    modelo = MODELO_EMBEDDING or MODELOS_EMBEDDING["huggingface"]
+    return EmbeddingLangChain.de("huggingface", HuggingFaceEmbeddings(model_name=modelo), modelo)
+
+def _fabrica_openai():
+    """API de embeddings da OpenAI (chave em OPENAI_API_KEY)"""
+    from langchain_openai import OpenAIEmbeddings
+
+    modelo = MODELO_EMBEDDING or MODELOS_EMBEDDING["openai"]
+    return EmbeddingLangChain.de("openai", OpenAIEmbeddings(model=modelo), modelo)
+
+FABRICAS_EMBEDDING = {
+    "huggingface": _fabrica_huggingface,
+    "openai": _fabrica_openai,
+    "hash": EmbeddingHash,
+}
+
+def registrar_embedding(provedor, fabrica):
+    """fabrica() → objeto com `nome` e `embed(textos) -> np.ndarray`"""
+    FABRICAS_EMBEDDING[provedor] = fabrica
+
+def criar_embedding(provedor=None):
+    """Embedding do provedor configurado; sem o pacote, o modelo ou a chave de API, cai no EmbeddingHash"""
+    provedor = provedor or PROVEDOR_EMBEDDING
+    try:
+        return FABRICAS_EMBEDDING[provedor]()
+    except (ImportError, OSError, ValueError):
+        if provedor == "hash":
+            raise
+        contar("indice_semantico.embedding_reserva")
+        return EmbeddingHash()
+
+def dividir_em_trechos(texto, tamanho=TAMANHO_TRECHO, sobreposicao=SOBREPOSICAO_TRECHO):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    divisor = RecursiveCharacterTextSplitter(chunk_size=tamanho, chunk_overlap=sobreposicao)
+    return [t for t in divisor.split_text(texto) if t.strip()]
+
+def _normalizar(vetores):
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return np.ascontiguousarray(vetores / normas, dtype=np.float32)
+
+class IndiceSemantico:
+    """Índice FAISS (produto interno sobre vetores normalizados = cosseno)
+    persistido em disco, com o texto dos trechos num SQLite ao lado.
+    """
+
+    def __init__(self, pasta=PASTA_INDICE, embedding=None):
+        self.pasta = pasta
+        self.embedding = embedding or criar_embedding()
+        self._lock = threading.Lock()
+        self._indice = None
+        os.makedirs(pasta, exist_ok=True)
+        self._criar_tabelas()
+
+    @property
+    def _arquivo_indice(self):
+        return os.path.join(self.pasta, f"{self.embedding.nome}.faiss")
+
+    @property
+    def _banco(self):
+        return os.path.join(self.pasta, "trechos.db")
+
+    def _criar_tabelas(self):
+        with conexao(self._banco) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trechos (
+                    id INTEGER PRIMARY KEY,
+                    documento_hash TEXT NOT NULL,
+                    ordem INTEGER NOT NULL,
+                    texto TEXT NOT NULL,
+                    embedding TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_trechos_documento ON trechos (embedding, documento_hash)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documentos_indexados (
+                    hash TEXT NOT NULL,
+                    embedding TEXT NOT NULL,
+                    nome TEXT,
+                    PRIMARY KEY (hash, embedding)
+                )
+            """)
+
+    def _carregar(self):
+        import faiss
+
+        if self._indice is None and os.path.exists(self._arquivo_indice):
+            self._indice = faiss.read_index(self._arquivo_indice)
+        return self._indice
+
+    def _novo_indice(self, dimensao):
+        import faiss
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimensao))
+
+    def _salvar(self):
+        import faiss
+
+        temporario = f"{self._arquivo_indice}.tmp"
+        faiss.write_index(self._indice, temporario)
+        os.replace(temporario, self._arquivo_indice)
+
+    def indexado(self, documento_hash):
+        with conexao(self._banco) as conn:
+            return conn.execute(
+                "SELECT 1 FROM documentos_indexados WHERE hash = ? AND embedding = ?",
+                (documento_hash, self.embedding.nome)
+            ).fetchone() is not None
+
+    @cronometrado()
+    def indexar(self, documento_hash, nome, texto):
+        """Divide, gera embeddings e adiciona o documento ao índice (uma vez por arquivo)"""
+        if self.indexado(documento_hash):
+            return 0
+        trechos = dividir_em_trechos(texto)
+        if not trechos:
+            return 0
+        vetores = _normalizar(self.embedding.embed(trechos))
+
+        with self._lock:
+            # Outra sessão pode ter indexado o mesmo arquivo enquanto estes embeddings eram gerados
+            if self.indexado(documento_hash):
+                return 0
+            try:
+                with conexao(self._banco) as conn:
+                    proximo = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM trechos").fetchone()[0]
+                    ids = np.arange(proximo, proximo + len(trechos), dtype=np.int64)
+                    conn.executemany(
+                        "INSERT INTO trechos (id, documento_hash, ordem, texto, embedding) VALUES (?, ?, ?, ?, ?)",
+                        [(int(i), documento_hash, ordem, t, self.embedding.nome)
+                         for ordem, (i, t) in enumerate(zip(ids, trechos))]
+                    )
+                    conn.execute("INSERT INTO documentos_indexados (hash, embedding, nome) VALUES (?, ?, ?)",
+                                 (documento_hash, self.embedding.nome, nome))
+                    if self._carregar() is None:
+                        self._indice = self._novo_indice(vetores.shape[1])
+                    self._indice.add_with_ids(vetores, ids)
+                    # Grava o índice antes do commit: se falhar, os trechos não ficam órfãos
+                    self._salvar()
+            except Exception:
+                # Descarta os vetores já somados na memória; o índice volta a ser lido do disco
+                self._indice = None
+                raise
+        return len(trechos)
+
+    @cronometrado()
+    def buscar(self, consulta, k=5, documento_hash=None):
+        """Os k trechos mais próximos da consulta: lista de (texto, similaridade)"""
+        import faiss
+
+        with self._lock:
+            indice = self._carregar()
+            if indice is None or indice.ntotal == 0:
+                return []
+            vetor = _normalizar(self.embedding.embed([consulta]))
+
+            parametros = None
+            if documento_hash is not None:
+                with conexao(self._banco) as conn:
+                    ids = [row[0] for row in conn.execute(
+                        "SELECT id FROM trechos WHERE embedding = ? AND documento_hash = ?",
+                        (self.embedding.nome, documento_hash)
+                    )]
+                if not ids:
+                    return []
+                seletor = faiss.IDSelectorBatch(np.asarray(ids, dtype=np.int64))
+                parametros = faiss.SearchParameters(sel=seletor)
+            distancias, ids_encontrados = indice.search(vetor, k, params=parametros)
+
+        pares = [(int(i), float(d)) for i, d in zip(ids_encontrados[0], distancias[0]) if i != -1]
+        if not pares:
+            return []
+        with conexao(self._banco) as conn:
+            marcadores = ",".join("?" * len(pares))
+            textos = dict(conn.execute(
+                f"SELECT id, texto FROM trechos WHERE id IN ({marcadores})", [i for i, _ in pares]
+            ).fetchall())
+        return [(textos[i], d) for i, d in pares if i in textos]
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+def obter_indice(pasta=PASTA_INDICE):
+    with _indices_lock:
+        if pasta not in _indices:
+            _indices[pasta] = IndiceSemantico(pasta)
+        return _indices[pasta]
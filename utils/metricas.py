@@ -0,0 +1,168 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Instrumentação leve do processo: tempos por operação, contadores e perfil
+# (cProfile) opcional de um rerun. Os dados ficam em memória, compartilhados
+# entre sessões, e podem ser exportados em JSON ou no formato texto do Prometheus.
+
+# Durações mais recentes guardadas por operação (base dos percentis)
+JANELA_AMOSTRAS = 1000
+
+# Funções listadas no relatório do cProfile
+LINHAS_PERFIL = 30
+
+PREFIXO_PROMETHEUS = "sofia"
+
+# Destino do botão "Gravar" do painel (ex.: lido pelo textfile collector do node_exporter)
+ARQUIVO_METRICAS = os.environ.get("METRICAS_ARQUIVO", "data/metricas.prom")
+
+class _Operacao:
+    __slots__ = ("amostras", "chamadas", "erros", "total")
+
+    def __init__(self):
+        self.amostras = deque(maxlen=JANELA_AMOSTRAS)
+        self.chamadas = 0
+        self.erros = 0
+        self.total = 0.0
+
+_operacoes = {}
+_contadores = {}
+_lock = threading.Lock()
+
+def registrar(nome, segundos, erro=False):
+    """Registra uma duração já medida (ex.: tarefas concluídas em outro processo)"""
+    with _lock:
+        operacao = _operacoes.get(nome)
+        if operacao is None:
+            operacao = _operacoes[nome] = _Operacao()
+        operacao.amostras.append(segundos)
+        operacao.chamadas += 1
+        operacao.total += segundos
+        if erro:
+            operacao.erros += 1
+
+def contar(nome, quantidade=1):
+    with _lock:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+@contextmanager
+def medir(nome):
+    """Mede o bloco; exceções contam como erro e seguem adiante.
+
+    st.rerun/st.stop não são Exception e por isso não contam como erro.
+    """
+    inicio = time.perf_counter()
+    erro = False
+    try:
+        yield
+    except Exception:
+        erro = True
+        raise
+    finally:
+        registrar(nome, time.perf_counter() - inicio, erro)
+
+def cronometrado(nome=None):
+    """Decorador: mede cada chamada como `modulo.funcao` (ou com o nome dado)"""
+    def decorador(func):
+        rotulo = nome or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with medir(rotulo):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorador
+
+def resumo():
+    """Uma linha por operação, com tempos em ms, da mais lenta (p95) para a mais rápida"""
+    with _lock:
+        copia = {nome: (list(o.amostras), o.chamadas, o.erros, o.total) for nome, o in _operacoes.items()}
+    linhas = []
+    for nome, (amostras, chamadas, erros, total) in copia.items():
+        p50, p95 = np.percentile(amostras, [50, 95]) * 1000
+        linhas.append({
+            "operacao": nome,
+            "chamadas": chamadas,
+            "erros": erros,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "max_ms": round(max(amostras) * 1000, 2),
+            "total_s": round(total, 3),
+        })
+    return sorted(linhas, key=lambda l: -l["p95_ms"])
+
+def contadores():
+    with _lock:
+        return dict(_contadores)
+
+def para_json():
+    return json.dumps({"gerado_em": time.time(), "operacoes": resumo(), "contadores": contadores()},
+                      ensure_ascii=False, indent=2)
+
+def _rotulo(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+def para_prometheus():
+    """Métricas no formato texto de exposição do Prometheus"""
+    p = PREFIXO_PROMETHEUS
+    linhas = [f"# TYPE {p}_operacao_segundos summary"]
+    for l in resumo():
+        rotulo = f'operacao="{_rotulo(l["operacao"])}"'
+        linhas.append(f'{p}_operacao_segundos{{{rotulo},quantile="0.5"}} {l["p50_ms"] / 1000:.6g}')
+        linhas.append(f'{p}_operacao_segundos{{{rotulo},quantile="0.95"}} {l["p95_ms"] / 1000:.6g}')
+        linhas.append(f'{p}_operacao_segundos_sum{{{rotulo}}} {l["total_s"]}')
+        linhas.append(f'{p}_operacao_segundos_count{{{rotulo}}} {l["chamadas"]}')
+    linhas.append(f"# TYPE {p}_operacao_erros_total counter")
+    for l in resumo():
+        linhas.append(f'{p}_operacao_erros_total{{operacao="{_rotulo(l["operacao"])}"}} {l["erros"]}')
+    linhas.append(f"# TYPE {p}_eventos_total counter")
+    for nome, valor in sorted(contadores().items()):
+        linhas.append(f'{p}_eventos_total{{nome="{_rotulo(nome)}"}} {valor}')
+    return "\n".join(linhas) + "\n"
+
+def salvar(caminho=None):
+    """Grava as métricas: `.prom`/`.txt` no formato Prometheus, o resto em JSON"""
+    caminho = caminho or ARQUIVO_METRICAS
+    conteudo = para_prometheus() if caminho.endswith((".prom", ".txt")) else para_json()
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)  # quem lê o arquivo nunca vê uma escrita pela metade
+    return caminho
+
+def zerar():
+    with _lock:
+        _operacoes.clear()
+        _contadores.clear()
+
+@contextmanager
+def perfil(resultado):
+    """Roda o bloco sob cProfile e põe o relatório em resultado["texto"].
+
+    Só um perfil pode estar ativo por processo; se já houver outro, o bloco
+    roda normalmente, sem relatório.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        resultado["texto"] = "Outro perfil já está em andamento neste processo."
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        saida = io.StringIO()
+        pstats.Stats(profiler, stream=saida).sort_stats("cumulative").print_stats(LINHAS_PERFIL)
+        resultado["texto"] = saida.getvalue()
@@ -0,0 +1,187 @@
+import os
+import string
+import threading
+from functools import lru_cache
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import utils.db as db
+from utils.db import conexao, versao_tabela
+from utils.metricas import cronometrado
+
+# Cópia somente leitura da tabela estudantes num arquivo Arrow IPC, para as
+# análises do Dashboard. O arquivo é lido por memory map (sem cópia) e
+# regenerado em segundo plano quando a versão da tabela muda, então as
+# leituras analíticas nunca disputam o SQLite com os cadastros.
+
+# Linhas lidas do banco (e gravadas como um RecordBatch) por vez ao gerar o snapshot
+LINHAS_POR_LOTE = 50_000
+
+# Snapshots antigos mantidos no disco (leitores podem ainda estar com um aberto)
+SNAPSHOTS_MANTIDOS = 2
+
+ESQUEMA = pa.schema([
+    ("id", pa.int64()),
+    ("nome", pa.string()),
+    ("nota1", pa.float64()),
+    ("nota2", pa.float64()),
+    ("media", pa.float64()),
+])
+
+_gerando = threading.Lock()
+
+def _pasta():
+    """Snapshots ficam ao lado do banco, em <pasta do banco>/snapshot"""
+    return os.path.join(os.path.dirname(db.DB_PATH) or ".", "snapshot")
+
+def _caminho(pasta, versao):
+    return os.path.join(pasta, f"estudantes-{versao:012d}.arrow")
+
+def _versao_de(caminho):
+    return int(os.path.basename(caminho).split("-")[1].split(".")[0])
+
+def _existentes(pasta=None):
+    pasta = pasta or _pasta()
+    try:
+        nomes = sorted(n for n in os.listdir(pasta) if n.startswith("estudantes-") and n.endswith(".arrow"))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(pasta, n) for n in nomes]
+
+@cronometrado()
+def gerar():
+    """Materializa a tabela estudantes num novo snapshot e devolve o caminho"""
+    # Pasta resolvida uma vez: o banco configurado pode mudar durante a geração
+    pasta = _pasta()
+    os.makedirs(pasta, exist_ok=True)
+    temporario = os.path.join(pasta, f"gerando.{os.getpid()}.{threading.get_ident()}.tmp")
+    with conexao() as conn:
+        # Versão e linhas lidas na mesma transação de leitura (mesmo instante do WAL)
+        conn.execute("BEGIN")
+        row = conn.execute("SELECT versao FROM versoes_tabelas WHERE tabela = 'estudantes'").fetchone()
+        versao = row[0] if row else 0
+        cursor = conn.execute("SELECT id, nome, nota1, nota2, media FROM estudantes ORDER BY id")
+        # Cada lote do cursor vira um RecordBatch gravado na hora: só um lote em memória
+        with pa.OSFile(temporario, "wb") as arquivo, pa.ipc.new_file(arquivo, ESQUEMA) as escritor:
+            while lote := cursor.fetchmany(LINHAS_POR_LOTE):
+                escritor.write_batch(pa.record_batch(
+                    [pa.array(coluna, type=campo.type) for coluna, campo in zip(zip(*lote), ESQUEMA)],
+                    schema=ESQUEMA
+                ))
+    destino = _caminho(pasta, versao)
+    os.replace(temporario, destino)
+
+    # Versões acima da atual vêm de um banco anterior (recriado ou restaurado)
+    # e ficariam à frente do snapshot novo na ordem por versão
+    existentes = _existentes(pasta)
+    anteriores = [c for c in existentes if _versao_de(c) <= versao]
+    posteriores = [c for c in existentes if _versao_de(c) > versao]
+    for antigo in anteriores[:-SNAPSHOTS_MANTIDOS] + posteriores:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+    return destino
+
+def _gerar_em_segundo_plano():
+    # Uma geração por vez; quem chega enquanto outra roda não enfileira nada
+    if not _gerando.acquire(blocking=False):
+        return
+
+    def tarefa():
+        try:
+            gerar()
+        finally:
+            _gerando.release()
+    threading.Thread(target=tarefa, name="snapshot-estudantes", daemon=True).start()
+
+@lru_cache(maxsize=SNAPSHOTS_MANTIDOS)
+def _abrir(caminho):
+    return pa.ipc.open_file(pa.memory_map(caminho)).read_all()
+
+def snapshot_atual():
+    """(caminho, desatualizado) do snapshot mais novo disponível.
+
+    Sem nenhum snapshot, gera um na hora; se a tabela mudou desde o último,
+    devolve o último e agenda a regeneração.
+    """
+    existentes = _existentes()
+    if not existentes:
+        with _gerando:
+            existentes = _existentes() or [gerar()]
+    caminho = existentes[-1]
+    # Diferente, não só menor: um banco recriado recomeça a contagem de versões
+    desatualizado = _versao_de(caminho) != versao_tabela("estudantes")
+    if desatualizado:
+        _gerar_em_segundo_plano()
+    return caminho, desatualizado
+
+def tabela_estudantes():
+    """Tabela Arrow do snapshot mais novo, mapeada do disco sem cópia"""
+    return _abrir(snapshot_atual()[0])
+
+_MINUSCULAS_ASCII = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def _ascii_minusculo(texto):
+    return texto.translate(_MINUSCULAS_ASCII)
+
+@lru_cache(maxsize=8)
+def _dataframe(caminho, min_media, max_media, nome_like, order_by, matricula):
+    tabela = _abrir(caminho)
+
+    condicoes = []
+    if min_media is not None:
+        condicoes.append(pc.greater_equal(tabela["media"], min_media))
+    if max_media is not None:
+        condicoes.append(pc.less_equal(tabela["media"], max_media))
+    if nome_like:
+        # Como o LIKE do SQLite: trecho literal (o SQL escapa % e _) e só
+        # letras ASCII sem diferenciar maiúsculas
+        condicoes.append(pc.match_substring(pc.ascii_lower(tabela["nome"]), _ascii_minusculo(nome_like)))
+    if condicoes:
+        filtro = condicoes[0]
+        for condicao in condicoes[1:]:
+            filtro = pc.and_(filtro, condicao)
+        tabela = tabela.filter(filtro)
+
+    # O arquivo já está em ordem de id; as outras ordens seguem o SQL: nome com
+    # COLLATE NOCASE (só A-Z viram minúsculas, depois compara os bytes UTF-8),
+    # NULL primeiro, desempate por id
+    if order_by != "id":
+        if order_by == "nome":
+            chave = pc.ascii_lower(tabela["nome"])
+        else:
+            chave = pc.fill_null(tabela["media"], float("-inf"))
+        indices = pc.sort_indices(pa.table({"chave": chave, "id": tabela["id"]}),
+                                  sort_keys=[("chave", "ascending"), ("id", "ascending")])
+        tabela = tabela.take(indices)
+
+    colunas = {}
+    if matricula:
+        colunas["Matrícula"] = tabela["id"].to_numpy()
+    colunas.update({
+        "Nome": tabela["nome"].to_numpy(zero_copy_only=False),
+        "1º Nota": tabela["nota1"].to_numpy(zero_copy_only=False),
+        "2º Nota": tabela["nota2"].to_numpy(zero_copy_only=False),
+        "Média": tabela["media"].to_numpy(zero_copy_only=False),
+    })
+    return pd.DataFrame(colunas, copy=False)
+
+@cronometrado()
+def dataframe_estudantes(min_media=None, max_media=None, nome_like=None, order_by="id", matricula=True):
+    """Como estudante_controller.dataframe_estudantes, mas lido do snapshot.
+
+    Devolve (DataFrame, desatualizado); o DataFrame é compartilhado e não
+    deve ser modificado.
+    """
+    if order_by not in ("id", "nome", "media"):
+        raise ValueError(f"Ordenação inválida: {order_by}")
+    caminho, desatualizado = snapshot_atual()
+    return _dataframe(caminho, min_media, max_media, nome_like, order_by, matricula), desatualizado
+
+def limpar_cache():
+    """Esquece as tabelas mapeadas e os DataFrames já montados"""
+    _dataframe.cache_clear()
+    _abrir.cache_clear()
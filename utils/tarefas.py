@@ -0,0 +1,188 @@
+import atexit
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.artefatos import armazem
+from utils.metricas import registrar
+
+# Processos dedicados à geração de arquivos (kaleido, reportlab, ...)
+MAX_PROCESSOS = min(4, os.cpu_count() or 1)
+
+# Métodos de início dos processos, em ordem de preferência. forkserver cria
+# os processos a partir de um servidor limpo (o servidor do Streamlit tem
+# várias threads, e um fork levaria locks e conexões SQLite no meio do uso);
+# onde ele não existe, como no Windows, fica o spawn
+METODOS_PROCESSOS = ("forkserver", "spawn")
+
+# Tarefas concluídas são descartadas depois deste tempo (s)
+VALIDADE_TAREFA = 60 * 60
+
+# Avanço mínimo (fração) entre dois avisos de progresso de uma tarefa
+PASSO_PROGRESSO = 0.02
+
+STATUS_FILA = "na fila"
+STATUS_EXECUTANDO = "gerando"
+STATUS_CONCLUIDA = "concluída"
+STATUS_ERRO = "erro"
+STATUS_DESCARTADA = "descartada"
+
+def contexto_processos():
+    """Contexto do multiprocessing com o primeiro de METODOS_PROCESSOS disponível aqui"""
+    disponiveis = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(next(m for m in METODOS_PROCESSOS if m in disponiveis))
+
+class Tarefa:
+    __slots__ = ("id", "operacao", "nome_arquivo", "mime", "sessao", "criada", "concluida",
+                 "progresso", "artefato", "erro", "_future")
+
+    def __init__(self, id, operacao, nome_arquivo, mime, sessao, future):
+        self.id = id
+        self.operacao = operacao
+        self.nome_arquivo = nome_arquivo
+        self.mime = mime
+        self.sessao = sessao
+        self.criada = time.time()
+        self.concluida = None
+        # None enquanto na fila; de 0 a 1 depois que um processo a pega
+        self.progresso = None
+        self.artefato = None
+        self.erro = None
+        self._future = future
+        future.add_done_callback(self._ao_concluir)
+
+    def _ao_concluir(self, future):
+        erro = future.exception()
+        if erro is None:
+            try:
+                self.artefato = armazem.guardar(self.sessao, future.result())
+            except Exception as e:
+                erro = e
+        self.erro = erro
+        self.concluida = time.time()
+        # Gerado em outro processo: mede da entrada na fila até o fim
+        registrar(f"exportacao.{self.operacao}", self.concluida - self.criada, erro is not None)
+        # Os bytes passam a viver só no armazém, que tem limite de tamanho
+        self._future = None
+
+    @property
+    def status(self):
+        if self.concluida is None:
+            return STATUS_FILA if self.progresso is None else STATUS_EXECUTANDO
+        if self.erro is not None:
+            return STATUS_ERRO
+        return STATUS_CONCLUIDA if armazem.contem(self.artefato) else STATUS_DESCARTADA
+
+    @property
+    def segundos(self):
+        return (self.concluida or time.time()) - self.criada
+
+    @property
+    def resultado(self):
+        """Bytes do arquivo gerado (None enquanto não terminar ou se já foi descartado)"""
+        if self.artefato is None:
+            return None
+        return armazem.ler(self.artefato)
+
+# ---------- Processos do pool ----------
+_fila_progresso = None
+
+def _iniciar_processo(fila_progresso):
+    global _fila_progresso
+    _fila_progresso = fila_progresso
+
+def _executar(id, funcao, args):
+    """Roda no processo do pool; início e progresso voltam pela fila de progresso"""
+    _fila_progresso.put((id, 0.0))
+    if "ao_progredir" not in inspect.signature(funcao).parameters:
+        return funcao(*args)
+
+    enviado = 0.0
+    def ao_progredir(feitas, total):
+        nonlocal enviado
+        fracao = min(1.0, feitas / total) if total else 1.0
+        if fracao - enviado >= PASSO_PROGRESSO:
+            enviado = fracao
+            _fila_progresso.put((id, fracao))
+    return funcao(*args, ao_progredir=ao_progredir)
+
+class FilaDeExportacao:
+    """Fila de geração de arquivos num pool de processos.
+
+    As tarefas ficam num registro do processo, independente da sessão do
+    Streamlit, e por isso sobrevivem aos reruns; cada sessão guarda só os ids.
+    Funções que aceitam ao_progredir(feitas, total) têm o progresso enviado
+    de volta por uma fila, lida por uma thread deste processo.
+    """
+
+    def __init__(self, max_processos=MAX_PROCESSOS):
+        self.max_processos = max_processos
+        self._executor = None
+        self._progresso = None
+        self._ouvinte = None
+        self._tarefas = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            contexto = contexto_processos()
+            self._progresso = contexto.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_processos, mp_context=contexto,
+                initializer=_iniciar_processo, initargs=(self._progresso,)
+            )
+            self._ouvinte = threading.Thread(target=self._ouvir_progresso, args=(self._progresso,),
+                                             name="progresso-exportacao", daemon=True)
+            self._ouvinte.start()
+        return self._executor
+
+    def _ouvir_progresso(self, fila):
+        while (aviso := fila.get()) is not None:
+            id, fracao = aviso
+            tarefa = self.obter(id)
+            if tarefa is not None and tarefa.concluida is None:
+                tarefa.progresso = fracao
+
+    def submeter(self, funcao, *args, nome_arquivo, mime, sessao=None):
+        """Agenda funcao(*args) → bytes e devolve o id da tarefa"""
+        with self._lock:
+            self._descartar_expiradas()
+            id = uuid.uuid4().hex
+            futuro = self._pool().submit(_executar, id, funcao, args)
+            tarefa = Tarefa(id, funcao.__name__, nome_arquivo, mime, sessao, futuro)
+            self._tarefas[tarefa.id] = tarefa
+        return tarefa.id
+
+    def obter(self, id):
+        with self._lock:
+            return self._tarefas.get(id)
+
+    def remover(self, id):
+        with self._lock:
+            tarefa = self._tarefas.pop(id, None)
+        if tarefa is not None and tarefa.artefato is not None:
+            armazem.liberar(tarefa.sessao, tarefa.artefato)
+
+    def _descartar_expiradas(self):
+        limite = time.time() - VALIDADE_TAREFA
+        expiradas = [id for id, t in self._tarefas.items() if t.concluida and t.concluida < limite]
+        for id in expiradas:
+            tarefa = self._tarefas.pop(id)
+            if tarefa.artefato is not None:
+                armazem.liberar(tarefa.sessao, tarefa.artefato)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            # Espera a thread de progresso sair: na saída do processo a fila
+            # é desmontada e um get() ainda pendente quebraria
+            self._progresso.put(None)
+            self._ouvinte.join(timeout=5)
+
+fila_exportacao = FilaDeExportacao()
+atexit.register(fila_exportacao.encerrar)
@@ -1,6 +1,15 @@
+import concurrent.futures
+
 import streamlit as st
 import pandas as pd
-from controllers.estudante_controller import adicionar_estudante, listar_estudantes
+from controllers.fila_escrita import TIMEOUT_CONFIRMACAO, enfileirar_estudante
+from controllers.estudante_controller import (
+    buscar_estudantes, contar_estudantes, cursor_de, importar_estudantes
+)
+from views.paginacao import cursor_atual, navegacao
+
+# Registros exibidos por página na lista de estudantes
+TAMANHO_PAGINA = 50
 
 def show():
     # CSS customizado para o tema chinês
@@ -52,25 +61,71 @@ def show():
         submitted = st.form_submit_button("Cadastrar 🏮")
         
         if submitted:
-            adicionar_estudante(nome, nota1, nota2)
-            st.success("✅ Estudante cadastrado com sucesso! 🎉")
+            try:
+                # Gravado pela fila de escrita; a confirmação só vem depois do commit
+                futuro = enfileirar_estudante(nome, nota1, nota2)
+                futuro.result(timeout=TIMEOUT_CONFIRMACAO)
+                st.success("✅ Estudante cadastrado com sucesso! 🎉")
+            except ValueError as e:
+                st.error(f"❌ Dados inválidos: {e}")
+            except concurrent.futures.TimeoutError:
+                # Cancelado só se ainda estava na fila; senão o commit já começou
+                if futuro.cancel():
+                    st.error("❌ A gravação demorou demais e foi cancelada; tente de novo.")
+                else:
+                    st.warning("⏳ Gravação em andamento; confira a lista antes de cadastrar de novo.")
+            except Exception as e:
+                st.error(f"❌ Não foi possível gravar o cadastro: {e}")
     st.markdown('</div>', unsafe_allow_html=True)
 
+    # Importação em lote
+    st.markdown('<div class="sub-title">📥 Importar Estudantes (CSV/XLSX)</div>', unsafe_allow_html=True)
+    st.caption("A planilha deve ter as colunas: nome, nota1, nota2")
+    planilha = st.file_uploader("Escolha a planilha", type=["csv", "xlsx"], key="importar_planilha")
+    if planilha and st.button("Importar 🏮"):
+        progresso = st.empty()
+        try:
+            resultado = importar_estudantes(
+                planilha, planilha.name,
+                ao_progredir=lambda ok, erros: progresso.text(f"⏳ {ok} inseridos, {erros} rejeitados...")
+            )
+        except Exception as e:
+            progresso.empty()
+            st.error(f"❌ Não foi possível importar: {e}")
+            inseridos = getattr(e, "inseridos", 0)
+            if inseridos:
+                st.warning(
+                    f"⚠️ {inseridos} estudantes dos lotes anteriores já foram gravados; "
+                    "reenviar a planilha inteira vai duplicá-los."
+                )
+        else:
+            progresso.empty()
+            st.success(
+                f"✅ {resultado['inseridos']} estudantes importados em {resultado['segundos']:.2f}s "
+                f"({resultado['linhas_por_segundo']:.0f} linhas/s)"
+            )
+            if resultado["rejeitados"]:
+                st.warning(f"⚠️ {len(resultado['rejeitados'])} linhas rejeitadas")
+                st.dataframe(
+                    pd.DataFrame(resultado["rejeitados"][:1000], columns=["Linha", "Motivo"]),
+                    use_container_width=True
+                )
+
     # Lista de estudantes
     st.markdown('<div class="sub-title">👥 Lista de Estudantes</div>', unsafe_allow_html=True)
-    estudantes = listar_estudantes()
+    apos = cursor_atual("pagina_cadastro", None)
+    estudantes = buscar_estudantes(limit=TAMANHO_PAGINA + 1, apos=apos)
+    tem_proxima = len(estudantes) > TAMANHO_PAGINA
+    estudantes = estudantes[:TAMANHO_PAGINA]
 
-    # Criando lista de dicionários
-    dados_estudantes = [{
-        "Matrícula": i.id,
-        "Nome": i.nome,
-        "1º Nota": i.nota1,
-        "2º Nota": i.nota2,
-        "Média": i.media
-    } for i in estudantes]
-    
-    # DataFrame
-    df_estudantes = pd.DataFrame(dados_estudantes)
+    # DataFrame montado direto das colunas
+    df_estudantes = estudantes.para_dataframe()
 
     # Exibindo tabela estilizada
     st.dataframe(df_estudantes, use_container_width=True)
+    navegacao(
+        "pagina_cadastro",
+        cursor_de(estudantes[-1]) if tem_proxima else None,
+        total=contar_estudantes(),
+        tamanho_pagina=TAMANHO_PAGINA
+    )
@@ -1,21 +1,18 @@
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-import re
 from io import BytesIO
-from docx import Document
-from PyPDF2 import PdfReader
-from reportlab.platypus import SimpleDocTemplate, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
+from controllers.conteudo_controller import (
+    INSTRUCOES_IDIOMA, MAX_CONCORRENCIA, gerar_conteudo_com_cache, gerar_conteudo_stream,
+    obter_llm, precisa_chave_api
+)
+from utils import cache_llm, extracao
+from utils.indice_semantico import obter_indice
 
 # ---------- Funções auxiliares ----------
-def limpar_resposta(text: str) -> str:
-    """Remove o bloco <think>...</think> do texto gerado pela IA"""
-    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
-
 def gerar_pdf(conteudo: str) -> BytesIO:
     """Gera um PDF a partir do texto"""
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+    from reportlab.lib.styles import getSampleStyleSheet
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer)
     styles = getSampleStyleSheet()
@@ -26,6 +23,8 @@ def gerar_pdf(conteudo: str) -> BytesIO:
 
 def gerar_docx(conteudo: str) -> BytesIO:
     """Gera um DOCX a partir do texto"""
+    from docx import Document
+
     buffer = BytesIO()
     doc = Document()
     doc.add_paragraph(conteudo)
@@ -33,19 +32,6 @@ def gerar_docx(conteudo: str) -> BytesIO:
     buffer.seek(0)
     return buffer
 
-def extrair_texto_docx(file: BytesIO) -> str:
-    """Extrai texto de um arquivo DOCX"""
-    doc = Document(file)
-    return "\n".join([p.text for p in doc.paragraphs])
-
-def extrair_texto_pdf(file: BytesIO) -> str:
-    """Extrai texto de um arquivo PDF"""
-    reader = PdfReader(file)
-    texto = ""
-    for page in reader.pages:
-        texto += page.extract_text() + "\n"
-    return texto
-
 # ---------- Função principal ----------
 def show():
     st.title("📝 Geração de Conteúdo com IA")
@@ -62,9 +48,19 @@ def show():
     # Seleção do idioma
     idioma = st.selectbox(
         "Escolha o idioma do conteúdo",
-        ["Português", "中文 (Chinês)", "English", "Español"]
+        list(INSTRUCOES_IDIOMA)
     )
 
+    # Documentos longos são resumidos em blocos paralelos antes da geração final
+    concorrencia = st.slider("Blocos processados em paralelo", 1, 8, MAX_CONCORRENCIA)
+
+    # Exibe o texto à medida que o modelo gera, sem esperar a resposta completa
+    usar_streaming = st.checkbox("Mostrar a resposta enquanto é gerada", value=True)
+
+    # Busca semântica: envia à IA só os trechos do documento mais ligados ao tema
+    tema = st.text_input("Tema da aula (opcional: usa só os trechos relevantes do documento)")
+    qtd_trechos = st.slider("Trechos relevantes enviados à IA", 1, 20, 6, disabled=not tema)
+
     # Upload do documento
     st.subheader("📂 Envie um documento para a IA ler")
     arquivo = st.file_uploader("Escolha um arquivo DOCX ou PDF", type=["docx", "pdf"])
@@ -73,46 +69,65 @@ def show():
     if st.button("▶️ Rodar Documento"):
         if not arquivo:
             st.warning("❌ Por favor, envie um arquivo primeiro.")
-        elif not api_key:
+        elif not api_key and precisa_chave_api():
             st.error("❌ Você precisa informar a chave da Groq.")
         else:
-            # Extrair texto do arquivo
-            texto_documento = ""
-            if arquivo.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                texto_documento = extrair_texto_docx(arquivo)
-            elif arquivo.type == "application/pdf":
-                texto_documento = extrair_texto_pdf(arquivo)
+            # Extrair texto do arquivo (em cache pelo conteúdo do arquivo)
+            with st.spinner("Lendo o documento..."):
+                dados = arquivo.getvalue()
+                texto_documento = extracao.extrair_texto(dados, arquivo.name, arquivo.type)
+
+            if tema and texto_documento.strip():
+                with st.spinner("Buscando os trechos mais relevantes..."):
+                    indice = obter_indice()
+                    hash_documento = extracao.hash_arquivo(dados)
+                    indice.indexar(hash_documento, arquivo.name, texto_documento)
+                    trechos = indice.buscar(tema, k=qtd_trechos, documento_hash=hash_documento)
+                if trechos:
+                    st.caption(f"🔎 {len(trechos)} trechos selecionados para o tema \"{tema}\"")
+                    texto_documento = f"Tema: {tema}\n\n" + "\n\n".join(t for t, _ in trechos)
 
             if not texto_documento.strip():
                 st.warning("⚠️ O arquivo está vazio ou não foi possível extrair o texto.")
             else:
                 try:
-                    llm = ChatGroq(model=modelo, api_key=api_key)
-
-                    # Prompt baseado no idioma
-                    if idioma == "Português":
-                        instrucao = "Crie um conteúdo didático em português com base no seguinte texto: {entrada}."
-                    elif idioma == "中文 (Chinês)":
-                        instrucao = "请用中文撰写一个教学内容，内容如下: {entrada}。"
-                    elif idioma == "English":
-                        instrucao = "Create an educational content in English based on the following text: {entrada}."
-                    elif idioma == "Español":
-                        instrucao = "Cree un contenido educativo en español basado en el siguiente texto: {entrada}."
-
-                    prompt = ChatPromptTemplate.from_messages([
-                        ("system", "Você é um professor especialista em educação."),
-                        ("user", instrucao)
-                    ])
-
-                    chain = prompt | llm | StrOutputParser()
-
-                    with st.spinner("Gerando conteúdo do documento..."):
-                        resultado = chain.invoke({"entrada": texto_documento})
-                        resultado = limpar_resposta(resultado)
-
-                    st.success("✅ Conteúdo gerado com sucesso!")
-                    st.write("### Resultado")
-                    st.write(resultado)
+                    llm = obter_llm(modelo, api_key)
+
+                    progresso = st.empty()
+                    ao_progredir = lambda rodada, blocos: progresso.info(
+                        f"📚 Documento longo: resumindo {blocos} blocos (rodada {rodada})..."
+                    )
+
+                    if usar_streaming:
+                        st.write("### Resultado")
+                        metricas = {}
+                        resultado = st.write_stream(gerar_conteudo_stream(
+                            llm, idioma, texto_documento, metricas,
+                            max_concorrencia=concorrencia, ao_progredir=ao_progredir
+                        ))
+                        progresso.empty()
+                        do_cache = metricas["do_cache"]
+                        if not do_cache and "tempo_primeiro_token" in metricas:
+                            st.caption(f"⏱️ Primeiro trecho em {metricas['tempo_primeiro_token']:.2f}s, "
+                                       f"resposta completa em {metricas['tempo_total']:.2f}s")
+                    else:
+                        with st.spinner("Gerando conteúdo do documento..."):
+                            resultado, do_cache = gerar_conteudo_com_cache(
+                                llm, idioma, texto_documento, max_concorrencia=concorrencia,
+                                ao_progredir=ao_progredir
+                            )
+                            progresso.empty()
+
+                    if do_cache:
+                        st.success("⚡ Conteúdo recuperado do cache (mesmo arquivo, modelo e idioma)!")
+                    else:
+                        st.success("✅ Conteúdo gerado com sucesso!")
+                    uso = cache_llm.estatisticas()
+                    st.caption(f"Cache de respostas: {uso['acertos']} acertos, {uso['falhas']} falhas, "
+                               f"{uso['entradas']} respostas guardadas")
+                    if not usar_streaming:
+                        st.write("### Resultado")
+                        st.write(resultado)
 
                     # Botões de download
                     pdf_buffer = gerar_pdf(resultado)
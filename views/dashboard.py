@@ -1,189 +1,117 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from controllers.estudante_controller import listar_estudantes
-
-# Imports para exportação
-from io import BytesIO
-from docx import Document
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-import plotly.io as pio
-import tempfile
-from pptx import Presentation
-from pptx.util import Inches
-
-st.set_page_config(
-    page_title="📊 Dashboard Escolar 🐉🏮",
-    page_icon="🐲",
-    layout="wide"
-)
-
-# ---------- HTML + CSS Interativo ----------
-st.markdown("""
-<style>
-body { font-family: 'Noto Serif SC', serif; background-color: #FFF8E7; overflow-x: hidden;}
-.stButton>button { background-color: #FF6347; color:white; border-radius:10px; font-weight:bold;}
-.stTable td, .stTable th { border-color:#B22222 !important; }
-</style>
-""", unsafe_allow_html=True)
+from controllers.estudante_controller import buscar_estudantes, contar_estudantes, cursor_de
+from views import graficos, relatorio
+from views.paginacao import cursor_atual, navegacao
+from utils.metricas import medir
+
+# Exportação em segundo plano
+from views.exportacoes import agendar, painel_exportacoes
+
+# Linhas exibidas por página na tabela do dashboard
+TAMANHO_PAGINA = 50
+
+ORDENS = {"nome": "Nome", "media": "Média", "id": "Matrícula"}
+
+def _plotar(fig):
+    # Inclui a serialização da figura para o navegador
+    with medir("dashboard.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
 # ---------- Dashboard ----------
 def show():
+    # ---------- HTML + CSS Interativo ----------
+    st.markdown("""
+    <style>
+    body { font-family: 'Noto Serif SC', serif; background-color: #FFF8E7; overflow-x: hidden;}
+    .stButton>button { background-color: #FF6347; color:white; border-radius:10px; font-weight:bold;}
+    .stTable td, .stTable th { border-color:#B22222 !important; }
+    </style>
+    """, unsafe_allow_html=True)
+
     st.title("📊 Dashboard Escolar 🐉🏮")
     st.write("Relatórios e estatísticas dos alunos aqui...")
 
-    listaDeEstudantes = listar_estudantes()
-    if not listaDeEstudantes:
+    if not contar_estudantes():
         st.warning("Nenhum estudante foi cadastrado ainda")
         return
 
-    df = pd.DataFrame([{"Nome": e.nome,"1º Nota": e.nota1,"2º Nota": e.nota2,"Média": e.media} for e in listaDeEstudantes])
-
     # ---------- FILTROS ----------
     st.sidebar.header("Filtros do Dashboard 🏮")
     faixa_media = st.sidebar.slider("Selecione a faixa de média", 0.0, 10.0, (0.0,10.0), 0.1)
     nome_filtrado = st.sidebar.text_input("Buscar por nome do estudante 🐉")
+    ordem = st.sidebar.selectbox("Ordenar por", list(ORDENS), format_func=ORDENS.get)
 
-    df_filtrado = df[(df["Média"] >= faixa_media[0]) & (df["Média"] <= faixa_media[1])]
-    if nome_filtrado:
-        df_filtrado = df_filtrado[df_filtrado["Nome"].str.contains(nome_filtrado, case=False)]
+    # Filtros aplicados no próprio SQL
+    filtros = {"min_media": faixa_media[0], "max_media": faixa_media[1], "nome_like": nome_filtrado or None}
 
     # ---------- Tabela ----------
     st.subheader("Lista de Estudantes Cadastrados 🏮")
-    st.table(df_filtrado.style.format({"1º Nota":"{:.2f}","2º Nota":"{:.2f}","Média":"{:.2f}"}))
+    apos = cursor_atual("pagina_dashboard", (tuple(filtros.values()), ordem))
+    pagina = buscar_estudantes(**filtros, limit=TAMANHO_PAGINA + 1, order_by=ordem, apos=apos)
+    tem_proxima = len(pagina) > TAMANHO_PAGINA
+    pagina = pagina[:TAMANHO_PAGINA]
+    st.table(pagina.para_dataframe(matricula=False).style.format({"1º Nota":"{:.2f}","2º Nota":"{:.2f}","Média":"{:.2f}"}))
+    navegacao(
+        "pagina_dashboard",
+        cursor_de(pagina[-1], ordem) if tem_proxima else None,
+        total=contar_estudantes(**filtros),
+        tamanho_pagina=TAMANHO_PAGINA
+    )
+
+    # Gráficos e exportações usam todos os estudantes que passaram no filtro
+    df_filtrado, desatualizado = relatorio.dados_filtrados(filtros, ordem)
+    if desatualizado:
+        st.caption("📸 Gráficos com os dados de alguns instantes atrás; os cadastros novos aparecem em breve.")
+
+    # Com o snapshot atrasado as estatísticas saem dele mesmo, para bater com os gráficos
+    estatisticas = relatorio.estatisticas_de(
+        df_filtrado, sem_filtro=faixa_media == (0.0, 10.0) and not nome_filtrado and not desatualizado
+    )
+
+    # ---------- Indicadores ----------
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Estudantes", estatisticas["total"])
+    col2.metric("Média geral", f"{estatisticas['media']:.2f}" if estatisticas["total"] else "-")
+    col3.metric("Menor média", f"{estatisticas['minimo']:.2f}" if estatisticas["total"] else "-")
+    col4.metric("Maior média", f"{estatisticas['maximo']:.2f}" if estatisticas["total"] else "-")
 
     # ---------- Gráficos ----------
-    fig_bar = px.bar(df_filtrado, x="Nome", y="Média", title="Média Individual dos Estudantes 🐉",
-                     labels={"Média":"Média","Nome":"Estudante"}, text="Média",
-                     range_y=[0,10], color="Média", color_continuous_scale=px.colors.sequential.Oranges)
-    fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    st.plotly_chart(fig_bar, use_container_width=True)
-
-    categorias = {
-        "Abaixo de 5": len(df_filtrado[df_filtrado["Média"] < 5]),
-        "Entre 5 e 7": len(df_filtrado[(df_filtrado["Média"] >= 5) & (df_filtrado["Média"] <= 7)]),
-        "Acima de 7": len(df_filtrado[df_filtrado["Média"] > 7])
-    }
-    fig_pie = px.pie(names=list(categorias.keys()), values=list(categorias.values()),
-                     title="Distribuição das Médias dos Estudantes 🏮",
-                     color_discrete_sequence=["#B22222","#FF8C00","#FFD700"])
-    st.plotly_chart(fig_pie, use_container_width=True)
+    # Turmas grandes: visões agregadas no servidor em vez de uma barra por estudante
+    fig_bar, fig_pie = relatorio.figuras(df_filtrado, estatisticas)
+    if len(df_filtrado) <= graficos.LIMITE_BARRAS:
+        _plotar(fig_bar)
+    else:
+        st.caption(f"{len(df_filtrado)} estudantes: exibindo gráficos agregados 🐉")
+        aba_hist, aba_top, aba_perc, aba_disp = st.tabs(["Histograma", "Top/Últimos", "Percentis", "Dispersão"])
+        with aba_hist:
+            _plotar(fig_bar)
+        with aba_top:
+            _plotar(graficos.grafico_top(df_filtrado))
+        with aba_perc:
+            _plotar(graficos.grafico_percentis(df_filtrado["Média"].to_numpy()))
+        with aba_disp:
+            _plotar(graficos.grafico_dispersao(df_filtrado))
+
+    _plotar(fig_pie)
 
     # ---------- Exportar Dashboard ----------
+    # Os arquivos são gerados em segundo plano; a página continua navegável
     st.subheader("📂 Exportar Dashboard")
-
-    # DOCX
-    if st.button("📑 Exportar para Word (DOCX)"):
-        doc = Document()
-        doc.add_heading("Relatório Escolar - Dashboard 🐉🏮", 0)
-        doc.add_paragraph("Relatório gerado a partir do sistema interativo.")
-
-        t = doc.add_table(rows=1, cols=len(df_filtrado.columns))
-        hdr_cells = t.rows[0].cells
-        for i, col in enumerate(df_filtrado.columns):
-            hdr_cells[i].text = col
-        for _, row in df_filtrado.iterrows():
-            row_cells = t.add_row().cells
-            for i, val in enumerate(row):
-                row_cells[i].text = str(val)
-
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-
-        st.download_button(
-            label="📥 Baixar Relatório Word",
-            data=buffer,
-            file_name="dashboard_escolar.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
-
-    # PDF
-    if st.button("📄 Exportar para PDF"):
-        buffer = BytesIO()
-        doc_pdf = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        elements.append(Paragraph("Relatório Escolar - Dashboard 🐉🏮", styles['Title']))
-        elements.append(Paragraph("Relatório gerado a partir do sistema interativo.", styles['Normal']))
-        elements.append(Spacer(1,12))
-
-        data_table = [list(df_filtrado.columns)] + df_filtrado.values.tolist()
-        t = Table(data_table)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#B22222")),
-            ('TEXTCOLOR',(0,0),(-1,0),colors.white),
-            ('ALIGN',(0,0),(-1,-1),'CENTER'),
-            ('GRID', (0,0), (-1,-1), 1, colors.black),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold')
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1,12))
-
-        for fig, title in [(fig_bar, "Média Individual dos Estudantes 🐉"), (fig_pie, "Distribuição das Médias dos Estudantes 🏮")]:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-                pio.write_image(fig, tmpfile.name, format='png', scale=2)
-                elements.append(Paragraph(title, styles['Heading2']))
-                elements.append(Image(tmpfile.name, width=400, height=300))
-                elements.append(Spacer(1,12))
-
-        doc_pdf.build(elements)
-        buffer.seek(0)
-
-        st.download_button(
-            label="📥 Baixar Relatório PDF Completo",
-            data=buffer,
-            file_name="dashboard_escolar_completo.pdf",
-            mime="application/pdf"
-        )
-
-    # PowerPoint
-    if st.button("📊 Exportar para PowerPoint (PPTX)"):
-        prs = Presentation()
-        slide_layout = prs.slide_layouts[5]  # layout em branco
-
-        # Slide Tabela
-        slide = prs.slides.add_slide(slide_layout)
-        slide.shapes.title.text = "Tabela de Estudantes"
-        rows, cols = df_filtrado.shape
-        top, left, width, height = Inches(1), Inches(0.5), Inches(9), Inches(5)
-        table = slide.shapes.add_table(rows=rows+1, cols=cols, left=left, top=top, width=width, height=height).table
-
-        # Cabeçalho
-        for j, col_name in enumerate(df_filtrado.columns):
-            table.cell(0, j).text = str(col_name)
-
-        # Dados
-        for i in range(rows):
-            for j in range(cols):
-                table.cell(i+1, j).text = str(df_filtrado.iloc[i, j])
-
-        # Slide Gráfico de barras
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-            pio.write_image(fig_bar, tmpfile.name, format='png', scale=2)
-            slide = prs.slides.add_slide(slide_layout)
-            slide.shapes.title.text = "Média Individual dos Estudantes 🐉"
-            slide.shapes.add_picture(tmpfile.name, Inches(1), Inches(1.5), width=Inches(8), height=Inches(4.5))
-
-        # Slide Gráfico de pizza
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-            pio.write_image(fig_pie, tmpfile.name, format='png', scale=2)
-            slide = prs.slides.add_slide(slide_layout)
-            slide.shapes.title.text = "Distribuição das Médias dos Estudantes 🏮"
-            slide.shapes.add_picture(tmpfile.name, Inches(1), Inches(1.5), width=Inches(8), height=Inches(4.5))
-
-        buffer = BytesIO()
-        prs.save(buffer)
-        buffer.seek(0)
-
-        st.download_button(
-            label="📥 Baixar Dashboard em PowerPoint",
-            data=buffer,
-            file_name="dashboard_escolar.pptx",
-            mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
-        )
-
+    col1, col2, col3, col4 = st.columns(4)
+    pedidos = []
+    if col1.button("📑 Exportar para Word (DOCX)"):
+        pedidos = ["docx"]
+    if col2.button("📄 Exportar para PDF"):
+        pedidos = ["pdf"]
+    if col3.button("📊 Exportar para PowerPoint (PPTX)"):
+        pedidos = ["pptx"]
+    if col4.button("📦 Exportar todos"):
+        pedidos = list(relatorio.FORMATOS)
+
+    if pedidos:
+        exportacoes = relatorio.exportacoes(df_filtrado, fig_bar, fig_pie)
+        for formato in pedidos:
+            funcao, args, nome_arquivo, mime = exportacoes[formato]
+            agendar(funcao, *args, nome_arquivo=nome_arquivo, mime=mime)
+
+    painel_exportacoes()
@@ -1,45 +1,26 @@
 import streamlit as st
 import pandas as pd
-from PyPDF2 import PdfReader
-import docx
-from io import BytesIO
-from docx import Document
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from pptx import Presentation
-from pptx.util import Inches
-import tempfile
 import plotly.express as px
-import plotly.io as pio
+from utils import extracao
+from controllers.documento_controller import salvar_documento, buscar_documentos
+from views.exportacoes import agendar, painel_exportacoes
 
-# ---------- Funções de leitura ----------
-def ler_txt(file):
-    return file.read().decode("utf-8")
-
-def ler_pdf(file):
-    pdf = PdfReader(file)
-    texto = ""
-    for page in pdf.pages:
-        page_text = page.extract_text()
-        if page_text:
-            texto += page_text + "\n"
-    return texto
-
-def ler_docx(file):
-    doc = docx.Document(file)
-    texto = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
-    return texto
+# Caracteres exibidos na pré-visualização
+TAMANHO_PREVIA = 2000
+
+# Hash do último arquivo desta sessão já guardado no banco
+CHAVE_DOCUMENTO_SALVO = "documento_salvo"
 
+# ---------- Funções de leitura ----------
 def resumir_texto(texto, max_chars=500):
     if len(texto) <= max_chars:
         return texto
     return texto[:max_chars] + "..."
 
-# ---------- Inicializa session_state ----------
-if "document_links" not in st.session_state:
-    st.session_state.document_links = []
+def _mostrar_previa(local, texto):
+    with local.container():
+        st.subheader("📖 Pré-visualização do conteúdo")
+        st.text_area("Conteúdo extraído", texto[:TAMANHO_PREVIA], height=200)
 
 # ---------- Função principal da página ----------
 def show_documentos():
@@ -68,118 +49,79 @@ def show_documentos():
     st.title("📊 Análise de Documentos 🏮🐉")
     st.write("Envie um documento (.txt, .pdf ou .docx) e veja uma descrição gerada automaticamente.")
 
+    # ---------- Busca nos documentos já enviados ----------
+    termo_busca = st.text_input("🔎 Buscar nos documentos enviados")
+    if termo_busca:
+        resultados = buscar_documentos(termo_busca)
+        if not resultados:
+            st.info("Nenhum documento encontrado.")
+        for doc_encontrado in resultados:
+            st.markdown(f"**📑 {doc_encontrado.nome}** — enviado em {doc_encontrado.data_upload}")
+            st.caption(doc_encontrado.trecho or "")
+
     uploaded_file = st.file_uploader("📂 Envie seu documento", type=["txt", "pdf", "docx"])
 
     if uploaded_file:
         st.markdown(f"### 📑 {uploaded_file.name}")
         texto = ""
-        file_type = uploaded_file.type
+        previa = st.empty()
+        status = st.empty()
 
+        # As páginas chegam uma a uma; a prévia aparece assim que houver texto suficiente
         try:
-            if uploaded_file.name.endswith(".txt") or file_type == "text/plain":
-                texto = ler_txt(uploaded_file)
-            elif uploaded_file.name.endswith(".pdf") or file_type == "application/pdf":
-                texto = ler_pdf(uploaded_file)
-            elif uploaded_file.name.endswith(".docx") or file_type in [
-                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "application/msword"
-            ]:
-                texto = ler_docx(uploaded_file)
-            else:
-                st.error("Formato de arquivo não suportado.")
+            paginas, lidos, mostrada = [], 0, False
+            for pagina in extracao.paginas(uploaded_file.getvalue(), uploaded_file.name, uploaded_file.type):
+                paginas.append(pagina)
+                lidos += len(pagina)
+                if not mostrada and lidos >= TAMANHO_PREVIA:
+                    _mostrar_previa(previa, "\n".join(paginas))
+                    mostrada = True
+                status.caption(f"📄 {len(paginas)} página(s) lida(s)")
+            status.empty()
+            texto = "\n".join(paginas)
+            if texto and not mostrada:
+                _mostrar_previa(previa, texto)
+            if texto:
+                # Guarda o texto para a busca uma vez por arquivo; os reruns da página
+                # (cada clique num botão) não voltam ao banco
+                dados = uploaded_file.getvalue()
+                hash_doc = extracao.hash_arquivo(dados)
+                if st.session_state.get(CHAVE_DOCUMENTO_SALVO) != hash_doc:
+                    salvar_documento(uploaded_file.name, texto, dados, hash_doc)
+                    st.session_state[CHAVE_DOCUMENTO_SALVO] = hash_doc
+        except ValueError as e:
+            st.error(str(e))
         except Exception as e:
             st.error(f"Erro ao ler o arquivo: {e}")
 
         if texto:
-            st.subheader("📖 Pré-visualização do conteúdo")
-            st.text_area("Conteúdo extraído", texto[:2000], height=200)
-
             st.subheader("📝 Descrição do documento")
             st.write(resumir_texto(texto))
 
             # ---------- Botões de geração ----------
+            # Gerados em segundo plano; a lista abaixo se atualiza sozinha
+            from utils import exportacao  # docx/reportlab/pptx só com um documento enviado
+            graficos = [(fig_bar.to_dict(), "Média Individual dos Estudantes 🐉"),
+                        (fig_pie.to_dict(), "Distribuição das Médias 🏮")]
             col1, col2, col3 = st.columns(3)
 
             with col1:
                 if st.button("📑 Gerar DOCX"):
-                    doc = Document()
-                    doc.add_heading(uploaded_file.name, 0)
-                    doc.add_paragraph(texto)
-                    buffer = BytesIO()
-                    doc.save(buffer)
-                    buffer.seek(0)
-                    st.session_state.document_links.append({
-                        "nome": f"{uploaded_file.name}.docx",
-                        "buffer": buffer,
-                        "mime": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    })
-                    st.success("DOCX gerado!")
+                    agendar(exportacao.documento_docx, uploaded_file.name, texto,
+                            nome_arquivo=f"{uploaded_file.name}.docx", mime=exportacao.MIME_DOCX)
+                    st.success("DOCX na fila de geração!")
 
             with col2:
                 if st.button("📄 Gerar PDF com gráficos"):
-                    buffer = BytesIO()
-                    doc_pdf = SimpleDocTemplate(buffer, pagesize=letter)
-                    elements = []
-                    styles = getSampleStyleSheet()
-                    elements.append(Paragraph(uploaded_file.name, styles['Title']))
-                    elements.append(Spacer(1,12))
-                    elements.append(Paragraph(texto, styles['Normal']))
-                    elements.append(Spacer(1,12))
-
-                    # Adiciona gráficos
-                    for fig, title in [(fig_bar, "Média Individual dos Estudantes 🐉"), 
-                                       (fig_pie, "Distribuição das Médias 🏮")]:
-                        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-                            pio.write_image(fig, tmpfile.name, format='png', scale=2)
-                            elements.append(Paragraph(title, styles['Heading2']))
-                            elements.append(Image(tmpfile.name, width=400, height=300))
-                            elements.append(Spacer(1,12))
-
-                    doc_pdf.build(elements)
-                    buffer.seek(0)
-                    st.session_state.document_links.append({
-                        "nome": f"{uploaded_file.name}_com_graficos.pdf",
-                        "buffer": buffer,
-                        "mime": "application/pdf"
-                    })
-                    st.success("PDF com gráficos gerado!")
+                    agendar(exportacao.documento_pdf, uploaded_file.name, texto, graficos,
+                            nome_arquivo=f"{uploaded_file.name}_com_graficos.pdf", mime=exportacao.MIME_PDF)
+                    st.success("PDF com gráficos na fila de geração!")
 
             with col3:
                 if st.button("📊 Gerar PowerPoint com gráficos"):
-                    prs = Presentation()
-                    slide_layout = prs.slide_layouts[5]
-
-                    # Slide texto
-                    slide = prs.slides.add_slide(slide_layout)
-                    slide.shapes.title.text = uploaded_file.name
-                    slide.shapes.add_textbox(Inches(1), Inches(1.5), Inches(8), Inches(4)).text = texto
-
-                    # Slides de gráficos
-                    for fig, title in [(fig_bar, "Média Individual dos Estudantes 🐉"), 
-                                       (fig_pie, "Distribuição das Médias 🏮")]:
-                        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-                            pio.write_image(fig, tmpfile.name, format='png', scale=2)
-                            slide = prs.slides.add_slide(slide_layout)
-                            slide.shapes.title.text = title
-                            slide.shapes.add_picture(tmpfile.name, Inches(1), Inches(1.5), width=Inches(8), height=Inches(4.5))
-
-                    buffer = BytesIO()
-                    prs.save(buffer)
-                    buffer.seek(0)
-                    st.session_state.document_links.append({
-                        "nome": f"{uploaded_file.name}_com_graficos.pptx",
-                        "buffer": buffer,
-                        "mime": "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-                    })
-                    st.success("PowerPoint com gráficos gerado!")
+                    agendar(exportacao.documento_pptx, uploaded_file.name, texto, graficos,
+                            nome_arquivo=f"{uploaded_file.name}_com_graficos.pptx", mime=exportacao.MIME_PPTX)
+                    st.success("PowerPoint com gráficos na fila de geração!")
 
             # ---------- Exibe links gerados ----------
-            if st.session_state.document_links:
-                st.subheader("📂 Documentos gerados")
-                for doc_info in st.session_state.document_links:
-                    st.download_button(
-                        label=f"📥 Baixar {doc_info['nome']}",
-                        data=doc_info["buffer"],
-                        file_name=doc_info["nome"],
-                        mime=doc_info["mime"]
-                    )
+            painel_exportacoes("📂 Documentos gerados")
@@ -0,0 +1,106 @@
+import uuid
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.artefatos import armazem
+from utils.tarefas import (
+    fila_exportacao, STATUS_FILA, STATUS_EXECUTANDO, STATUS_CONCLUIDA, STATUS_ERRO, STATUS_DESCARTADA
+)
+
+# ids das tarefas desta sessão
+CHAVE_SESSAO = "tarefas_exportacao"
+
+# Identifica a sessão no armazém de arquivos gerados
+CHAVE_ID_SESSAO = "id_sessao_exportacao"
+
+# ids das tarefas cujo arquivo já foi lido do armazém para download
+CHAVE_PREPARADOS = "exportacoes_preparadas"
+
+# Intervalo (s) de atualização do painel enquanto houver tarefas pendentes
+INTERVALO_ATUALIZACAO = 2
+
+ICONES = {STATUS_FILA: "⏳", STATUS_EXECUTANDO: "⚙️", STATUS_CONCLUIDA: "✅", STATUS_ERRO: "❌",
+          STATUS_DESCARTADA: "🧹"}
+
+def _id_sessao():
+    """id da sessão do Streamlit (um uuid próprio quando não há runtime, ex.: AppTest)"""
+    if CHAVE_ID_SESSAO not in st.session_state:
+        ctx = get_script_run_ctx()
+        st.session_state[CHAVE_ID_SESSAO] = ctx.session_id if ctx and runtime.exists() else uuid.uuid4().hex
+    return st.session_state[CHAVE_ID_SESSAO]
+
+def _sessao_ativa(sessao):
+    """Falso só para sessões que o runtime do Streamlit já encerrou"""
+    if sessao is None or not runtime.exists():
+        return True
+    return runtime.get_instance().is_active_session(sessao)
+
+# Arquivos de sessões encerradas (aba fechada) são liberados na próxima varredura do armazém
+armazem.sessao_ativa = _sessao_ativa
+
+def agendar(funcao, *args, nome_arquivo, mime):
+    """Coloca a geração de um arquivo na fila e registra a tarefa na sessão"""
+    id = fila_exportacao.submeter(funcao, *args, nome_arquivo=nome_arquivo, mime=mime, sessao=_id_sessao())
+    st.session_state.setdefault(CHAVE_SESSAO, []).append(id)
+    return id
+
+def _tarefas_da_sessao():
+    ids = st.session_state.get(CHAVE_SESSAO, [])
+    tarefas = [fila_exportacao.obter(id) for id in ids]
+    # Esquece tarefas que já expiraram na fila
+    st.session_state[CHAVE_SESSAO] = [t.id for t in tarefas if t is not None]
+    return [t for t in tarefas if t is not None]
+
+def _pendente(tarefa):
+    return tarefa.status in (STATUS_FILA, STATUS_EXECUTANDO)
+
+def painel_exportacoes(titulo="📂 Arquivos gerados"):
+    """Lista as exportações da sessão, atualizando sozinha enquanto alguma estiver em andamento"""
+    tarefas = _tarefas_da_sessao()
+    if not tarefas:
+        return
+    armazem.tocar(_id_sessao())
+    pendentes = any(_pendente(t) for t in tarefas)
+    st.fragment(run_every=INTERVALO_ATUALIZACAO if pendentes else None)(_painel)(titulo, pendentes)
+
+def _painel(titulo, havia_pendentes):
+    tarefas = _tarefas_da_sessao()
+    st.subheader(titulo)
+    for tarefa in reversed(tarefas):
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            st.write(f"{ICONES[tarefa.status]} **{tarefa.nome_arquivo}** — {tarefa.status} ({tarefa.segundos:.1f}s)")
+            if tarefa.status == STATUS_EXECUTANDO:
+                st.progress(tarefa.progresso or 0.0)
+            elif tarefa.status == STATUS_ERRO:
+                st.caption(f"Erro: {tarefa.erro}")
+            elif tarefa.status == STATUS_DESCARTADA:
+                st.caption("Arquivo descartado para liberar memória; gere novamente.")
+        with col2:
+            if tarefa.status == STATUS_CONCLUIDA:
+                # Os bytes só saem do armazém depois de pedidos, não a cada rerun
+                preparados = st.session_state.setdefault(CHAVE_PREPARADOS, set())
+                dados = armazem.ler(tarefa.artefato) if tarefa.id in preparados else None
+                if dados is not None:
+                    st.download_button(
+                        label=f"📥 Baixar {tarefa.nome_arquivo}",
+                        data=dados,
+                        file_name=tarefa.nome_arquivo,
+                        mime=tarefa.mime,
+                        key=f"baixar_{tarefa.id}",
+                        on_click="ignore"
+                    )
+                else:
+                    # No callback, para o botão de download já aparecer neste rerun
+                    st.button("⬇️ Preparar download", key=f"preparar_{tarefa.id}",
+                              on_click=preparados.add, args=(tarefa.id,))
+        with col3:
+            if not _pendente(tarefa) and st.button("🗑️", key=f"remover_{tarefa.id}"):
+                fila_exportacao.remover(tarefa.id)
+                st.session_state.get(CHAVE_PREPARADOS, set()).discard(tarefa.id)
+                st.rerun()
+
+    # Quando tudo termina, um rerun completo desliga a atualização automática
+    if havia_pendentes and not any(_pendente(t) for t in tarefas):
+        st.rerun()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.metricas import cronometrado
+
+# Acima desta quantidade de estudantes o gráfico de barras individual é
+# trocado por visões agregadas no servidor
+LIMITE_BARRAS = 200
+
+# Máximo de pontos enviados ao navegador no gráfico de dispersão
+MAX_PONTOS_DISPERSAO = 5000
+
+TOP_N = 15
+
+PERCENTIS = [5, 10, 25, 50, 75, 90, 95]
+
+CORES_FAIXAS = ["#B22222","#FF8C00","#FFD700"]
+
+@cronometrado()
+def grafico_medias_individuais(df):
+    """Uma barra por estudante; adequado só para turmas pequenas"""
+    fig = px.bar(df, x="Nome", y="Média", title="Média Individual dos Estudantes 🐉",
+                 labels={"Média":"Média","Nome":"Estudante"}, text="Média",
+                 range_y=[0,10], color="Média", color_continuous_scale=px.colors.sequential.Oranges)
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    return fig
+
+@cronometrado()
+def grafico_histograma(histograma, total=None):
+    """Histograma das médias a partir das contagens já agregadas por faixa de 1 ponto"""
+    rotulos = [f"{i}–{i + 1}" for i in range(len(histograma))]
+    fig = go.Figure(go.Bar(
+        x=rotulos, y=list(histograma), text=list(histograma), textposition="outside",
+        marker=dict(color=list(range(len(histograma))), colorscale="Oranges")
+    ))
+    titulo = "Distribuição das Médias por Faixa 🐉"
+    if total is not None:
+        titulo += f" ({total} estudantes)"
+    fig.update_layout(title=titulo, xaxis_title="Faixa de média", yaxis_title="Estudantes")
+    return fig
+
+@cronometrado()
+def grafico_top(df, n=TOP_N):
+    """As n maiores e as n menores médias"""
+    extremos = pd.concat([df.nlargest(n, "Média"), df.nsmallest(n, "Média")])
+    extremos = extremos[~extremos.index.duplicated()]
+    fig = px.bar(extremos, x="Média", y="Nome", orientation="h", range_x=[0,10],
+                 title=f"Top {n} e últimos {n} estudantes 🐉", color="Média",
+                 color_continuous_scale=px.colors.sequential.Oranges)
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+@cronometrado()
+def grafico_percentis(medias):
+    medias = np.asarray(medias, dtype=np.float64)
+    medias = medias[~np.isnan(medias)]
+    valores = np.percentile(medias, PERCENTIS) if len(medias) else np.zeros(len(PERCENTIS))
+    fig = go.Figure(go.Scatter(
+        x=[f"P{p}" for p in PERCENTIS], y=valores, mode="lines+markers+text",
+        text=[f"{v:.2f}" for v in valores], textposition="top center",
+        line=dict(color="#B22222")
+    ))
+    fig.update_layout(title="Percentis das Médias 🏮", yaxis=dict(range=[0, 10.5], title="Média"))
+    return fig
+
+@cronometrado()
+def grafico_dispersao(df, max_pontos=MAX_PONTOS_DISPERSAO):
+    """1º x 2º nota com WebGL, amostrando no servidor quando há pontos demais"""
+    titulo = "1º Nota x 2º Nota 🐉"
+    if len(df) > max_pontos:
+        df = df.sample(max_pontos, random_state=0)
+        titulo += f" (amostra de {max_pontos})"
+    fig = go.Figure(go.Scattergl(
+        x=df["1º Nota"], y=df["2º Nota"], mode="markers", text=df["Nome"],
+        marker=dict(color=df["Média"], colorscale="Oranges", size=5, opacity=0.6, showscale=True)
+    ))
+    fig.update_layout(title=titulo, xaxis_title="1º Nota", yaxis_title="2º Nota")
+    return fig
+
+@cronometrado()
+def grafico_faixas(categorias):
+    return px.pie(names=list(categorias.keys()), values=list(categorias.values()),
+                  title="Distribuição das Médias dos Estudantes 🏮",
+                  color_discrete_sequence=CORES_FAIXAS)
+
+@cronometrado()
+def grafico_principal(df, estatisticas, limite=LIMITE_BARRAS):
+    """Barras individuais para turmas pequenas, histograma agregado acima do limite"""
+    if len(df) <= limite:
+        return grafico_medias_individuais(df)
+    return grafico_histograma(estatisticas["histograma"], estatisticas["total"])
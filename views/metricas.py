@@ -0,0 +1,44 @@
+import streamlit as st
+import pandas as pd
+from utils import metricas
+
+# Relatório do cProfile do último rerun perfilado desta sessão
+CHAVE_PERFIL = "perfil_metricas"
+
+# ---------- Painel de desempenho (só administradores) ----------
+def perfilar_rerun():
+    """Se marcado no painel, a página deste rerun roda sob cProfile"""
+    return st.session_state.get("perfilar_pagina", False)
+
+def painel_metricas():
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.checkbox("Perfilar a página (cProfile)", key="perfilar_pagina")
+
+        linhas = metricas.resumo()
+        if linhas:
+            st.dataframe(
+                pd.DataFrame(linhas)[["operacao", "chamadas", "p50_ms", "p95_ms", "max_ms", "erros"]],
+                hide_index=True
+            )
+        else:
+            st.caption("Nenhuma operação medida ainda.")
+
+        contadores = metricas.contadores()
+        if contadores:
+            st.caption(" · ".join(f"{nome}: {valor}" for nome, valor in sorted(contadores.items())))
+
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", data=metricas.para_json(), file_name="metricas.json",
+                             mime="application/json", on_click="ignore")
+        col2.download_button("Prometheus", data=metricas.para_prometheus(), file_name="metricas.prom",
+                             mime="text/plain", on_click="ignore")
+        col1, col2 = st.columns(2)
+        if col1.button("Gravar", help=f"Grava em {metricas.ARQUIVO_METRICAS}"):
+            st.caption(f"Gravado em {metricas.salvar()}")
+        if col2.button("Zerar"):
+            metricas.zerar()
+            st.rerun()
+
+        perfil = st.session_state.get(CHAVE_PERFIL)
+        if perfil:
+            st.text_area("Último perfil (tempo acumulado)", perfil["texto"], height=300)
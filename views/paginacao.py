@@ -0,0 +1,29 @@
+import streamlit as st
+
+# ---------- Paginação por keyset compartilhada pelas tabelas ----------
+def cursor_atual(chave, filtros):
+    """Cursor da página atual; volta para a primeira página quando os filtros mudam"""
+    estado = st.session_state.get(chave)
+    if estado is None or estado["filtros"] != filtros:
+        estado = st.session_state[chave] = {"filtros": filtros, "cursores": [None]}
+    return estado["cursores"][-1]
+
+def navegacao(chave, proximo_cursor, total=None, tamanho_pagina=None):
+    """Botões Anterior/Próxima; `proximo_cursor` é None na última página"""
+    estado = st.session_state[chave]
+    pagina = len(estado["cursores"])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Anterior", key=f"{chave}_anterior", disabled=pagina == 1):
+            estado["cursores"].pop()
+            st.rerun()
+    with col2:
+        texto = f"Página {pagina}"
+        if total is not None and tamanho_pagina:
+            texto += f" de {max(1, -(-total // tamanho_pagina))} ({total} registros)"
+        st.caption(texto)
+    with col3:
+        if st.button("Próxima ➡️", key=f"{chave}_proxima", disabled=proximo_cursor is None):
+            estado["cursores"].append(proximo_cursor)
+            st.rerun()
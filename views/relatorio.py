@@ -0,0 +1,50 @@
+import pyarrow as pa
+
+from controllers.estudante_controller import dataframe_estudantes
+from controllers.estatisticas_controller import calcular_estatisticas, obter_estatisticas
+from utils import snapshot
+from utils.metricas import contar
+from views import graficos
+
+# Dados, gráficos e exportações do relatório do Dashboard, sem Streamlit:
+# usados pela página e por scripts/gerar_relatorios.py.
+
+FORMATOS = ("docx", "pdf", "pptx")
+
+TITULO_FAIXAS = "Distribuição das Médias dos Estudantes 🏮"
+
+def dados_filtrados(filtros, ordem="id"):
+    """(DataFrame, desatualizado) dos estudantes no filtro.
+
+    Lidos do snapshot Arrow; sem ele (disco cheio, arquivo corrompido)
+    vêm do SQL.
+    """
+    try:
+        return snapshot.dataframe_estudantes(**filtros, order_by=ordem, matricula=False)
+    except (OSError, pa.ArrowInvalid):
+        contar("relatorio.snapshot_indisponivel")
+        return dataframe_estudantes(**filtros, order_by=ordem, matricula=False), False
+
+def estatisticas_de(df, sem_filtro=False):
+    """Sem filtro as estatísticas vêm prontas da tabela agregada"""
+    if sem_filtro:
+        return obter_estatisticas()
+    return calcular_estatisticas(df["Média"].to_numpy())
+
+def figuras(df, estatisticas):
+    """(gráfico principal, pizza das faixas) do relatório"""
+    return graficos.grafico_principal(df, estatisticas), graficos.grafico_faixas(estatisticas["faixas"])
+
+def exportacoes(df, fig_bar, fig_pie):
+    """{formato: (função, args, nome do arquivo, mime)}; as funções só recebem dados picklable"""
+    # python-docx, reportlab e python-pptx só são carregados ao exportar
+    from utils import exportacao
+
+    graficos_relatorio = [(fig_bar.to_dict(), fig_bar.layout.title.text), (fig_pie.to_dict(), TITULO_FAIXAS)]
+    return {
+        "docx": (exportacao.relatorio_docx, (df,), "dashboard_escolar.docx", exportacao.MIME_DOCX),
+        "pdf": (exportacao.relatorio_pdf, (df, graficos_relatorio),
+                "dashboard_escolar_completo.pdf", exportacao.MIME_PDF),
+        "pptx": (exportacao.relatorio_pptx, (df, graficos_relatorio),
+                 "dashboard_escolar.pptx", exportacao.MIME_PPTX),
+    }